@@ -0,0 +1,89 @@
+"""Dim micro-benchmark
+
+Compares the tuple based Dim with the list based Dim it replaced, for
+the operations layout code uses most: creating a Dim, reading its
+attributes, scaling it, and the memory held by many live Dims.
+
+    python benchmarks/bench_dim.py
+"""
+
+import sys
+import timeit
+import tracemalloc
+from typing import Callable
+from bgboxmaker.dim import Dim
+
+
+class ListDim(list):
+    """The previous list based Dim, kept here as the baseline."""
+
+    def __init__(self, *args):
+        inputs = list(args)
+        if len(inputs) > 0 and isinstance(inputs[0], list):
+            inputs = inputs[0]
+        while len(inputs) < 3:
+            inputs.append(0)
+        super().__init__(inputs)
+
+    @property
+    def x(self):
+        return self[0]
+    @property
+    def y(self):
+        return self[1]
+    @property
+    def wh(self):
+        return (self[0], self[1])
+
+    def __mul__(self, value):
+        newDim = ListDim()
+        for i in range(0, len(self)):
+            newDim[i] = self[i] * value
+        return newDim
+
+    def as_ints(self):
+        newDim = ListDim()
+        for i in range(0, len(self)):
+            newDim[i] = int(self[i])
+        return newDim
+
+
+def per_call(func : Callable[[], object], number : int = 200000, repeat : int = 5) -> float:
+    """Best time per call in nanoseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def live_bytes(cls : type, count : int = 100000) -> float:
+    """Bytes allocated per Dim while count of them are alive."""
+    tracemalloc.start()
+    dims = [cls(i, i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dims
+    return size / count
+
+
+def main() -> None:
+    rows = []
+    for name, cls in (("list", ListDim), ("tuple", Dim)):
+        dim = cls(120, 80)
+        rows.append((name, {
+            "create" : per_call(lambda: cls(120, 80)),
+            "from list" : per_call(lambda: cls([120, 80])),
+            "read x, y" : per_call(lambda: dim.x + dim.y),
+            "wh" : per_call(lambda: dim.wh),
+            "scale" : per_call(lambda: (dim * 1.5).as_ints()),
+            "bytes" : live_bytes(cls),
+        }))
+
+    names = list(rows[0][1])
+    print(f"{'':8}" + "".join(f"{name:>12}" for name in names))
+    for name, values in rows:
+        print(f"{name:8}" + "".join(f"{values[key]:>12.1f}" for key in names))
+    base, new = rows[0][1], rows[1][1]
+    print(f"{'speedup':8}" + "".join(f"{base[key] / new[key]:>11.2f}x" for key in names))
+    print("\nTimes in ns per call, bytes per live Dim.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
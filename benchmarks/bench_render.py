@@ -0,0 +1,251 @@
+"""Render benchmark suite
+
+Times the three stages of making a box, parsing the configuration
+(BoxConfig), laying it out (Box) and rendering it (Box.generate), for
+a matrix of resolutions, box sizes and feature loads. Results are
+written as JSON so runs can be kept and compared.
+
+    python benchmarks/bench_render.py run -o results.json
+    python benchmarks/bench_render.py run --quick -k text
+    python benchmarks/bench_render.py compare baseline.json results.json
+    python benchmarks/bench_render.py compare baseline.json
+
+compare exits with status 1 if any case got slower than the threshold
+allows. Without a second file it runs the cases in the baseline again
+and compares against those.
+
+Caches are cleared before every sample, so each render pays for font
+and image loading and shape drawing the way a single CLI run does.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Iterator, Optional
+from bgboxmaker import Box, BoxConfig, FontCache, AssetCache
+from bgboxmaker.view.section import clear_shape_cache
+from PIL import Image
+import PIL
+
+RESOLUTIONS = [150, 300, 600, 1200]
+QUICK_RESOLUTIONS = [150, 300]
+
+DIMENSIONS = {
+    "card" : {"width" : 2.5, "height" : 3.5, "depth" : 1},
+    "large" : {"width" : 3, "height" : 3.5, "depth" : 1.25},
+}
+
+STAGES = ["parse", "layout", "generate"]
+
+
+def _text_features(count : int) -> list[dict]:
+    return [{"type" : "text", "place" : [1, i + 1], "options" : {"text" : f"Line of text {i + 1}"}} for i in range(count)]
+
+
+# Feature loads, each a function of the image directory returning the
+# configuration blocks added to the box dimensions.
+MIXES : dict[str, Callable[[str], dict]] = {
+    "basic" : lambda images: {
+        "basic" : {"title" : "Title", "subtitle" : "Subtitle", "extra" : "Extra"},
+    },
+    "text" : lambda images: {
+        "detail" : {
+            "faces" : {"grid" : [1, 6], "features" : _text_features(6)},
+            "sides" : {"grid" : [1, 3], "features" : _text_features(3)},
+            "ends" : {"grid" : [1, 2], "features" : _text_features(2)},
+        },
+    },
+    "image" : lambda images: {
+        "common" : {"image_source" : images},
+        "detail" : {
+            "faces" : {"grid" : [2, 2], "features" : [
+                {"type" : "image", "place" : [x, y], "options" : {"image" : "logo.png"}} for x in (1, 2) for y in (1, 2)]},
+            "sides" : {"features" : [{"type" : "image", "options" : {"image" : "photo.jpg"}}]},
+            "ends" : {"features" : [{"type" : "image", "options" : {"image" : "logo.png"}}]},
+        },
+    },
+    "backgrounds" : lambda images: {
+        "common" : {"image_source" : images},
+        "background" : {"image" : "photo.jpg"},
+        "detail" : {
+            "front" : {"background" : {"image" : "photo.jpg"}},
+            "back" : {"background" : {"color" : "#204080"}},
+            "sides" : {"background" : {"color" : "#802040"}},
+            "ends" : {"background" : {"image" : "logo.png"}},
+        },
+    },
+}
+
+
+def make_images(path : str) -> None:
+    """Write the images used by the image and background loads."""
+    photo = Image.merge("RGB", [Image.effect_noise((600, 450), sigma) for sigma in (40, 60, 80)])
+    photo.resize((2400, 1800)).save(os.path.join(path, "photo.jpg"), quality=90)
+    logo = Image.radial_gradient("L").resize((800, 800))
+    Image.merge("RGBA", [logo, logo.rotate(90), logo.rotate(180), logo]).save(os.path.join(path, "logo.png"))
+
+
+def case_name(stage : str, mix : str, dimensions : str, resolution : int) -> str:
+    return f"{stage}/{mix}/{dimensions}/{resolution}"
+
+
+def cases(resolutions : list[int], selected : str = "") -> Iterator[tuple[str, str, int]]:
+    """Feature load, box size and resolution of every case, filtered by name."""
+    for mix in MIXES:
+        for dimensions in DIMENSIONS:
+            for resolution in resolutions:
+                if any(selected in case_name(stage, mix, dimensions, resolution) for stage in STAGES):
+                    yield mix, dimensions, resolution
+
+
+def clear_caches() -> None:
+    """Drop loaded fonts, decoded images and drawn section shapes."""
+    FontCache.clear()
+    AssetCache.clear()
+    clear_shape_cache()
+
+
+def sample(func : Callable[[], Any], repeat : int, min_time : float = 0.1) -> list[float]:
+    """Seconds per call for each of repeat samples.
+
+    Calls that are too quick to time alone are looped until a sample
+    takes at least min_time.
+    """
+    number = 1
+    while True:
+        clear_caches()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 10
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        clear_caches()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return times
+
+
+def summary(times : list[float]) -> dict:
+    return {
+        "min" : min(times),
+        "median" : statistics.median(times),
+        "mean" : statistics.fmean(times),
+        "times" : times,
+    }
+
+
+def run(resolutions : list[int], repeat : int, selected : str = "", names : Optional[set[str]] = None) -> dict:
+    """Run the selected cases and return the results document."""
+    results : dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as images:
+        make_images(images)
+        for mix, dimensions, resolution in cases(resolutions, selected):
+            data = {"dimensions" : DIMENSIONS[dimensions], **MIXES[mix](images)}
+            data.setdefault("common", {})["resolution"] = resolution
+            config = BoxConfig(data)
+            box = Box(config)
+            stages = {
+                "parse" : lambda: BoxConfig(data),
+                "layout" : lambda: Box(config),
+                "generate" : lambda: box.generate(),
+            }
+            for stage, func in stages.items():
+                name = case_name(stage, mix, dimensions, resolution)
+                if selected not in name or (names is not None and name not in names):
+                    continue
+                results[name] = summary(sample(func, repeat))
+                print(f"{name:36}{results[name]['min'] * 1000:12.3f} ms", file=sys.stderr)
+
+    return {
+        "meta" : {
+            "created" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python" : platform.python_version(),
+            "pillow" : PIL.__version__,
+            "platform" : platform.platform(),
+            "cpus" : os.cpu_count(),
+            "repeat" : repeat,
+        },
+        "results" : results,
+    }
+
+
+def compare(baseline : dict, current : dict, threshold : float) -> bool:
+    """Print the change of every case, returning True if any regressed.
+
+    Cases are compared on their fastest sample, the one least affected
+    by other work on the machine.
+    """
+    regressed = False
+    print(f"{'case':36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            print(f"{name:36}{base['min'] * 1000:12.3f}{'missing':>12}")
+            continue
+        now = current["results"][name]
+        change = now["min"] / base["min"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:36}{base['min'] * 1000:12.3f}{now['min'] * 1000:12.3f}{change:+10.1%}{flag}")
+    for name in current["results"].keys() - baseline["results"].keys():
+        print(f"{name:36}{'new':>12}{current['results'][name]['min'] * 1000:12.3f}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the suite and write the results as JSON.')
+    run_parser.add_argument('-o', '--output', default='benchmark.json', help='Results file.')
+    run_parser.add_argument('-r', '--repeat', type=int, default=3, help='Samples per case.')
+    run_parser.add_argument('-k', dest='selected', default='', help='Only run cases with this text in their name.')
+    run_parser.add_argument('--resolutions', type=int, nargs='+', default=RESOLUTIONS, help='Resolutions to render at.')
+    run_parser.add_argument('--quick', action='store_true', help=f'Only render at {QUICK_RESOLUTIONS} with a single sample.')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare results against a baseline.')
+    compare_parser.add_argument('baseline', help='Baseline results file.')
+    compare_parser.add_argument('current', nargs='?', default=None,
+                    help='Results to compare. Runs the baseline cases again if not given.')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=10,
+                    help='Slowdown in percent above which a case counts as a regression.')
+    compare_parser.add_argument('-r', '--repeat', type=int, default=None,
+                    help='Samples per case when running the cases again. Defaults to the baseline setting.')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        resolutions = QUICK_RESOLUTIONS if args.quick else args.resolutions
+        repeat = 1 if args.quick else args.repeat
+        results = run(resolutions, repeat, args.selected)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Wrote {len(results['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current is None:
+        names = set(baseline["results"])
+        resolutions = sorted({int(name.rsplit("/", 1)[1]) for name in names})
+        current = run(resolutions, args.repeat or baseline["meta"]["repeat"], names=names)
+    else:
+        with open(args.current) as f:
+            current = json.load(f)
+    return 1 if compare(baseline, current, args.threshold / 100) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""CLI cold start benchmark
+
+Times fresh interpreters importing the package and running the CLI up
+to the point where no rendering is needed, and fails if the time they
+add on top of a bare interpreter goes over budget. Scripts call the
+CLI many times over, so this is time paid on every call.
+
+    python benchmarks/bench_startup.py [--runs N] [--scale F]
+
+Budgets are in milliseconds above `python -c pass`; --scale loosens or
+tightens all of them for slower or faster machines. Exits with status
+1 if any command is over budget.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BAD_CONFIG = "dimensions:\n  width: 2.5\n  height: 3.5\n"
+
+# Name, interpreter arguments and budget in milliseconds.
+COMMANDS = [
+    ("import", ["-c", "import bgboxmaker"], 80),
+    ("help", ["-m", "bgboxmaker", "--help"], 100),
+    ("invalid config", ["-m", "bgboxmaker", "-f", "bad.yaml"], 120),
+]
+
+
+def cold_start(args : list[str], runs : int, cwd : str) -> float:
+    """Median wall time of a fresh interpreter in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15, help='Interpreter starts per command.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget by this factor.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cwd:
+        with open(f"{cwd}/bad.yaml", "w") as f:
+            f.write(BAD_CONFIG)
+
+        base = cold_start(["-c", "pass"], args.runs, cwd)
+        print(f"{'interpreter':16}{base:8.1f} ms")
+        over = False
+        for name, command, budget in COMMANDS:
+            budget *= args.scale
+            cost = cold_start(command, args.runs, cwd) - base
+            status = "ok" if cost <= budget else "OVER BUDGET"
+            over = over or cost > budget
+            print(f"{name:16}{cost:+8.1f} ms  budget {budget:6.1f} ms  {status}")
+
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
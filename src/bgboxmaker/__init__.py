@@ -1,8 +1,36 @@
 """Tuck box generator
 
 Generates a tuck box as specified by provided configuration file.
+
+The configuration model is imported with the package. The view layer,
+and Pillow with it, is only imported the first time one of its names
+is used, so reading and checking configuration starts quickly.
 """
 
+from importlib import import_module
+from typing import TYPE_CHECKING
 from bgboxmaker.dim import Dim, Vec2, Vec3
 from bgboxmaker.model import *
-from bgboxmaker.view import *
\ No newline at end of file
+
+if TYPE_CHECKING:
+    from bgboxmaker.view import *
+
+# Names provided by bgboxmaker.view, imported on first use.
+_VIEW_NAMES = frozenset([
+    "CacheInfo", "FontCache", "AssetCache", "RenderCache", "DiskCache",
+    "Feature", "ImageFeature", "PanelFeature", "TextFeature",
+    "BackgroundRenderer", "FeatureGrid", "Section", "PNGStreamWriter",
+    "Box", "Sheet", "impose", "PDFWriter", "PDFRenderer",
+])
+
+
+def __getattr__(name : str):
+    if name in _VIEW_NAMES:
+        value = getattr(import_module("bgboxmaker.view"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _VIEW_NAMES)
@@ -0,0 +1,185 @@
+"""Batch rendering
+
+Renders many box configuration files in one process, spreading the
+work over a pool of worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from bgboxmaker.instrument import Recorder, recording, span
+from bgboxmaker.model import BoxConfig, FontConfig
+from bgboxmaker.view import Box, FontCache, RenderCache, DiskCache
+from PIL import Image
+import logging
+import os
+import time
+import yaml
+logger = logging.getLogger(__name__)
+
+
+class BatchResult:
+    """Outcome of rendering a single file in a batch.
+
+    Attributes
+    ----------
+    filename : str
+        The YAML data file that was rendered.
+    output : str
+        The image file written for the data file.
+    seconds : float
+        Wall time spent loading, rendering and writing the file.
+    error : str
+        Description of the failure, empty if the render succeeded.
+    """
+
+    def __init__(self, filename : str, output : str, seconds : float = 0, error : str = ""):
+        self.filename : str = filename
+        self.output : str = output
+        self.seconds : float = seconds
+        self.error : str = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error == ""
+
+    def __repr__(self) -> str:
+        if self.ok:
+            status = f"ok -> {self.output}"
+        else:
+            status = f"FAILED: {self.error}"
+        return f"{self.filename}  {self.seconds:.2f}s  {status}"
+
+
+def load_config(filename : str) -> BoxConfig:
+    """Load a YAML data file into a box configuration."""
+    with span("load"), open(filename, 'r') as f:
+        data = yaml.load(f, Loader=yaml.SafeLoader)
+    with span("config"):
+        return BoxConfig(data)
+
+
+def output_path(filename : str, output_dir : Optional[str], format : str) -> str:
+    """Build the output file name for a data file."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    if output_dir is None:
+        output_dir = os.path.dirname(filename)
+    return os.path.join(output_dir, f"{stem}.{format.lower()}")
+
+
+def check_outputs(filenames : list[str], outputs : list[str]) -> None:
+    """Raise ValueError if two data files would be written to the same output."""
+    seen : dict[str, str] = {}
+    for filename, output in zip(filenames, outputs):
+        target = os.path.normcase(os.path.abspath(output))
+        if target in seen:
+            msg = f"{seen[target]} and {filename} would both be written to {output}."
+            logger.error(msg)
+            raise ValueError(msg)
+        seen[target] = filename
+
+
+def render_file(filename : str, output : str, format : Optional[str] = None, cache_dir : Optional[str] = None) -> BatchResult:
+    """Render a single data file, capturing any failure in the result.
+
+    With a cache_dir, renders are reused from and added to the disk
+    cache in that directory.
+    """
+    start = time.perf_counter()
+    try:
+        with span("box", "box", {"file" : filename}):
+            config = load_config(filename)
+            with span("layout"):
+                box = Box(config)
+            if cache_dir is not None:
+                # Only the disk is used, renders are not shared between files.
+                box.cache = RenderCache(0, DiskCache(cache_dir))
+            box.render_to(output, format)
+    except Exception as e:
+        logger.error("Failed to render %s: %s", filename, e)
+        error = str(e) or type(e).__name__
+        return BatchResult(filename, output, time.perf_counter() - start, error)
+    return BatchResult(filename, output, time.perf_counter() - start)
+
+
+def _render_file_recorded(filename : str, output : str, format : Optional[str], cache_dir : Optional[str], memory : bool) -> tuple[BatchResult, dict]:
+    """Render a data file in a worker process, returning the spans recorded with the result."""
+    with Recorder(memory=memory) as recorder:
+        result = render_file(filename, output, format, cache_dir)
+    return result, recorder.as_dict()
+
+
+def _warm_worker() -> None:
+    """Prepare a worker process before it takes its first file."""
+    # Load all image format plugins up front rather than on the first save.
+    Image.init()
+
+    # Resolve and load the default font once for the whole worker.
+    font = FontConfig()
+    try:
+        FontCache.get(font.name, font.size)
+    except OSError:
+        logger.warning("Unable to preload default font %s.", font.name)
+
+
+def run_batch(filenames : list[str], jobs : Optional[int] = None, output_dir : Optional[str] = None, format : str = "png", cache_dir : Optional[str] = None) -> list[BatchResult]:
+    """Render every data file, one output per input.
+
+    Files are rendered across a pool of `jobs` worker processes, or
+    in this process when `jobs` is 1. Results are returned in input
+    order, and a failing file does not stop the rest of the batch.
+    With a cache_dir, unchanged files and sections are taken from the
+    disk cache in that directory. The output_dir is created if it is
+    missing. Raises ValueError before rendering anything if two files
+    would be written to the same output.
+    """
+    outputs = [output_path(filename, output_dir, format) for filename in filenames]
+    check_outputs(filenames, outputs)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    with span("batch"):
+        if jobs == 1:
+            _warm_worker()
+            results = [render_file(filename, output, format, cache_dir) for filename, output in zip(filenames, outputs)]
+        else:
+            results = _run_pool(filenames, outputs, jobs, format, cache_dir)
+    if cache_dir is not None:
+        # Workers only trim the cache after adding a lot to it.
+        DiskCache(cache_dir).trim()
+    return results
+
+
+def _run_pool(filenames : list[str], outputs : list[str], jobs : Optional[int], format : str, cache_dir : Optional[str]) -> list[BatchResult]:
+    """Render the data files across a pool of worker processes."""
+    # Recording does not cross into the workers, so when recording they
+    # record on their own and send their spans back with the result.
+    recorder = recording()
+    results : list[BatchResult] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker) as executor:
+        if recorder is None:
+            futures = [executor.submit(render_file, filename, output, format, cache_dir) for filename, output in zip(filenames, outputs)]
+        else:
+            futures = [executor.submit(_render_file_recorded, filename, output, format, cache_dir, recorder.memory)
+                       for filename, output in zip(filenames, outputs)]
+        for filename, output, future in zip(filenames, outputs, futures):
+            try:
+                if recorder is None:
+                    results.append(future.result())
+                else:
+                    result, spans = future.result()
+                    recorder.merge(spans)
+                    results.append(result)
+            except Exception as e:
+                # The worker itself failed, e.g. the pool was broken.
+                logger.error("Worker failed while rendering %s: %s", filename, e)
+                results.append(BatchResult(filename, output, 0, str(e) or type(e).__name__))
+    return results
+
+
+def format_summary(results : list[BatchResult]) -> str:
+    """Build a per-file summary of a batch run."""
+    lines = [f"{result}" for result in results]
+    failed = len([result for result in results if not result.ok])
+    total = sum(result.seconds for result in results)
+    lines.append(f"{len(results)} files, {failed} failed, {total:.2f}s render time")
+    return "\n".join(lines)
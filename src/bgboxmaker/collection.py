@@ -0,0 +1,89 @@
+"""Collection output
+
+Renders a whole collection of box configuration files into a single
+multi-page PDF, writing each page as soon as it is rendered.
+"""
+
+from typing import Optional, Union
+from bgboxmaker.batch import BatchResult, load_config
+from bgboxmaker.instrument import span
+from bgboxmaker.view import Box, Sheet, PDFRenderer, PDFWriter, impose
+from PIL import Image
+import logging
+import time
+logger = logging.getLogger(__name__)
+
+
+def _flatten(page : Image.Image) -> Image.Image:
+    """Flatten a page onto white paper for printing."""
+    flat = Image.new("RGB", page.size, "white")
+    flat.paste(page, mask=page)
+    return flat
+
+
+def _load_boxes(filenames : list[str], output : str) -> tuple[list[tuple[str, Box]], list[BatchResult]]:
+    """Load every data file, keeping failures as results."""
+    boxes : list[tuple[str, Box]] = []
+    failures : list[BatchResult] = []
+    for filename in filenames:
+        start = time.perf_counter()
+        try:
+            with span("box", "box", {"file" : filename}):
+                config = load_config(filename)
+                with span("layout"):
+                    boxes.append((filename, Box(config)))
+        except Exception as e:
+            logger.error("Failed to load %s: %s", filename, e)
+            failures.append(BatchResult(filename, output, time.perf_counter() - start, str(e) or type(e).__name__))
+    return boxes, failures
+
+
+def render_collection(filenames : list[str], output : str, vector : bool = False, sheets : bool = False, gutter : Optional[int] = None, workers : int = 1) -> list[BatchResult]:
+    """Render every data file as the pages of a single PDF.
+
+    Each box is written as its own page, or with `sheets` the boxes
+    are packed onto shared sheets first. Pages are written to the file
+    as soon as they are rendered and then dropped, so memory use does
+    not grow with the size of the collection. With `vector` each box
+    is written as vector shapes and text instead of an image.
+
+    Results are returned per page, after any files that failed to
+    load. A page that fails to render is left out of the PDF and does
+    not stop the rest of the collection.
+    """
+    if vector and sheets:
+        msg = "Vector output can not be combined with sheets."
+        logger.error(msg)
+        raise ValueError(msg)
+
+    boxes, results = _load_boxes(filenames, output)
+    # Label, page and resolution of each page to write.
+    pages : list[tuple[str, Union[Box, Sheet], int]] = []
+    if sheets:
+        labels = {id(box): filename for filename, box in boxes}
+        for sheet in impose([box for _, box in boxes], gutter):
+            pages.append((", ".join(labels[id(box)] for box, _ in sheet.boxes), sheet, sheet.resolution))
+    else:
+        pages = [(filename, box, box.config.common.resolution) for filename, box in boxes]
+
+    with open(output, "wb") as fp:
+        writer = PDFWriter(fp)
+        for label, page, resolution in pages:
+            start = time.perf_counter()
+            try:
+                with span("page", "box", {"file" : label}):
+                    if isinstance(page, Box) and vector:
+                        PDFRenderer(page).add_page(writer)
+                    else:
+                        image = _flatten(page.generate(workers))
+                        with span("save"):
+                            writer.add_image_page(image, resolution)
+                        del image
+            except Exception as e:
+                logger.error("Failed to render %s: %s", label, e)
+                results.append(BatchResult(label, output, time.perf_counter() - start, str(e) or type(e).__name__))
+                continue
+            results.append(BatchResult(label, f"{output} page {writer.pages}", time.perf_counter() - start))
+        writer.close()
+
+    return results
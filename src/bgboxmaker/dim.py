@@ -1,8 +1,11 @@
-from typing import TypeVar, cast
+from operator import itemgetter
+from typing import TypeVar
 """Collection of various helper classes."""
 T = TypeVar('T', int, float)
 
 class Vec2:
+    __slots__ = ("x", "y")
+
     def __init__(self, value : list[int] = [0,0]):
         self.x = int(value[0])
         self.y = int(value[1])
@@ -17,51 +20,29 @@ class Vec2:
         yield self.y
 
 
-class Dim(list[T]):
-    def __init__(self, *args):
-        inputs : list[T] = list(args)
-        if len(inputs) > 0 and isinstance(inputs[0], list):
-            inputs = inputs[0]
-        while len(inputs) < 3:
-            inputs.append(cast(T, 0))
-        super().__init__(inputs)
+class Dim(tuple[T, T, T]):
+    """Immutable x, y, z triple for sizes and positions.
 
-    @property
-    def x(self) -> T:
-        return self[0]
-    @x.setter
-    def x(self, value: T) -> None:
-        self[0] = value
-    @property
-    def w(self) -> T:
-        return self[0]
-    @w.setter
-    def w(self, value : T) -> None:
-        self[0] = value
-    @property
-    def y(self) -> T:
-        return self[1]
-    @y.setter
-    def y(self, value: T) -> None:
-        self[1] = value
-    @property
-    def h(self) -> T:
-        return self[1]
-    @h.setter
-    def h(self, value : T) -> None:
-        self[1] = value
-    @property
-    def z(self) -> T:
-        return self[2]
-    @z.setter
-    def z(self, value: T) -> None:
-        self[2] = value
-    @property
-    def d(self) -> T:
-        return self[2]
-    @d.setter
-    def d(self, value : T) -> None:
-        self[2] = value
+    Built from up to three values, or from a single list or tuple of
+    them, with missing values set to 0. Being a tuple, a Dim can be
+    unpacked, hashed and passed straight to Pillow. Changing a value
+    means creating a new Dim, so a Dim can be shared freely.
+    """
+    __slots__ = ()
+
+    def __new__(cls, x = 0, y = 0, z = 0):
+        if type(x) is not int and isinstance(x, (list, tuple)):
+            x, y, z = (*x, 0, 0, 0)[:3]
+        return tuple.__new__(cls, (x, y, z))
+
+    # itemgetter keeps attribute access in C, Dims are read constantly
+    # while laying out a box.
+    x = property(itemgetter(0))
+    w = property(itemgetter(0))
+    y = property(itemgetter(1))
+    h = property(itemgetter(1))
+    z = property(itemgetter(2))
+    d = property(itemgetter(2))
 
     @property
     def wh(self) -> tuple[T, T]:
@@ -72,20 +53,17 @@ class Dim(list[T]):
         return (self[0], self[1])
 
 
+    def __mul__(self, value : T) -> "Dim":
+        return tuple.__new__(Dim, (self[0] * value, self[1] * value, self[2] * value))
 
-    def __mul__(self, value : T):
-        newDim = Dim()
-        for i in range(0, len(self)):
-            newDim[i] = cast(T, self[i] * value)
-        return newDim
+    __rmul__ = __mul__
 
-    def as_ints(self):
-        newDim = Dim()
-        for i in range(0, len(self)):
-            newDim[i] = int(self[i])
-        return newDim
+    def as_ints(self) -> "Dim":
+        return tuple.__new__(Dim, (int(self[0]), int(self[1]), int(self[2])))
 
 class Vec3:
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, value : list[int] = [0, 0, 0]):
         self.x = int(value[0])
         self.y = int(value[1])
@@ -100,5 +78,3 @@ class Vec3:
         yield self.x
         yield self.y
         yield self.z
-
-
@@ -0,0 +1,473 @@
+"""Instrumentation
+
+Opt-in timing of the stages of a render. Work is wrapped in spans,
+which cost almost nothing unless a Recorder is active:
+
+    with Recorder() as recorder:
+        box.generate()
+    print(format_timings(recorder))
+
+Each span records its wall time, the CPU time of the thread it ran on
+and the number of pixels it produced, and knows the span it was
+started in. Recording follows the context, so spans started from
+worker threads are only recorded if the work was handed over with
+in_context().
+
+A Recorder created with memory=True also records the memory used by
+each span: the peak of the Python heap as traced by tracemalloc, and
+the bytes held by live Pillow images, which tracemalloc can not see.
+Both are process wide, so spans running at the same time on other
+threads are included.
+
+Spans can carry tags, such as the box file or section they work on,
+and spans recorded in other processes can be merged into a recorder.
+write_trace() writes the spans as a Chrome trace, to be viewed in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+
+from contextvars import ContextVar, copy_context
+from itertools import count
+from typing import Any, Callable, Optional
+import gc
+import os
+import sys
+import threading
+import time
+
+_recorder : ContextVar[Optional["Recorder"]] = ContextVar("bgboxmaker_recorder", default=None)
+_parent : ContextVar[Optional["Span"]] = ContextVar("bgboxmaker_span", default=None)
+
+
+def _pixel_size(mode : str) -> int:
+    """Bytes Pillow stores per pixel for an image mode."""
+    if mode in ("1", "L", "P"):
+        return 1
+    if mode.startswith("I;16"):
+        return 2
+    # Every other mode, including two and three band ones, is stored
+    # in four bytes per pixel.
+    return 4
+
+
+def live_image_bytes() -> int:
+    """Bytes held by the pixel data of every live Pillow image.
+
+    Found by walking the objects tracked by the garbage collector, so
+    this takes a few milliseconds.
+    """
+    # Only look for images if Pillow has been loaded, this module must
+    # not load it.
+    module = sys.modules.get("PIL.Image")
+    if module is None:
+        return 0
+    image_class = module.Image
+    seen : set[int] = set()
+    total = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, image_class):
+            # Pillow 11 keeps the core image in _im, earlier versions in im.
+            core = obj.__dict__.get("_im", obj.__dict__.get("im"))
+            if core is None or id(core) in seen:
+                continue
+            seen.add(id(core))
+            total += obj.width * obj.height * _pixel_size(obj.mode)
+    return total
+
+
+class Span:
+    """A single timed piece of work.
+
+    Attributes
+    ----------
+    id : int
+        Identifier, unique within the recorder.
+    parent : int
+        Identifier of the span this one was started in, None at the top.
+    name : str
+        What was done, such as a stage, section or feature name.
+    category : str
+        Kind of work, "stage", "section" or "feature".
+    thread : str
+        Name of the thread the span ran on.
+    start : float
+        Start time in seconds, relative to the start of the recorder.
+    wall : float
+        Elapsed time in seconds.
+    cpu : float
+        CPU time used by the span's thread in seconds. Work handed to
+        other threads is counted in their own spans.
+    pixels : int
+        Pixels in the images the span produced.
+    traced_peak : int
+        Highest traced Python memory while the span ran, in bytes.
+        Only recorded with memory accounting.
+    image_bytes : int
+        Bytes held by live images when the span finished. Only
+        recorded with memory accounting.
+    image_peak : int
+        Highest image_bytes of the span and every span finished while
+        it ran. Only recorded with memory accounting.
+    pid : int
+        Process the span ran in.
+    args : dict
+        Tags describing the work, such as the file or section, also
+        applying to the spans started in this one.
+
+    Methods
+    -------
+
+    add_pixels(image : Image) -> None
+        Adds the pixels of an image to the span.
+    """
+
+    __slots__ = ("id", "parent", "name", "category", "thread", "start", "wall", "cpu", "pixels",
+                 "traced_peak", "image_bytes", "image_peak", "pid", "args", "_recorder", "_token", "_cpu_start")
+
+    _FIELDS = ("id", "parent", "name", "category", "thread", "start", "wall", "cpu",
+               "pixels", "traced_peak", "image_bytes", "image_peak", "pid", "args")
+
+    def __init__(self, recorder : "Recorder", name : str, category : str, args : Optional[dict] = None):
+        self._recorder : Recorder = recorder
+        self.id : int = next(recorder._ids)
+        self.name : str = name
+        self.category : str = category
+        self.parent : Optional[int] = None
+        self.thread : str = ""
+        self.start : float = 0
+        self.wall : float = 0
+        self.cpu : float = 0
+        self.pixels : int = 0
+        self.traced_peak : int = 0
+        self.image_bytes : int = 0
+        self.image_peak : int = 0
+        self.pid : int = recorder.pid
+        self.args : dict = args or {}
+
+    def __enter__(self) -> "Span":
+        parent = _parent.get()
+        self.parent = parent.id if parent is not None else None
+        self.thread = threading.current_thread().name
+        self._token = _parent.set(self)
+        if self._recorder.memory:
+            self._recorder._open(self)
+        self._cpu_start = time.thread_time()
+        self.start = time.perf_counter() - self._recorder.origin
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall = time.perf_counter() - self._recorder.origin - self.start
+        self.cpu = time.thread_time() - self._cpu_start
+        _parent.reset(self._token)
+        if self._recorder.memory:
+            self._recorder._close(self)
+        self._recorder._add(self)
+
+    def add_pixels(self, image : Any) -> None:
+        """Add the pixels of an image to the span."""
+        self.pixels += image.width * image.height
+
+    def as_dict(self) -> dict:
+        return {key : getattr(self, key) for key in self._FIELDS}
+
+
+class _NullSpan:
+    """Stand in for Span when nothing is recording."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def add_pixels(self, image : Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """Collects the spans finished while it is active.
+
+    Attributes
+    ----------
+    spans : list[Span]
+        Finished spans, in the order they finished.
+    origin : float
+        perf_counter() time that span start times are relative to.
+    memory : bool
+        True if spans record memory use as well as time.
+    pid : int
+        Process the recorder was created in.
+
+    Methods
+    -------
+
+    __enter__() / __exit__()
+        Start and stop recording in the current context. With memory
+        accounting, tracemalloc is started if it is not running, and
+        stopped again at the end.
+
+    as_dict() -> dict
+        Returns the spans in a form that can be written as JSON.
+
+    merge(data : dict) -> None
+        Adds the spans of another recorder, given as returned by its
+        as_dict(), below the current span.
+    """
+
+    def __init__(self, listener : Optional[Callable[[Span], None]] = None, memory : bool = False):
+        self.__listener : Optional[Callable[[Span], None]] = listener
+        self.__memory : bool = memory
+        self.__spans : list[Span] = []
+        self.__token = None
+        self.__parent_token = None
+        self.__started_tracing : bool = False
+        # Spans still running, and the peak traced memory each has
+        # seen so far. Only kept with memory accounting.
+        self.__open : dict[Span, int] = {}
+        self.__lock = threading.Lock()
+        self._ids = count()
+        self.origin : float = time.perf_counter()
+        self.pid : int = os.getpid()
+
+    @property
+    def spans(self) -> list[Span]:
+        return self.__spans
+
+    @property
+    def memory(self) -> bool:
+        return self.__memory
+
+    def _add(self, span : Span) -> None:
+        self.__spans.append(span)
+        if self.__listener is not None:
+            self.__listener(span)
+
+    def _open(self, span : Span) -> None:
+        """Start the memory accounting of a span."""
+        import tracemalloc
+        with self.__lock:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is shared by the whole process, so hand the peak
+            # so far to every running span before starting a new one.
+            for other in self.__open:
+                self.__open[other] = max(self.__open[other], peak)
+            tracemalloc.reset_peak()
+            self.__open[span] = current
+
+    def _close(self, span : Span) -> None:
+        """Finish the memory accounting of a span."""
+        import tracemalloc
+        images = live_image_bytes()
+        with self.__lock:
+            _, peak = tracemalloc.get_traced_memory()
+            span.traced_peak = max(self.__open.pop(span), peak)
+            span.image_bytes = images
+            span.image_peak = max(span.image_peak, images)
+            for other in self.__open:
+                other.image_peak = max(other.image_peak, images)
+
+    def __enter__(self) -> "Recorder":
+        if self.__memory:
+            # Imported here as it is slow to load and only needed with
+            # memory accounting, this module is loaded on every start.
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.__started_tracing = True
+        self.__token = _recorder.set(self)
+        # Spans of a new recorder start at the top, even when it is
+        # entered inside a span, or in a worker forked while one ran.
+        self.__parent_token = _parent.set(None)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _parent.reset(self.__parent_token)
+        _recorder.reset(self.__token)
+        if self.__started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    def as_dict(self) -> dict:
+        return {"origin" : self.origin, "pid" : self.pid, "spans" : [span.as_dict() for span in self.__spans]}
+
+    def merge(self, data : dict) -> None:
+        """Add the spans of another recorder, such as one in a worker process."""
+        # perf_counter() uses the same clock in every process on the
+        # machine, so only the origins need lining up.
+        offset = data["origin"] - self.origin
+        parent = _parent.get()
+        ids : dict[int, int] = {}
+        merged : list[tuple[Span, Optional[int]]] = []
+        for item in data["spans"]:
+            span = Span(self, item["name"], item["category"], item["args"])
+            ids[item["id"]] = span.id
+            for key in ("thread", "wall", "cpu", "pixels", "traced_peak", "image_bytes", "image_peak", "pid"):
+                setattr(span, key, item[key])
+            span.start = item["start"] + offset
+            merged.append((span, item["parent"]))
+        for span, old_parent in merged:
+            # Top level spans of the other recorder go below the current span.
+            span.parent = ids.get(old_parent, parent.id if parent is not None else None)
+            self._add(span)
+
+
+def span(name : str, category : str = "stage", args : Optional[dict] = None):
+    """Return a context manager timing the work in its block.
+
+    args tags the span and the spans started in it, such as with the
+    file being rendered. If no Recorder is active the block is not
+    timed.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return Span(recorder, name, category, args)
+
+
+def recording() -> Optional[Recorder]:
+    """Return the active Recorder, None if nothing is recording."""
+    return _recorder.get()
+
+
+def in_context(func : Callable) -> Callable:
+    """Wrap func to run in a copy of the current context.
+
+    Used when handing work to other threads, so that spans started by
+    the work are recorded and attached to the current span.
+    """
+    context = copy_context()
+    return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
+
+
+def peak_rss() -> Optional[int]:
+    """Highest resident memory of the process so far in bytes, None where unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_timings(recorder : Recorder) -> str:
+    """Format the recorded spans as a table.
+
+    Spans with the same name under the same parents are added up, and
+    shown indented below their parent in the order they first started.
+    With memory accounting, the highest memory use of the spans in
+    each row is shown as well.
+    """
+    spans = {span.id : span for span in recorder.spans}
+    rows : dict[tuple, list] = {}
+    for span in sorted(recorder.spans, key=lambda span: span.start):
+        path = [span.name]
+        parent = span.parent
+        while parent is not None and parent in spans:
+            path.append(spans[parent].name)
+            parent = spans[parent].parent
+        key = tuple(reversed(path))
+        row = rows.setdefault(key, [0, 0.0, 0.0, 0, 0, 0])
+        row[0] += 1
+        row[1] += span.wall
+        row[2] += span.cpu
+        row[3] += span.pixels
+        row[4] = max(row[4], span.traced_peak)
+        row[5] = max(row[5], span.image_peak)
+
+    # Rows were added in start order, and parents start before their
+    # children, so walking the tree in that order keeps it.
+    children : dict[tuple, list[tuple]] = {}
+    for key in rows:
+        children.setdefault(key[:-1] if key[:-1] in rows else (), []).append(key)
+    ordered : list[tuple] = []
+    def visit(parent : tuple) -> None:
+        for key in children.get(parent, []):
+            ordered.append(key)
+            visit(key)
+    visit(())
+
+    width = max((2 * (len(key) - 1) + len(key[-1]) for key in rows), default=5)
+    header = f"{'stage':{width}}  {'count':>5}  {'wall ms':>10}  {'cpu ms':>10}  {'Mpixels':>8}"
+    if recorder.memory:
+        header += f"  {'heap MB':>8}  {'image MB':>8}"
+    lines = [header]
+    for key in ordered:
+        calls, wall, cpu, pixels, traced, images = rows[key]
+        label = "  " * (len(key) - 1) + key[-1]
+        line = f"{label:{width}}  {calls:>5}  {wall * 1000:>10.2f}  {cpu * 1000:>10.2f}  {pixels / 1e6:>8.2f}"
+        if recorder.memory:
+            line += f"  {traced / 1e6:>8.1f}  {images / 1e6:>8.1f}"
+        lines.append(line)
+
+    if recorder.memory:
+        rss = peak_rss()
+        if rss is not None:
+            lines.append(f"Peak resident memory of the process: {rss / 1e6:.1f} MB")
+    return "\n".join(lines)
+
+
+def write_timings(recorder : Recorder, path : str) -> None:
+    """Write the recorded spans to a JSON file."""
+    import json
+    with open(path, "w") as f:
+        json.dump(recorder.as_dict(), f, indent=1)
+
+
+def trace_events(recorder : Recorder) -> list[dict]:
+    """Convert the recorded spans to Chrome trace events.
+
+    Each span becomes a complete event, tagged with its own and its
+    parents' args. Processes other than the recorder's are named as
+    numbered workers, and threads are numbered within their process.
+    """
+    spans = {span.id : span for span in recorder.spans}
+    ordered = sorted(recorder.spans, key=lambda span: span.start)
+    workers : dict[int, int] = {}
+    threads : dict[tuple[int, str], int] = {}
+    events : list[dict] = []
+    for span in ordered:
+        if span.pid != recorder.pid:
+            workers.setdefault(span.pid, len(workers) + 1)
+        thread = (span.pid, span.thread)
+        if thread not in threads:
+            threads[thread] = sum(1 for pid, _ in threads if pid == span.pid) + 1
+        tid = threads[thread]
+
+        args : dict = {}
+        parent = span.parent
+        while parent is not None and parent in spans:
+            args = {**spans[parent].args, **args}
+            parent = spans[parent].parent
+        args.update(span.args)
+        if span.pid in workers:
+            args["worker"] = workers[span.pid]
+        args["cpu_ms"] = round(span.cpu * 1000, 3)
+        if span.pixels:
+            args["pixels"] = span.pixels
+        if recorder.memory:
+            args["heap_bytes"] = span.traced_peak
+            args["image_bytes"] = span.image_peak
+
+        events.append({"name" : span.name, "cat" : span.category, "ph" : "X",
+                       "ts" : round(span.start * 1e6, 3), "dur" : round(span.wall * 1e6, 3),
+                       "pid" : span.pid, "tid" : tid, "args" : args})
+
+    metadata = [{"name" : "process_name", "ph" : "M", "pid" : recorder.pid, "tid" : 0, "args" : {"name" : "bgboxmaker"}}]
+    metadata += [{"name" : "process_name", "ph" : "M", "pid" : pid, "tid" : 0, "args" : {"name" : f"worker {number}"}}
+                 for pid, number in workers.items()]
+    metadata += [{"name" : "thread_name", "ph" : "M", "pid" : pid, "tid" : tid, "args" : {"name" : thread}}
+                 for (pid, thread), tid in threads.items()]
+    return metadata + events
+
+
+def write_trace(recorder : Recorder, path : str) -> None:
+    """Write the recorded spans to a Chrome trace file."""
+    import json
+    with open(path, "w") as f:
+        json.dump({"traceEvents" : trace_events(recorder), "displayTimeUnit" : "ms"}, f)
@@ -1,18 +1,85 @@
 import argparse
 import logging
-import yaml
 import sys
 import os
-from bgboxmaker import Box, BoxConfig, ConfigurationError
-from PIL import Image, ImageDraw, ImageFont
+from typing import Optional
+from bgboxmaker import BoxConfig, ConfigurationError
+from bgboxmaker.instrument import span
+# Rendering modules pull in Pillow, they are imported by the commands
+# that need them so help and configuration errors stay fast.
+
+def positive_int(value : str) -> int:
+    """Parse a command line count that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
 
 def main():
     parser = argparse.ArgumentParser(description='Generate Tuck')
     parser.add_argument('-f', '--filename', help='YAML data file', default="")
     parser.add_argument('-s', '--sample', dest='sample', action='store_true',
                     help='Generate sample YAML with instructions.')
+    parser.add_argument('-o', '--output', help='Output image file. Shows a preview if not given.', default="")
+    parser.add_argument('--format', help='Output image format. Taken from the output file extension if not given.', default=None)
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                    help='Number of threads used to render box sections.')
+    parser.add_argument('--tile-height', dest='tile_height', type=int, default=0,
+                    help='Compose and write the page in strips of this many rows to limit memory use. PNG only.')
+    parser.add_argument('--vector', dest='vector', action='store_true',
+                    help='Write the output as a PDF with vector shapes and text.')
     parser.add_argument('-d', '--debug', dest='debug', action='store_true',
                     help='Activate debug log')
+    parser.add_argument('--timings', dest='timings', action='store_true',
+                    help='Print the time spent in each stage of the render.')
+    parser.add_argument('--timings-json', dest='timings_json', default=None,
+                    help='Write the time spent in each stage of the render to this JSON file.')
+    parser.add_argument('--memory', dest='memory', action='store_true',
+                    help='Record the memory used by each stage of the render with the timings. Slows the render down.')
+    parser.add_argument('--trace', dest='trace', default=None,
+                    help='Write a Chrome trace of the render to this file, for chrome://tracing or ui.perfetto.dev.')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true',
+                    help='Do not reuse or store renders in the render cache.')
+    parser.add_argument('--profile', dest='profile', default=None, metavar='PREFIX',
+                    help='Profile the run, writing PREFIX.pstats and PREFIX.collapsed stacks for flame graphs, and print the busiest functions.')
+
+    subparsers = parser.add_subparsers(dest='command')
+    batch_parser = subparsers.add_parser('batch', help='Render many YAML data files in one run.')
+    batch_parser.add_argument('files', nargs='+', help='YAML data files')
+    batch_parser.add_argument('-j', '--jobs', type=positive_int, default=None,
+                    help='Number of worker processes. Defaults to the number of CPUs.')
+    batch_parser.add_argument('-o', '--output-dir', dest='output_dir', default=None,
+                    help='Directory for output images. Defaults to the directory of each data file.')
+    batch_parser.add_argument('--format', help='Output image format.', default='png')
+
+    collection_parser = subparsers.add_parser('collection', help='Render many YAML data files as the pages of one PDF.')
+    collection_parser.add_argument('files', nargs='+', help='YAML data files')
+    collection_parser.add_argument('-o', '--output', required=True, help='Output PDF file.')
+    collection_parser.add_argument('--vector', dest='vector', action='store_true',
+                    help='Write each box with vector shapes and text.')
+    collection_parser.add_argument('--sheets', dest='sheets', action='store_true',
+                    help='Pack the boxes onto shared sheets, as with impose.')
+    collection_parser.add_argument('--gutter', type=int, default=None,
+                    help='Space between boxes on a sheet in pixels. Defaults to twice the cut line width.')
+
+    impose_parser = subparsers.add_parser('impose', help='Pack several boxes onto shared sheets.')
+    impose_parser.add_argument('files', nargs='+', help='YAML data files')
+    impose_parser.add_argument('-o', '--output', required=True,
+                    help='Output image file. Sheets are numbered, box.png is written as box-1.png, box-2.png and so on.')
+    impose_parser.add_argument('--format', help='Output image format. Taken from the output file extension if not given.', default=None)
+    impose_parser.add_argument('--gutter', type=int, default=None,
+                    help='Space between boxes in pixels. Defaults to twice the cut line width.')
+
+    watch_parser = subparsers.add_parser('watch', help='Render a YAML data file again every time it changes.')
+    watch_parser.add_argument('file', help='YAML data file')
+    watch_parser.add_argument('-o', '--output', required=True, help='Output image file, updated on every change.')
+    watch_parser.add_argument('--format', help='Output image format. Taken from the output file extension if not given.', default=None)
+    watch_parser.add_argument('--interval', type=float, default=0.5,
+                    help='Seconds between checks for changes.')
 
     args = parser.parse_args()
     if args.debug:
@@ -30,8 +97,100 @@ def main():
         filemode='w'
     )
 
+    if args.profile:
+        from bgboxmaker.profiling import Profiler
+        profiler = Profiler()
+        try:
+            with profiler:
+                run_recorded(args)
+        finally:
+            print(profiler.summary())
+            profiler.write(args.profile)
+    else:
+        run_recorded(args)
+
+
+def run_recorded(args : argparse.Namespace) -> None:
+    """Run the command, recording the spans of the render if asked to."""
+    if args.timings or args.timings_json or args.memory or args.trace:
+        from bgboxmaker.instrument import Recorder, format_timings, write_timings, write_trace
+        with Recorder(memory=args.memory) as recorder:
+            try:
+                run(args)
+            finally:
+                # The table is shown unless the spans only go to files.
+                if args.timings or not (args.timings_json or args.trace):
+                    print(format_timings(recorder))
+                if args.timings_json:
+                    write_timings(recorder, args.timings_json)
+                if args.trace:
+                    write_trace(recorder, args.trace)
+    else:
+        run(args)
+
+
+def cache_dir(args : argparse.Namespace) -> Optional[str]:
+    """Return the render cache directory, None if caching is turned off."""
+    if args.no_cache:
+        return None
+    from bgboxmaker.view import DiskCache
+    return os.environ.get("BGBOXMAKER_CACHE") or DiskCache.default_path()
+
+
+def run(args : argparse.Namespace) -> None:
+    """Run the command given on the command line."""
+    if args.command == 'batch':
+        from bgboxmaker.batch import run_batch, format_summary
+        try:
+            results = run_batch(args.files, args.jobs, args.output_dir, args.format, cache_dir(args))
+        except (ValueError, OSError) as e:
+            print(e)
+            sys.exit(1)
+        print(format_summary(results))
+        if all(result.ok for result in results):
+            sys.exit(0)
+        else:
+            sys.exit(1)
+
+    if args.command == 'collection':
+        from bgboxmaker.batch import format_summary
+        from bgboxmaker.collection import render_collection
+        results = render_collection(args.files, args.output, args.vector, args.sheets, args.gutter, args.workers)
+        print(format_summary(results))
+        if all(result.ok for result in results):
+            sys.exit(0)
+        else:
+            sys.exit(1)
+
+    if args.command == 'impose':
+        from bgboxmaker.batch import load_config
+        from bgboxmaker.view import Box, RenderCache, DiskCache, impose
+        directory = cache_dir(args)
+        cache = RenderCache(0, DiskCache(directory)) if directory is not None else None
+        boxes = []
+        for filename in args.files:
+            with span("box", "box", {"file" : filename}):
+                config = load_config(filename)
+                with span("layout"):
+                    boxes.append(Box(config))
+            boxes[-1].cache = cache
+        stem, extension = os.path.splitext(args.output)
+        for i, sheet in enumerate(impose(boxes, args.gutter), 1):
+            path = f"{stem}-{i}{extension}"
+            sheet.render_to(path, args.format, workers=args.workers)
+            print(f"{path}: {len(sheet.boxes)} boxes")
+        if cache is not None:
+            cache.store.close()
+        sys.exit(0)
+
+    if args.command == 'watch':
+        from bgboxmaker.watch import Watcher
+        Watcher(args.file, args.output, args.format, args.workers, cache_dir(args)).run(args.interval)
+        sys.exit(0)
+
     if not args.filename == "":
-        with open(args.filename, 'r') as f:
+        import yaml
+        with span("load", args={"file" : args.filename}), open(args.filename, 'r') as f:
             data = yaml.load(f, Loader=yaml.SafeLoader)
     else:
         if args.sample:
@@ -40,15 +199,33 @@ def main():
             sys.exit(1)
 
     try:
-        config = BoxConfig(data)
+        with span("config"):
+            config = BoxConfig(data)
     except ConfigurationError:
         print("Invalid configuration. See logfile for details.")
         print("See https://github.com/thetalorian/bgboxmaker for usage instructions.")
         sys.exit(1)
 
-    box = Box(config)
-    logging.info(f"{box}")
-    box.generate()
+    from bgboxmaker.view import Box, PDFRenderer, RenderCache, DiskCache
+    with span("layout"):
+        box = Box(config)
+    directory = cache_dir(args)
+    if directory is not None:
+        box.cache = RenderCache(0, DiskCache(directory))
+    if args.debug:
+        # Formatting the whole box is costly, only dump it when debugging.
+        logging.info("%s", box)
+    if args.vector:
+        if not args.output:
+            print("An output file is required for vector output.")
+            sys.exit(1)
+        PDFRenderer(box).render(args.output)
+    elif args.output:
+        box.render_to(args.output, args.format, workers=args.workers, tile_height=args.tile_height)
+    else:
+        box.generate(args.workers).show()
+    if box.cache is not None:
+        box.cache.store.close()
     #box.test_generate()
 
 if __name__ == "__main__":
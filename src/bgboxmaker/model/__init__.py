@@ -1,6 +1,8 @@
 from bgboxmaker.model.configuration_error import ConfigurationError
 from bgboxmaker.model.enums import SectionName, SectionType, Orientation, FeatureType
 from bgboxmaker.model.config import Config
+from bgboxmaker.model.schema import Field, Schema, NUM
+from bgboxmaker.model.frozen import *
 from bgboxmaker.model.font_config import FontConfig
 from bgboxmaker.model.common_config import CommonConfig
 from bgboxmaker.model.dimension_config import DimensionConfig
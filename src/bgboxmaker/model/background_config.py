@@ -1,10 +1,15 @@
-from bgboxmaker.model import Config, CommonConfig
+from bgboxmaker.model import Config, CommonConfig, Field, Schema, FrozenBackgroundConfig
+
+BACKGROUND_SCHEMA = Schema("'background' block", {
+    'color': Field('background color', str),
+    'image': Field('background image', str),
+    'image_source': Field('image source', str),
+})
 
 class BackgroundConfig(Config):
     """Holds background configuration."""
 
     def __init__(self, common : CommonConfig, data : dict = {}):
-        self.__keys = ['color', 'image', 'image_source']
         self.__common = common
         self.__color : str = ""
         self.__image : str = ""
@@ -31,19 +36,25 @@ class BackgroundConfig(Config):
     def isSet(self) -> bool:
         return self.__image != "" or self.__color != ""
 
+    def freeze(self) -> FrozenBackgroundConfig:
+        """Return an immutable snapshot of the background."""
+        return FrozenBackgroundConfig(self.__common.freeze(), self.__color, self.__image)
+
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, "'background' block", self.__keys)
+        values = BACKGROUND_SCHEMA.validate(data)
 
-        if 'color' in data:
-            self.__color = self._validate(data['color'], 'background color', [self._valid_str])
+        if 'color' in values:
+            self.__color = values['color']
 
-        if 'image' in data:
-            self.__image = self._validate(data['image'], 'background image', [self._valid_str])
+        if 'image' in values:
+            self.__image = values['image']
 
-        if 'image_source' in data:
-            self.common.image_source = self._validate(data['image_source'], 'image source', [self._valid_str])
+        if 'image_source' in values:
+            # Take a copy before overriding the shared setting.
+            self.__common = self.__common.copy()
+            self.__common.image_source = values['image_source']
 
 
     def __repr__(self) -> str:
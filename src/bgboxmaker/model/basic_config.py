@@ -1,11 +1,16 @@
-from bgboxmaker.model import Config
+from bgboxmaker.model import Config, Field, Schema, FrozenBasicConfig
+
+BASIC_SCHEMA = Schema("'basic' block", {
+    'title': Field('title', str),
+    'subtitle': Field('subtitle', str),
+    'extra': Field('extra', str),
+})
 
 
 class BasicConfig(Config):
     """Holds data for basic tuck box."""
 
     def __init__(self, data = {}):
-        self.__keys : list[str] = ['title', 'subtitle', 'extra']
         self.__title : str = ""
         self.__subtitle : str = ""
         self.__extra : str = ""
@@ -28,19 +33,23 @@ class BasicConfig(Config):
     def isSet(self) -> bool:
         return self.__title != "" or self.__extra != ""
 
+    def freeze(self) -> FrozenBasicConfig:
+        """Return an immutable snapshot of the basic settings."""
+        return FrozenBasicConfig(self.__title, self.__subtitle, self.__extra)
+
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, "'basic' block", self.__keys)
+        values = BASIC_SCHEMA.validate(data)
 
-        if 'title' in data:
-            self.__title = self._validate(data['title'], 'title', [self._valid_str])
+        if 'title' in values:
+            self.__title = values['title']
 
-        if 'subtitle' in data:
-            self.__subtitle = self._validate(data['subtitle'], 'subtitle', [self._valid_str])
+        if 'subtitle' in values:
+            self.__subtitle = values['subtitle']
 
-        if 'extra' in data:
-            self.__extra = self._validate(data['extra'], 'extra', [self._valid_str])
+        if 'extra' in values:
+            self.__extra = values['extra']
 
     def __repr__(self) -> str:
         attributes : list[str] = []
@@ -1,16 +1,30 @@
 from bgboxmaker.dim import Dim
 from bgboxmaker.model import Config, BasicConfig, CommonConfig, DimensionConfig, PageConfig
 from bgboxmaker.model import SectionConfig, BackgroundConfig, SectionName, FeatureConfig, FeatureType, OptionsTextConfig
+from bgboxmaker.model import Field, Schema, FrozenBoxConfig, FrozenMap
 import logging
 logger = logging.getLogger(__name__)
 
+BOX_SCHEMA = Schema('config', {
+    'dimensions': Field('dimensions', missing='Dimensions'),
+    'page': Field('page'),
+    'background': Field('background'),
+    'common': Field('common'),
+    'basic': Field('basic'),
+    'detail': Field('detail'),
+})
+
 
 class BoxConfig(Config):
-    """Holds box configuration converted from YAML file."""
+    """Holds box configuration converted from YAML file.
+
+    Use freeze() to get an immutable, hashable snapshot of the whole
+    configuration, which is safe to share between threads and
+    processes and can be used as a cache key.
+    """
 
     def __init__(self, data = {}):
         super(Config, self).__init__()
-        self.__keys : list[str] = ['dimensions', 'page', 'background', 'common', 'basic', 'detail']
         self.__dimensions : DimensionConfig
         self.__page : PageConfig = PageConfig()
         self.__common : CommonConfig = CommonConfig()
@@ -44,16 +58,21 @@ class BoxConfig(Config):
     def basic(self) -> BasicConfig:
         return self.__basic
 
+    def freeze(self) -> FrozenBoxConfig:
+        """Return an immutable snapshot of the whole configuration."""
+        detail = FrozenMap((name, section.freeze()) for name, section in self.__detail.items())
+        return FrozenBoxConfig(
+            self.__dimensions.freeze(), self.__page.freeze(), self.__common.freeze(),
+            self.__background.freeze(), self.__basic.freeze(), detail
+        )
+
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, 'config', self.__keys)
+        BOX_SCHEMA.validate(data)
 
-        if 'dimensions' in data:
-            self._found("dimensions")
-            self.__dimensions = DimensionConfig(data['dimensions'])
-        else:
-            self._missing_required("Dimensions")
+        self._found("dimensions")
+        self.__dimensions = DimensionConfig(data['dimensions'])
 
         if 'page' in data:
             self._found("page")
@@ -99,19 +118,19 @@ class BoxConfig(Config):
         """Populate box sections with config from 'basic' block."""
         for section in [SectionName.FRONT, SectionName.LEFT, SectionName.RIGHT, SectionName.TOP, SectionName.BOTTOM]:
             if section not in self.__detail:
-                logger.info(f"No existing configuration found for {section}, creating.")
+                logger.info("No existing configuration found for %s, creating.", section)
                 self.__detail[section] = SectionConfig(self.common)
             else:
-                logger.info(f"Existing configuration found for {section} section, editing.")
+                logger.info("Existing configuration found for %s section, editing.", section)
             detail = self.__detail[section]
             if not detail.features:
-                logger.info(f"No features found for {section}. Generating.")
+                logger.info("No features found for %s. Generating.", section)
                 if section is SectionName.FRONT:
                     self._add_front_features(detail)
                 else:
                     self._add_side_features(detail)
             else:
-                logger.info(f"Existing features found in {section}, skipping.")
+                logger.info("Existing features found in %s, skipping.", section)
 
 
     def _add_front_features(self, detail : SectionConfig):
@@ -142,7 +161,7 @@ class BoxConfig(Config):
             subtitle_feature = FeatureConfig(detail.common)
             subtitle_feature.type = FeatureType.TEXT
             subtitle_feature.place = Dim(1, 2)
-            subtitle_feature.options = OptionsTextConfig(detail.common)
+            subtitle_feature.options = OptionsTextConfig(detail.common.copy())
             subtitle_feature.options.text = self.__basic.subtitle
             subtitle_feature.options.common.font.size = 70
             detail.features.append(subtitle_feature)
@@ -153,7 +172,7 @@ class BoxConfig(Config):
             extra_feature.type = FeatureType.TEXT
             extra_feature.place = Dim(1, div)
             extra_feature.anchor = Dim(1, 2)
-            extra_feature.options = OptionsTextConfig(detail.common)
+            extra_feature.options = OptionsTextConfig(detail.common.copy())
             extra_feature.options.text = self.__basic.extra
             extra_feature.options.common.font.size = 50
             detail.features.append(extra_feature)
@@ -173,13 +192,14 @@ class BoxConfig(Config):
             else:
                 logger.info("Adding subtitle to section.")
                 text = self.__basic.title
-            title_feature = FeatureConfig(detail.common)
+            common = detail.common.copy()
+            common.font.size = 50
+            title_feature = FeatureConfig(common)
             title_feature.type = FeatureType.TEXT
             title_feature.place = Dim(1, 1)
-            title_feature.options = OptionsTextConfig(detail.common)
+            title_feature.options = OptionsTextConfig(common)
             title_feature.options.text = text
             title_feature.options.align = "left"
-            title_feature.common.font.size = 50
             detail.features.append(title_feature)
 
 
@@ -1,14 +1,22 @@
-from bgboxmaker.model import Config, FontConfig
+from bgboxmaker.model import Config, FontConfig, Field, Schema, NUM, FrozenCommonConfig
 import logging
 logger = logging.getLogger(__name__)
 
+COMMON_SCHEMA = Schema("'common' block", {
+    'font': Field('font'),
+    'margin': Field('margin', NUM, gt=0),
+    'image_source': Field('image source', str),
+    'resolution': Field('resolution', int, gt=0),
+})
+
 class CommonConfig(Config):
     """Holds common configuration settings.
 
     Common configuration is passed down to sub-configurations
     as needed, and overridden when new values are supplied for
-    those sub-configurations. Only one instance is instantiated,
-    and gets copied and updated as required.
+    those sub-configurations. Blocks share their parent's
+    instance until they override a setting, then take a copy
+    of their own, so overrides never leak to other blocks.
 
     Attributes
     ----------
@@ -26,6 +34,13 @@ class CommonConfig(Config):
 
     Methods
     -------
+    copy() -> CommonConfig:
+        Returns an independent copy, for a block that overrides
+        common settings.
+
+    freeze() -> FrozenCommonConfig:
+        Returns an immutable snapshot of the settings.
+
     update_data(data : dict) -> None:
         Takes a data block containing any of 'font', 'margin', or 'image_source'.
         Validates data and updates configuration as required.
@@ -33,7 +48,6 @@ class CommonConfig(Config):
 
     def __init__(self, data = {}):
         """Initialize instance with default values."""
-        self.__keys = ['font', 'margin', 'image_source', 'resolution']
         self.__font : FontConfig = FontConfig()
         self.__margin : float = 0.1
         self.__image_source : str = "."
@@ -66,22 +80,32 @@ class CommonConfig(Config):
     def resolution(self) -> int:
         return self.__resolution
 
+    def copy(self) -> "CommonConfig":
+        """Return an independent copy, for a block that overrides common settings."""
+        common = CommonConfig()
+        common.__font = self.__font.copy()
+        common.__margin = self.__margin
+        common.__image_source = self.__image_source
+        common.__resolution = self.__resolution
+        return common
+
+    def freeze(self) -> FrozenCommonConfig:
+        """Return an immutable snapshot of the settings."""
+        return FrozenCommonConfig(self.__font.freeze(), self.__margin, self.__image_source, self.__resolution)
+
     def update_data(self, data : dict):
         """Process given data and update configuration as required."""
 
-        self._validate_keys(data, "'common' block", self.__keys)
-
-        if 'font' in data:
-            self.font.update_data(data['font'])
+        values = COMMON_SCHEMA.validate(data, {'font' : self.__font.update_data})
 
-        if 'margin' in data:
-            self.__margin = self._validate(data['margin'], 'margin', [self._valid_num, self._valid_gt_zero])
+        if 'margin' in values:
+            self.__margin = values['margin']
 
-        if 'image_source' in data:
-            self.__image_source = self._validate(data['image_source'], 'image source', [self._valid_str])
+        if 'image_source' in values:
+            self.__image_source = values['image_source']
 
-        if 'resolution' in data:
-            self.__resolution = self._validate(data['resolution'], 'resolution', [self._valid_int, self._valid_gt_zero])
+        if 'resolution' in values:
+            self.__resolution = values['resolution']
 
     def __repr__(self) -> str:
         attributes : list[str] = []
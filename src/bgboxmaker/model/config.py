@@ -15,12 +15,14 @@ class Config(ABC):
     those sub-configurations. Only one instance is instantiated,
     and gets copied and updated as required.
 
+    Each block declares its allowed keys and value checks as a
+    Schema, which is compiled once when the module is loaded. The
+    _validate helpers remain for checks made outside a schema.
+
     Attributes
     ----------
     desc : str
         Description of class config block for use in logs.
-    keys : list[str]
-        List of allowed keys in input data dict.
 
     Methods
     -------
@@ -36,11 +38,11 @@ class Config(ABC):
 
     def _log_block(self, settings : str) -> None:
         """Log block settings."""
-        logger.info(settings)
+        logger.info("%s", settings)
 
     def _found(self, config : str) -> None:
         """Logs finding of a config block."""
-        logger.info(f"Block {config} found in configuration file.")
+        logger.info("Block %s found in configuration file.", config)
 
 
     def _missing_required(self, config : str) -> None:
@@ -76,7 +78,7 @@ class Config(ABC):
                 logger.error(msg)
                 raise ConfigurationError(msg)
 
-        logger.info(f"Setting {desc} to: {input}")
+        logger.info("Setting %s to: %s", desc, input)
         return input
 
 
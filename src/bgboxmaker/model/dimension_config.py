@@ -1,10 +1,15 @@
-from bgboxmaker.model import Config
+from bgboxmaker.model import Config, Field, Schema, NUM, FrozenDimensionConfig
+
+DIMENSION_SCHEMA = Schema("'dimensions' block", {
+    'width': Field('box width', NUM, gt=0, missing='box width'),
+    'height': Field('box height', NUM, gt=0, missing='box height'),
+    'depth': Field('box depth', NUM, gt=0, missing='box depth'),
+})
 
 class DimensionConfig(Config):
     """Holds box dimensions."""
 
     def __init__(self, data = {}):
-        self.__keys : list[str] = ['width', 'height', 'depth']
         self.__width : float
         self.__height : float
         self.__depth : float
@@ -25,25 +30,17 @@ class DimensionConfig(Config):
         return self.__depth
 
 
+    def freeze(self) -> FrozenDimensionConfig:
+        """Return an immutable snapshot of the dimensions."""
+        return FrozenDimensionConfig(self.__width, self.__height, self.__depth)
+
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, "'dimensions' block", self.__keys)
-
-        if 'width' in data:
-            self.__width = self._validate(data['width'], 'box width', [self._valid_num, self._valid_gt_zero])
-        else:
-            self._missing_required('box width')
-
-        if 'height' in data:
-            self.__height = self._validate(data['height'], 'box height', [self._valid_num, self._valid_gt_zero])
-        else:
-            self._missing_required('box height')
-
-        if 'depth' in data:
-            self.__depth = self._validate(data['depth'], 'box depth', [self._valid_num, self._valid_gt_zero])
-        else:
-            self._missing_required('box depth')
+        values = DIMENSION_SCHEMA.validate(data)
+        self.__width = values['width']
+        self.__height = values['height']
+        self.__depth = values['depth']
 
     def __repr__(self) -> str:
         attributes : list[str] = []
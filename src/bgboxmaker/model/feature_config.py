@@ -1,14 +1,23 @@
 from bgboxmaker.dim import Dim
 from bgboxmaker.model import Config, CommonConfig, BackgroundConfig, ConfigurationError, Orientation, FeatureType, OptionFactory, OptionsConfig
+from bgboxmaker.model import Field, Schema, NUM, FrozenFeatureConfig, Pair
 import logging
 logger = logging.getLogger(__name__)
 
+FEATURE_SCHEMA = Schema("'feature' block", {
+    'type': Field('feature type', str, missing='feature type'),
+    'options': Field('options'),
+    'width': Field('feature width', NUM, gt=0),
+    'height': Field('feature height', NUM, gt=0),
+    'place': Field('place', int, vec2=True),
+    'anchor': Field('anchor', int, choices=frozenset([0, 1, 2]), vec2=True),
+})
+
 
 class FeatureConfig(Config):
     """Holds feature configuration data."""
 
     def __init__(self, common : CommonConfig, data : dict = {}):
-        self.__keys : list[str] = ['type', 'options', 'width', 'height', 'place', 'anchor']
         self.__common : CommonConfig = common
         self.__type : FeatureType = None
         self.__options : OptionsConfig = None
@@ -63,38 +72,45 @@ class FeatureConfig(Config):
     def anchor(self, value : Dim) -> None:
         self.__anchor = value
 
+    def freeze(self) -> FrozenFeatureConfig:
+        """Return an immutable snapshot of the feature."""
+        options = self.__options.freeze() if self.__options is not None else None
+        return FrozenFeatureConfig(
+            self.__common.freeze(), self.__type, options, self.__width, self.__height,
+            Pair(self.__place.x, self.__place.y), Pair(self.__anchor.x, self.__anchor.y)
+        )
+
     def _valid_zero_to_two(self, input) -> bool:
         """Validate all list members are between 0 and 2"""
         return input[0] in [0, 1, 2] and input[1] in [0, 1, 2]
 
 
-    def update_data(self, data):
-        """Process given data."""
+    def _update_type(self, feature_type : str) -> None:
+        self.__type = self._validate_enum(feature_type, 'feature type', FeatureType)
 
-        self._validate_keys(data, "'feature' block", self.__keys)
 
-        if 'type' in data:
-            feature_type = self._validate(data['type'], 'feature type', [self._valid_str])
-            self.__type = self._validate_enum(feature_type, 'feature type', FeatureType)
-        else:
-            self._missing_required('feature type')
+    def _update_options(self, data : dict) -> None:
+        self._found('Option data')
+        option_class : type[OptionsConfig] = OptionFactory.get_option_class(self.__type)
+        self.__options = option_class(self.__common, data)
+
+
+    def update_data(self, data):
+        """Process given data."""
 
-        if 'options' in data:
-            self._found('Option data')
-            option_class : type[OptionsConfig] = OptionFactory.get_option_class(self.__type)
-            self.__options = option_class(self.__common, data['options'])
+        values = FEATURE_SCHEMA.validate(data, {'type' : self._update_type, 'options' : self._update_options})
 
-        if 'width' in data:
-            self.__width = self._validate(data['width'], 'feature width', [self._valid_num, self._valid_gt_zero])
+        if 'width' in values:
+            self.__width = values['width']
 
-        if 'height' in data:
-            self.__height = self._validate(data['height'], 'feature height', [self._valid_num, self._valid_gt_zero])
+        if 'height' in values:
+            self.__height = values['height']
 
-        if 'place' in data:
-            self.__place = Dim(self._validate(data['place'], 'place', [self._valid_list, self._valid_Vec2_int]))
+        if 'place' in values:
+            self.__place = Dim(values['place'])
 
-        if 'anchor' in data:
-            self.__anchor = Dim(self._validate(data['anchor'], 'anchor', [self._valid_list, self._valid_Vec2_int, self._valid_zero_to_two]))
+        if 'anchor' in values:
+            self.__anchor = Dim(values['anchor'])
 
 
     def __repr__(self) -> str:
@@ -1,13 +1,29 @@
-from bgboxmaker.model import Config
+from bgboxmaker.model import Config, Field, Schema, FrozenFontConfig
 import logging
 logger = logging.getLogger(__name__)
 
+
+def _is_ttf(input : str) -> bool:
+    if '.' in input:
+        _, ext = input.split('.')
+        return ext == "ttf"
+    else:
+        return False
+
+
+FONT_SCHEMA = Schema("'font' block", {
+    'name': Field('font name', str, check=_is_ttf),
+    'size': Field('font size', int, gt=0),
+    'color': Field('font color', str),
+    'stroke': Field('font stroke color', str),
+    'width': Field('font stroke width', int, ge=0),
+})
+
 class FontConfig(Config):
     """Holds font configuration data."""
 
     def __init__(self, data : dict = {}):
         """Initialize instance with default data."""
-        self.__keys = ['name', 'size', 'color', 'stroke', 'width']
         self.__name : str = "Arial.ttf"
         self.__size : int = 90
         self.__color : str = "black"
@@ -41,33 +57,44 @@ class FontConfig(Config):
         return self.__width
 
 
+    def copy(self) -> "FontConfig":
+        """Return an independent copy of the font settings."""
+        font = FontConfig()
+        font.__name = self.__name
+        font.__size = self.__size
+        font.__color = self.__color
+        font.__stroke = self.__stroke
+        font.__width = self.__width
+        return font
+
+    def freeze(self) -> FrozenFontConfig:
+        """Return an immutable snapshot of the font settings."""
+        return FrozenFontConfig(self.__name, self.__size, self.__color, self.__stroke, self.__width)
+
+
     def _valid_ttf(self, input: str) -> bool:
-        if '.' in input:
-            _, ext = input.split('.')
-            return ext == "ttf"
-        else:
-            return False
+        return _is_ttf(input)
 
 
     def update_data(self, data : dict) -> None:
         """Update configuration as requested by incoming data."""
 
-        self._validate_keys(data, "'font' block", self.__keys)
+        values = FONT_SCHEMA.validate(data)
 
-        if 'name' in data:
-            self.__name = self._validate(data['name'], 'font name', [self._valid_str, self._valid_ttf])
+        if 'name' in values:
+            self.__name = values['name']
 
-        if 'size' in data:
-            self.__size = self._validate(data['size'], 'font size', [self._valid_int, self._valid_gt_zero])
+        if 'size' in values:
+            self.__size = values['size']
 
-        if 'color' in data:
-            self.__color = self._validate(data['color'], 'font color', [self._valid_str])
+        if 'color' in values:
+            self.__color = values['color']
 
-        if 'stroke' in data:
-            self.__stroke = self._validate(data['stroke'], 'font stroke color', [self._valid_str])
+        if 'stroke' in values:
+            self.__stroke = values['stroke']
 
-        if 'width' in data:
-            self.__width = self._validate(data['width'], 'font stroke width', [self._valid_int, self._valid_gte_zero])
+        if 'width' in values:
+            self.__width = values['width']
 
 
     def __repr__(self) -> str:
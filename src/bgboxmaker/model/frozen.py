@@ -0,0 +1,203 @@
+"""Frozen configuration
+
+Immutable, hashable snapshots of the configuration blocks, created
+with the freeze() method of each block. Snapshots have the same
+attributes as the blocks they were taken from, so they can be used
+anywhere a configuration is only read, shared between threads and
+processes, and used as cache keys. Freezing a snapshot again returns
+the snapshot itself, so snapshots can be nested in, or passed where,
+mutable blocks are expected.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterator, NamedTuple, Optional, Union
+from bgboxmaker.model import Orientation, FeatureType
+
+
+class Pair(NamedTuple):
+    """Immutable x, y pair, read like a Dim."""
+    x : int
+    y : int
+
+    @property
+    def w(self) -> int:
+        return self.x
+
+    @property
+    def h(self) -> int:
+        return self.y
+
+    @property
+    def xy(self) -> tuple[int, int]:
+        return (self.x, self.y)
+
+    @property
+    def wh(self) -> tuple[int, int]:
+        return (self.x, self.y)
+
+
+class FrozenMap(Mapping):
+    """Read only, hashable mapping."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items : Any = ()):
+        self._items : dict = dict(items)
+
+    def __getitem__(self, key : Any) -> Any:
+        return self._items[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __hash__(self) -> int:
+        return hash(frozenset(self._items.items()))
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({self._items!r})"
+
+
+class FrozenFontConfig(NamedTuple):
+    name : str
+    size : int
+    color : str
+    stroke : str
+    width : int
+
+    def freeze(self) -> "FrozenFontConfig":
+        return self
+
+
+class FrozenCommonConfig(NamedTuple):
+    font : FrozenFontConfig
+    margin : float
+    image_source : str
+    resolution : int
+
+    def freeze(self) -> "FrozenCommonConfig":
+        return self
+
+
+class FrozenDimensionConfig(NamedTuple):
+    width : float
+    height : float
+    depth : float
+
+    def freeze(self) -> "FrozenDimensionConfig":
+        return self
+
+
+class FrozenPageConfig(NamedTuple):
+    width : float
+    height : float
+    margin : float
+    thickness : int
+
+    def freeze(self) -> "FrozenPageConfig":
+        return self
+
+
+class FrozenBasicConfig(NamedTuple):
+    title : str
+    subtitle : str
+    extra : str
+
+    @property
+    def isSet(self) -> bool:
+        return self.title != "" or self.extra != ""
+
+    def freeze(self) -> "FrozenBasicConfig":
+        return self
+
+
+class FrozenBackgroundConfig(NamedTuple):
+    common : FrozenCommonConfig
+    color : str
+    image : str
+
+    @property
+    def image_path(self) -> str:
+        return f"{self.common.image_source}/{self.image}"
+
+    @property
+    def isSet(self) -> bool:
+        return self.image != "" or self.color != ""
+
+    def freeze(self) -> "FrozenBackgroundConfig":
+        return self
+
+
+class FrozenOptionsTextConfig(NamedTuple):
+    common : FrozenCommonConfig
+    text : str
+    align : str
+
+    def freeze(self) -> "FrozenOptionsTextConfig":
+        return self
+
+
+class FrozenOptionsPanelConfig(NamedTuple):
+    color : str
+    border : str
+    border_width : int
+
+    def freeze(self) -> "FrozenOptionsPanelConfig":
+        return self
+
+
+class FrozenOptionsImageConfig(NamedTuple):
+    common : FrozenCommonConfig
+    image : str
+
+    @property
+    def image_path(self) -> str:
+        return f"{self.common.image_source}/{self.image}"
+
+    def freeze(self) -> "FrozenOptionsImageConfig":
+        return self
+
+
+FrozenOptionsConfig = Union[FrozenOptionsTextConfig, FrozenOptionsPanelConfig, FrozenOptionsImageConfig]
+
+
+class FrozenFeatureConfig(NamedTuple):
+    common : FrozenCommonConfig
+    type : FeatureType
+    options : Optional[FrozenOptionsConfig]
+    width : float
+    height : float
+    place : Pair
+    anchor : Pair
+
+    def freeze(self) -> "FrozenFeatureConfig":
+        return self
+
+
+class FrozenSectionConfig(NamedTuple):
+    common : FrozenCommonConfig
+    background : FrozenBackgroundConfig
+    rotated : bool
+    rotated_is_set : bool
+    orientation : Orientation
+    orientation_is_set : bool
+    grid : Pair
+    features : tuple[FrozenFeatureConfig, ...]
+
+    def freeze(self) -> "FrozenSectionConfig":
+        return self
+
+
+class FrozenBoxConfig(NamedTuple):
+    dimensions : FrozenDimensionConfig
+    page : FrozenPageConfig
+    common : FrozenCommonConfig
+    background : FrozenBackgroundConfig
+    basic : FrozenBasicConfig
+    # Section name to FrozenSectionConfig.
+    detail : FrozenMap
+
+    def freeze(self) -> "FrozenBoxConfig":
+        return self
@@ -1,10 +1,14 @@
-from bgboxmaker.model import CommonConfig, OptionsConfig
+from bgboxmaker.model import CommonConfig, OptionsConfig, Field, Schema, FrozenOptionsImageConfig
+
+IMAGE_SCHEMA = Schema('image feature options', {
+    'image': Field('image', str, missing="'image' option of image feature"),
+    'image_source': Field('image source', str),
+})
 
 class OptionsImageConfig(OptionsConfig):
     """Holds options for an Image Feature."""
 
     def __init__(self, common : CommonConfig, data : dict = {}):
-        self.__keys : list[str] = ['image', 'image_source']
         self.__common : CommonConfig = common
         self.__image : str
         if data:
@@ -22,19 +26,20 @@ class OptionsImageConfig(OptionsConfig):
     def image_path(self) -> str:
         return f"{self.common.image_source}/{self.image}"
 
+    def freeze(self) -> FrozenOptionsImageConfig:
+        """Return an immutable snapshot of the options."""
+        return FrozenOptionsImageConfig(self.__common.freeze(), self.__image)
+
     def update_data(self, data : dict) -> None:
         """Process given data."""
 
-        self._validate_keys(data, 'image feature options', self.__keys)
-
-        if 'image' in data:
-            self.__image = self._validate(data['image'], 'image', [self._valid_str])
-        else:
-            self._missing_required("'image' option of image feature")
-
+        values = IMAGE_SCHEMA.validate(data)
+        self.__image = values['image']
 
-        if 'image_source' in data:
-            self.__common.image_source = self._validate(data['image_source'], 'image source', [self._valid_str])
+        if 'image_source' in values:
+            # Take a copy before overriding the shared setting.
+            self.__common = self.__common.copy()
+            self.__common.image_source = values['image_source']
 
 
     def __repr__(self) -> str:
@@ -1,10 +1,15 @@
-from bgboxmaker.model import CommonConfig, OptionsConfig
+from bgboxmaker.model import CommonConfig, OptionsConfig, Field, Schema, FrozenOptionsPanelConfig
+
+PANEL_SCHEMA = Schema('panel feature options', {
+    'color': Field('panel color', str),
+    'border': Field('panel border', str),
+    'border_width': Field('panel border width', int),
+})
 
 class OptionsPanelConfig(OptionsConfig):
     """Holds options for Panel Feature."""
 
     def __init__(self, common : CommonConfig, data : dict):
-        self.__keys : list[str] = ['color', 'border', 'border_width']
         self.__common : CommonConfig = common
         self.__color : str = "gray"
         self.__border : str = "gray"
@@ -24,19 +29,23 @@ class OptionsPanelConfig(OptionsConfig):
     def border_width(self) -> int:
         return self.__border_width
 
+    def freeze(self) -> FrozenOptionsPanelConfig:
+        """Return an immutable snapshot of the options."""
+        return FrozenOptionsPanelConfig(self.__color, self.__border, self.__border_width)
+
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, 'panel feature options', self.__keys)
+        values = PANEL_SCHEMA.validate(data)
 
-        if 'color' in data:
-            self.__color = self._validate(data['color'], 'panel color', [self._valid_str])
+        if 'color' in values:
+            self.__color = values['color']
 
-        if 'border' in data:
-            self.__border = self._validate(data['border'], 'panel border', [self._valid_str])
+        if 'border' in values:
+            self.__border = values['border']
 
-        if 'border_width' in data:
-            self.__border_width = self._validate(data['border_width'], 'panel border width', [self._valid_int])
+        if 'border_width' in values:
+            self.__border_width = values['border_width']
 
 
     def __repr__(self) -> str:
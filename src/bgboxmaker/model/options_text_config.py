@@ -1,12 +1,25 @@
-from bgboxmaker.model import CommonConfig, OptionsConfig, FontConfig, ConfigurationError
+from bgboxmaker.model import CommonConfig, OptionsConfig, FontConfig, ConfigurationError, Field, Schema, FrozenOptionsTextConfig
 import logging
 logger = logging.getLogger(__name__)
 
+
+def _is_text(input) -> bool:
+    """Validate that text is a str or a list of str."""
+    if isinstance(input, list):
+        return all(isinstance(s, str) for s in input)
+    return isinstance(input, str)
+
+
+TEXT_SCHEMA = Schema('text feature options', {
+    'text': Field('feature text', check=_is_text, missing="'text' option of text feature"),
+    'align': Field('feature text align', str, choices=frozenset(['left', 'center', 'right', 'justified'])),
+    'font': Field('font'),
+})
+
 class OptionsTextConfig(OptionsConfig):
     """Holds options for Text Feature."""
 
     def __init__(self, common : CommonConfig, data : dict = {}):
-        self.__keys : list[str] = ['text', 'align', 'font']
         self.__common : CommonConfig = common
         self.__text : str = ""
         self.__align : str = "center"
@@ -33,6 +46,10 @@ class OptionsTextConfig(OptionsConfig):
     def align(self, value : str) -> None:
         self.__align = value
 
+    def freeze(self) -> FrozenOptionsTextConfig:
+        """Return an immutable snapshot of the options."""
+        return FrozenOptionsTextConfig(self.__common.freeze(), self.__text, self.__align)
+
     def _valid_multiline(self, lines : list) -> bool:
         """Validate that provided list is list of str."""
         valid = True
@@ -48,22 +65,20 @@ class OptionsTextConfig(OptionsConfig):
     def update_data(self, data):
         """Process given data."""
 
-        self._validate_keys(data, 'text feature options', self.__keys)
+        values = TEXT_SCHEMA.validate(data)
 
-        if 'text' in data:
-            if isinstance(data['text'], list):
-                text = self._validate(data['text'], 'feature text', [self._valid_multiline])
-                self.__text = "\n".join(text)
-            else:
-                self.__text = self._validate(data['text'], 'feature text', [self._valid_str])
+        if isinstance(values['text'], list):
+            self.__text = "\n".join(values['text'])
         else:
-            self._missing_required("'text' option of text feature")
+            self.__text = values['text']
 
-        if 'align' in data:
-            self.__align = self._validate(data['align'], 'feature text align', [self._valid_str, self._valid_align])
+        if 'align' in values:
+            self.__align = values['align']
 
         if 'font' in data:
             self._found('font')
+            # Take a copy before overriding the shared font.
+            self.__common = self.__common.copy()
             self.__common.font.update_data(data['font'])
 
 
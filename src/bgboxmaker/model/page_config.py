@@ -1,13 +1,19 @@
-from bgboxmaker.model import Config, ConfigurationError
+from bgboxmaker.model import Config, ConfigurationError, Field, Schema, NUM, FrozenPageConfig
 import logging
 logger = logging.getLogger(__name__)
 
+PAGE_SCHEMA = Schema("'page' block", {
+    'width': Field('page width', NUM, gt=0),
+    'height': Field('page height', NUM, gt=0),
+    'margin': Field('page margin', NUM, ge=0),
+    'thickness': Field('page thickness', int, ge=0),
+})
+
 class PageConfig(Config):
     """Holds page data."""
 
     def __init__(self, data = {}):
         """Initialize with default data."""
-        self.__keys = ['width', 'height', 'margin', 'thickness']
         self.__width : float = 11
         self.__height : float = 8.5
         self.__margin : float = 0.25
@@ -30,22 +36,27 @@ class PageConfig(Config):
         return self.__thickness
 
 
+    def freeze(self) -> FrozenPageConfig:
+        """Return an immutable snapshot of the page settings."""
+        return FrozenPageConfig(self.__width, self.__height, self.__margin, self.__thickness)
+
+
     def update_data(self, data : dict) -> None:
         """Process given data."""
 
-        self._validate_keys(data, "'page' block", self.__keys)
+        values = PAGE_SCHEMA.validate(data)
 
-        if 'width' in data:
-            self.__width = self._validate(data['width'], "page width", [self._valid_num, self._valid_gt_zero])
+        if 'width' in values:
+            self.__width = values['width']
 
-        if 'height' in data:
-            self.__height = self._validate(data['height'], "page height", [self._valid_num, self._valid_gt_zero])
+        if 'height' in values:
+            self.__height = values['height']
 
-        if 'margin' in data:
-            self.__margin = self._validate(data['margin'], "page margin", [self._valid_num, self._valid_gte_zero])
+        if 'margin' in values:
+            self.__margin = values['margin']
 
-        if 'thickness' in data:
-            self.__thickness = self._validate(data['thickness'], "page thickness", [self._valid_int, self._valid_gte_zero])
+        if 'thickness' in values:
+            self.__thickness = values['thickness']
 
         self.check_orientation()
 
@@ -60,7 +71,7 @@ class PageConfig(Config):
             w = self.__height
             self.__width = w
             self.__height = h
-            logger.warning(f"New dimensions {self.width} by {self.height}")
+            logger.warning("New dimensions %s by %s", self.width, self.height)
 
 
     def __repr__(self) -> str:
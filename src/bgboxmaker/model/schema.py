@@ -0,0 +1,155 @@
+from typing import Any, Callable, NamedTuple, Optional, Union
+from bgboxmaker.model import ConfigurationError
+import logging
+logger = logging.getLogger(__name__)
+
+NUM = (int, float)
+
+
+class Field(NamedTuple):
+    """Declaration of a single configuration key.
+
+    A field with no types takes a nested block, which is checked by
+    its own configuration class. Only one of gt, ge and choices is
+    normally given, check adds any further test on the value.
+    """
+    desc : str
+    types : Union[type, tuple, None] = None
+    gt : Optional[float] = None
+    ge : Optional[float] = None
+    choices : Optional[frozenset] = None
+    vec2 : bool = False
+    check : Optional[Callable[[Any], bool]] = None
+    # Description used when a required field is missing, empty if optional.
+    missing : str = ""
+
+
+def _compile_value(types, gt, ge, choices, check) -> Callable[[Any], bool]:
+    """Build a single predicate that checks type and range together.
+
+    The usual single constraint fields get a closure of their own, so
+    no time is spent at validation working out which constraints apply.
+    """
+    constraints = [c for c in (gt, ge, choices, check) if c is not None]
+    if not constraints:
+        return lambda value: isinstance(value, types)
+    if len(constraints) == 1:
+        if types is None and check is not None:
+            return check
+        if gt is not None:
+            return lambda value: isinstance(value, types) and value > gt
+        if ge is not None:
+            return lambda value: isinstance(value, types) and value >= ge
+        if choices is not None:
+            return lambda value: isinstance(value, types) and value in choices
+        return lambda value: isinstance(value, types) and check(value)
+
+    def combined(value : Any) -> bool:
+        return ((types is None or isinstance(value, types))
+                and (gt is None or value > gt)
+                and (ge is None or value >= ge)
+                and (choices is None or value in choices)
+                and (check is None or check(value)))
+    return combined
+
+
+def _compile(field : Field) -> Optional[Callable[[Any], bool]]:
+    """Compile a field declaration into a predicate, or None for a nested block."""
+    if field.types is None and field.check is None:
+        return None
+    if field.vec2:
+        item = _compile_value(field.types, field.gt, field.ge, field.choices, None)
+        check = field.check
+        if check is None:
+            return lambda value: isinstance(value, list) and len(value) == 2 and item(value[0]) and item(value[1])
+        return lambda value: isinstance(value, list) and len(value) == 2 and item(value[0]) and item(value[1]) and check(value)
+    return _compile_value(field.types, field.gt, field.ge, field.choices, field.check)
+
+
+class Schema:
+    """Compiled validator for a configuration block.
+
+    The block is declared once as a mapping of keys to fields, and
+    compiled into a set of allowed keys and one predicate per field,
+    so validating a block is a set check and a single call per value.
+    Errors are raised with the same messages as Config._validate_keys,
+    Config._validate and Config._missing_required.
+
+    Attributes
+    ----------
+    desc : str
+        Description of the block for use in error messages.
+    keys : frozenset[str]
+        Allowed keys in the block.
+
+    Methods
+    -------
+    check_keys(data : dict) -> None
+        Raises ConfigurationError for the first unknown key in data.
+
+    validate(data : dict, blocks : dict[str, Callable]) -> dict
+        Checks the keys and every value in data, returning the
+        checked values. Nested blocks are left to their own
+        configuration classes, through the matching entry of blocks.
+    """
+
+    def __init__(self, desc : str, fields : dict[str, Field]):
+        self.__desc : str = desc
+        self.__keys : frozenset[str] = frozenset(fields)
+        # Nested blocks have no predicate, they are checked by their own
+        # configuration when validate reaches them.
+        self.__fields : list[tuple[str, str, Optional[Callable[[Any], bool]], str]] = [
+            (key, field.desc, _compile(field), field.missing) for key, field in fields.items()
+        ]
+
+    @property
+    def desc(self) -> str:
+        return self.__desc
+
+    @property
+    def keys(self) -> frozenset[str]:
+        return self.__keys
+
+
+    def check_keys(self, data : dict) -> None:
+        """Raise ConfigurationError for the first unknown key in data."""
+        if self.__keys.issuperset(data):
+            return
+        key = next(key for key in data if key not in self.__keys)
+        msg = f"Unknown configuration '{key}' found in {self.__desc}."
+        logger.error(msg)
+        raise ConfigurationError(msg)
+
+
+    def validate(self, data : dict, blocks : dict[str, Callable[[Any], Any]] = {}) -> dict:
+        """Check the keys and values in data, returning the validated values.
+
+        Fields are checked in the order they are declared. blocks maps
+        keys to callables that are given the value of the key when it
+        is reached, after any check of its own, to parse nested blocks
+        or convert values. A config with several errors then reports the
+        first in declaration order, wherever it is found.
+        """
+        self.check_keys(data)
+        values = {}
+        for key, desc, check, missing in self.__fields:
+            if key in data:
+                value = data[key]
+                if check is not None:
+                    if not check(value):
+                        msg = f"Invalid {desc} provided: {value}"
+                        logger.error(msg)
+                        raise ConfigurationError(msg)
+                    values[key] = value
+                if key in blocks:
+                    blocks[key](value)
+            elif missing:
+                msg = f"Required config {missing} not provided."
+                logger.error(msg)
+                raise ConfigurationError(msg)
+
+        if values and logger.isEnabledFor(logging.INFO):
+            for key, desc, check, _ in self.__fields:
+                if key in values:
+                    logger.info("Setting %s to: %s", desc, values[key])
+        return values
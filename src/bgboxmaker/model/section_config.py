@@ -1,11 +1,19 @@
 from bgboxmaker.dim import Dim
-from bgboxmaker.model import Config, CommonConfig, BackgroundConfig, FeatureConfig, Orientation
+from bgboxmaker.model import Config, CommonConfig, BackgroundConfig, FeatureConfig, Orientation, Field, Schema, NUM, FrozenSectionConfig, Pair
+
+SECTION_SCHEMA = Schema("'detail' block", {
+    'background': Field('background'),
+    'rotated': Field('rotated', bool),
+    'orientation': Field('orientation', str),
+    'margin': Field('margin', NUM, ge=0),
+    'grid': Field('grid', int, gt=0, vec2=True),
+    'features': Field('features'),
+})
 
 class SectionConfig(Config):
     """Holds detail section config."""
 
     def __init__(self, common : CommonConfig, data : dict = {}):
-        self.__keys : list[str] = ['background', 'rotated', 'orientation', 'margin', 'grid', 'features']
         self.__common : CommonConfig = common
         self.__background : BackgroundConfig = BackgroundConfig(common)
         self.__rotated : bool = False
@@ -54,29 +62,38 @@ class SectionConfig(Config):
         return self.__features
 
 
+    def freeze(self) -> FrozenSectionConfig:
+        """Return an immutable snapshot of the section."""
+        return FrozenSectionConfig(
+            self.__common.freeze(), self.__background.freeze(), self.__rotated, self.__rotated_is_set,
+            self.__orientation, self.__orientation_is_set, Pair(self.__grid.x, self.__grid.y),
+            tuple(feature.freeze() for feature in self.__features)
+        )
+
+    def _update_background(self, data : dict) -> None:
+        self._found('background')
+        self.__background = BackgroundConfig(self.__common, data)
+
+    def _update_orientation(self, orientation : str) -> None:
+        self.__orientation = self._validate_enum(orientation, 'orientation', Orientation)
+        self.__orientation_is_set = True
+
     def update_data(self, data):
         """Update given data."""
 
-        self._validate_keys(data, "'detail' block", self.__keys)
-
-        if 'background' in data:
-            self._found('background')
-            self.__background = BackgroundConfig(self.__common, data['background'])
+        values = SECTION_SCHEMA.validate(data, {'background' : self._update_background, 'orientation' : self._update_orientation})
 
-        if 'rotated' in data:
-            self.__rotated = self._validate(data['rotated'], 'rotated', [self._valid_bool])
+        if 'rotated' in values:
+            self.__rotated = values['rotated']
             self.__rotated_is_set = True
 
-        if 'orientation' in data:
-            orientation = self._validate(data['orientation'], 'orientation', [self._valid_str])
-            self.__orientation = self._validate_enum(orientation, 'orientation', Orientation)
-            self.__orientation_is_set = True
-
-        if 'margin' in data:
-            self.__common.margin = self._validate(data['margin'], 'margin', [self._valid_num, self._valid_gte_zero])
+        if 'margin' in values:
+            # Take a copy before overriding the shared setting.
+            self.__common = self.__common.copy()
+            self.__common.margin = values['margin']
 
-        if 'grid' in data:
-            self.__grid = Dim(self._validate(data['grid'], 'grid', [self._valid_list, self._valid_Vec2_int, self._valid_Vec2_gt_zero]))
+        if 'grid' in values:
+            self.__grid = Dim(values['grid'])
 
         if 'features' in data:
             self._found('features')
@@ -0,0 +1,180 @@
+"""Profiling
+
+Runs work under cProfile while a background thread samples the stacks
+of every thread, for finding where the time of a slow render goes:
+
+    with Profiler() as profiler:
+        box.generate()
+    profiler.write("slow")
+    print(profiler.summary())
+
+This writes slow.pstats, which can be read with pstats, snakeviz or
+similar tools, and slow.collapsed, with one line of semicolon
+separated frames and a sample count per stack, ready for flamegraph.pl
+or speedscope.
+
+cProfile only sees the thread that enabled it, so with several render
+workers the time spent in the worker threads is only in the sampled
+stacks. Neither follows work into the processes of a batch.
+"""
+
+from collections import Counter
+from typing import Any, Optional
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(code : Any) -> str:
+    """Name a stack frame by its function and where it is defined."""
+    # Qualified names, such as TextFeature.render, are only kept from
+    # Python 3.11 on.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks of every thread from a background thread.
+
+    Attributes
+    ----------
+    stacks : Counter[str]
+        Number of samples of each stack, collapsed into the thread name
+        followed by the frames from the outermost in, separated by
+        semicolons.
+    samples : int
+        Number of times the threads were sampled.
+
+    Methods
+    -------
+
+    start() -> None
+        Starts sampling.
+
+    stop() -> None
+        Stops sampling, waiting for the background thread to finish.
+    """
+
+    def __init__(self, interval : float = 0.001):
+        self.__interval : float = interval
+        self.__stacks : Counter[str] = Counter()
+        self.__samples : int = 0
+        self.__stop : threading.Event = threading.Event()
+        self.__thread : Optional[threading.Thread] = None
+
+    @property
+    def stacks(self) -> Counter[str]:
+        return self.__stacks
+
+    @property
+    def samples(self) -> int:
+        return self.__samples
+
+    def start(self) -> None:
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self._run, name="bgboxmaker-sampler", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self.__stop.wait(self.__interval):
+            names = {thread.ident : thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread {ident}"))
+                self.__stacks[";".join(reversed(stack))] += 1
+            self.__samples += 1
+
+
+class Profiler:
+    """Profiles the work done while it is active.
+
+    Attributes
+    ----------
+    stats : pstats.Stats
+        The cProfile statistics of the thread the profiler was entered
+        in.
+    sampler : StackSampler
+        The sampled stacks of every thread.
+
+    Methods
+    -------
+
+    __enter__() / __exit__()
+        Start and stop profiling.
+
+    write(prefix : str) -> list[str]
+        Writes the statistics to prefix.pstats and the sampled stacks
+        to prefix.collapsed, returning the file names.
+
+    summary(top : int) -> str
+        Returns a table of the functions that took the most time.
+    """
+
+    def __init__(self, interval : float = 0.001):
+        self.__profile : cProfile.Profile = cProfile.Profile()
+        self.__sampler : StackSampler = StackSampler(interval)
+
+    @property
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.__profile)
+
+    @property
+    def sampler(self) -> StackSampler:
+        return self.__sampler
+
+    def __enter__(self) -> "Profiler":
+        self.__sampler.start()
+        self.__profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.__profile.disable()
+        self.__sampler.stop()
+
+    def write(self, prefix : str) -> list[str]:
+        """Write the statistics and the sampled stacks next to each other."""
+        stats_path = f"{prefix}.pstats"
+        self.__profile.dump_stats(stats_path)
+        stacks_path = f"{prefix}.collapsed"
+        with open(stacks_path, "w") as f:
+            for stack, samples in sorted(self.__sampler.stacks.items()):
+                f.write(f"{stack} {samples}\n")
+        logger.info("Wrote profile to %s and %s", stats_path, stacks_path)
+        return [stats_path, stacks_path]
+
+    def summary(self, top : int = 20) -> str:
+        """Format the functions with the most time spent in them as a table.
+
+        Functions are ordered by the time spent in their own code, with
+        the time including everything they called next to it.
+        """
+        stats = self.stats
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        lines = [f"{'function':60}  {'calls':>8}  {'own ms':>10}  {'total ms':>10}"]
+        for (filename, line, name), (_, calls, own, total, _) in rows:
+            if filename == "~":
+                # Built in functions, such as the methods of Pillow's core.
+                label = name
+            else:
+                label = f"{name} ({os.path.basename(filename)}:{line})"
+            if len(label) > 60:
+                label = label[:57] + "..."
+            lines.append(f"{label:60}  {calls:>8}  {own * 1000:>10.2f}  {total * 1000:>10.2f}")
+        lines.append(f"{stats.total_tt * 1000:.2f} ms profiled, {self.__sampler.samples} stack samples")
+        return "\n".join(lines)
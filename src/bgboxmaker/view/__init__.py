@@ -1,5 +1,10 @@
+from bgboxmaker.view.cache import CacheInfo, FontCache, AssetCache, RenderCache, DiskCache
 from bgboxmaker.view.feature import *
 from bgboxmaker.view.background_renderer import BackgroundRenderer
 from bgboxmaker.view.feature_grid import FeatureGrid
 from bgboxmaker.view.section import Section
-from bgboxmaker.view.box import Box
\ No newline at end of file
+from bgboxmaker.view.png_writer import PNGStreamWriter
+from bgboxmaker.view.box import Box
+from bgboxmaker.view.sheet import Sheet, impose
+from bgboxmaker.view.pdf_writer import PDFWriter
+from bgboxmaker.view.pdf_renderer import PDFRenderer
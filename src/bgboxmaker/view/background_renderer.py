@@ -1,6 +1,8 @@
 from bgboxmaker.dim import Dim
 from bgboxmaker.model import BackgroundConfig
+from bgboxmaker.view.cache import AssetCache
 from PIL import Image, ImageDraw
+from typing import Optional
 
 class BackgroundRenderer:
     """Create a background image for a box or section."""
@@ -8,10 +10,9 @@ class BackgroundRenderer:
     def __init__(self, config : BackgroundConfig):
         self.config : BackgroundConfig = config
 
-    def _get_image(self, filename : str) -> Image.Image:
-        """Open and return an Image"""
-        with Image.open(filename, 'r') as im:
-            return im
+    def _get_image(self, filename : str, cover : Optional[tuple[int, int]] = None) -> Image.Image:
+        """Open and return an Image, large enough to cover the given size."""
+        return AssetCache.get(filename, cover)
 
 
     def render(self, bounds : Dim) -> Image.Image:
@@ -20,13 +21,15 @@ class BackgroundRenderer:
 
         if self.config.image:
             # Load Background image
-            bg_image = self._get_image(self.config.image_path)
+            bg_image = self._get_image(self.config.image_path, bounds.wh)
             bgw, bgh = bg_image.size
 
             bg_ratio = float(bgw) / bgh
             bounds_ratio = float(bounds.x) / bounds.y
 
-            # Resize background to fit smallest bounds while keeping aspect
+            # Resize background to fit smallest bounds while keeping aspect.
+            # Large art is already decoded at a reduced scale, so only a
+            # little more than the bounds is resized.
             if bg_ratio < bounds_ratio:
                 # Match the width to cover the whole area.
                 bgw = bounds.x
@@ -37,15 +40,10 @@ class BackgroundRenderer:
                 bgw = int(bounds.y * bg_ratio)
             bg_image = bg_image.resize((bgw, bgh))
 
-            # Crop background to fit bounds
-            crop_pos = Dim(0, 0)
-            if bgw > bounds.x:
-                delta = bgw - bounds.x
-                crop_pos.x = int(delta / 2)
-            if bgh > bounds.y:
-                delta = bgh - bounds.y
-                crop_pos.y = int(delta / 2)
-            bg_image = bg_image.crop((crop_pos.x, crop_pos.y, crop_pos.x + bounds.x, crop_pos.y + bounds.y))
+            # Crop background to fit bounds, centered on the image.
+            crop_x = int((bgw - bounds.x) / 2) if bgw > bounds.x else 0
+            crop_y = int((bgh - bounds.y) / 2) if bgh > bounds.y else 0
+            bg_image = bg_image.crop((crop_x, crop_y, crop_x + bounds.x, crop_y + bounds.y))
             background.paste(bg_image)
         elif self.config.color:
             background_draw = ImageDraw.Draw(background)
@@ -1,10 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw
+from typing import Callable, Iterator, Optional
 from bgboxmaker.dim import Dim
+from bgboxmaker.instrument import span, in_context
 from bgboxmaker.model import BoxConfig, SectionConfig, SectionName, SectionType, Orientation
 from bgboxmaker.view import Section, BackgroundRenderer
+from bgboxmaker.view.cache import FontCache, RenderCache, file_digest
+from bgboxmaker.view.png_writer import PNGStreamWriter
 import logging
+import os
 logger = logging.getLogger(__name__)
 
+ALPHA_FORMATS = ("PNG", "TIFF", "WEBP")
+
+
+def output_format(path : str, format : Optional[str] = None) -> str:
+    """Return the image format to write, taken from the file extension unless given."""
+    if format is None:
+        extension = os.path.splitext(path)[1].lower()
+        format = Image.registered_extensions().get(extension)
+        if format is None:
+            msg = f"Unable to determine output format for {path}."
+            logger.error(msg)
+            raise ValueError(msg)
+    return format.upper()
+
+
+def save_page(page : Image.Image, path : str, format : Optional[str] = None, options : Optional[dict] = None) -> None:
+    """Write a page image to the given file.
+
+    Formats without transparency support are flattened onto a white
+    page. Any options are passed on to the image encoder.
+    """
+    format = output_format(path, format)
+    with span("save"):
+        if format not in ALPHA_FORMATS:
+            flat = Image.new("RGB", page.size, "white")
+            flat.paste(page, mask=page)
+            page = flat
+        page.save(path, format=format, **(options or {}))
+
 
 class Box:
     """Object representing the configuration for a tuck box.
@@ -44,6 +79,26 @@ class Box:
     size : Vec2
         Size of the full box image.
 
+    footprint : Vec2
+        Size of the box image including the cut line around it.
+
+    border_color : str
+        Color of the cut line drawn around the box.
+
+    border_width : int
+        Width of the cut line in pixels.
+
+    cache : RenderCache
+        Cache to reuse section and background renders from, None to
+        render everything. If the cache has a disk store, whole output
+        files are reused from it as well.
+
+    assets : list[str]
+        Paths of the image files the box render reads.
+
+    fonts : list[str]
+        Names of the fonts the box render uses.
+
     font : dict
         Dictionary of font settings to use for the box
         Members :
@@ -56,10 +111,24 @@ class Box:
     Methods
     -------
 
-    generate() -> None
-        Generates the page with the box image and displays it as a preview to save or print.
+    generate(workers : int) -> Image
+        Generates and returns the page with the box image, optionally
+        rendering the sections on a pool of worker threads.
+
+    generate_box(workers : int) -> Image
+        Generates only the box and its cut line, for placing the box
+        on a shared sheet.
+
+    generate_tiles(tile_height : int, workers : int) -> Iterator
+        Generates the page with the box image as a series of horizontal
+        strips, holding only the sections each strip needs.
+
+    render_to(path : str, format : str, options : dict, workers : int, tile_height : int) -> None
+        Generates the page with the box image and writes it to the given file,
+        optionally streaming it to the file in strips.
 
     """
+
     def __init__(self, config : BoxConfig):
         self.__config : BoxConfig = config
         self.__sections : dict = {}
@@ -68,6 +137,9 @@ class Box:
         self.__tabs : Dim = Dim()
         self.__pos : Dim = Dim()
         self.__size : Dim = Dim()
+        self.__border_color : str = 'black'
+        self.__border_width : int = 4
+        self.__cache : Optional[RenderCache] = None
 
         # Configure box info from config.
         self._set_page()
@@ -80,12 +152,41 @@ class Box:
             logger.error(msg)
             raise Exception(msg)
 
-        self._create_sections()
+        with span("create sections"):
+            self._create_sections()
+
+    @property
+    def config(self) -> BoxConfig:
+        return self.__config
 
     @property
     def sections(self) -> dict:
         return self.__sections
 
+    @property
+    def cache(self) -> Optional[RenderCache]:
+        return self.__cache
+
+    @cache.setter
+    def cache(self, value : Optional[RenderCache]) -> None:
+        self.__cache = value
+
+    @property
+    def assets(self) -> list[str]:
+        paths = []
+        if self.__config.background.image:
+            paths.append(self.__config.background.image_path)
+        for section in self.__sections.values():
+            paths.extend(path for path in section.assets if path not in paths)
+        return paths
+
+    @property
+    def fonts(self) -> list[str]:
+        names = []
+        for section in self.__sections.values():
+            names.extend(name for name in section.fonts if name not in names)
+        return names
+
     @property
     def page(self) -> Dim:
         return self.__page
@@ -106,13 +207,32 @@ class Box:
     def size(self) -> Dim:
         return self.__size
 
+    @property
+    def footprint(self) -> Dim:
+        # The box with its cut line, the area it needs on a page.
+        return Dim(self.__size.x + 2 * self.__border_width, self.__size.y + 2 * self.__border_width)
+
+    @property
+    def border_color(self) -> str:
+        return self.__border_color
+
+    @property
+    def border_width(self) -> int:
+        return self.__border_width
+
+    @property
+    def background_inset(self) -> int:
+        # Background is slightly smaller than box to avoid printing
+        # too much on the glue strip, since it won't be seen.
+        return self.__tabs.x - 50
+
 
     def _set_page(self) -> None:
         """Set printable page size."""
         page = self.__config.page
         resolution = self.__config.common.resolution
-        self.__page.x = int((page.width - page.margin) * resolution)
-        self.__page.y = int((page.height - page.margin) * resolution)
+        self.__page = Dim(int((page.width - page.margin) * resolution),
+                          int((page.height - page.margin) * resolution))
 
 
     def _set_box_dimensions(self) -> None:
@@ -122,29 +242,27 @@ class Box:
         resolution = self.__config.common.resolution
 
         # Set box side widths in pixels
-        self.__dim.x = int(dim.width * resolution + page.thickness)
-        self.__dim.y = int(dim.height * resolution + page.thickness)
-        self.__dim.z = int(dim.depth * resolution + page.thickness)
-
-        # Set pixel width of glue tab
-        self.__tabs.x = self.__dim.z - 20
+        self.__dim = Dim(int(dim.width * resolution + page.thickness),
+                         int(dim.height * resolution + page.thickness),
+                         int(dim.depth * resolution + page.thickness))
 
-        # Set pixel height of tuck tabs
-        self.__tabs.y = int(resolution * 3 / 4)
+        # Set pixel width of glue tab and pixel height of tuck tabs
+        self.__tabs = Dim(self.__dim.z - 20, int(resolution * 3 / 4))
 
 
     def _set_box_size(self) -> None:
         """Calculate pixel size of unfolded box."""
-        # Width - Glue tab, left and right sides, front and back
-        self.__size.x = (self.__tabs.x + (2 * self.__dim.z) + (2 * self.__dim.x))
-        # Height - Top and bottom tabs, top and bottom, front / back
-        self.__size.y = ((2 * self.__tabs.y) + (2 * self.__dim.z) + self.__dim.y)
+        self.__size = Dim(
+            # Width - Glue tab, left and right sides, front and back
+            self.__tabs.x + (2 * self.__dim.z) + (2 * self.__dim.x),
+            # Height - Top and bottom tabs, top and bottom, front / back
+            (2 * self.__tabs.y) + (2 * self.__dim.z) + self.__dim.y)
 
 
     def _set_box_position(self) -> None:
         """Calculate box position on page."""
-        self.__pos.x = int((self.__page.x - self.__size.x) / 2)
-        self.__pos.y = int((self.__page.y - self.__size.y) / 2)
+        self.__pos = Dim(int((self.__page.x - self.__size.x) / 2),
+                         int((self.__page.y - self.__size.y) / 2))
 
 
     def _box_fits_page(self) -> bool:
@@ -265,64 +383,266 @@ class Box:
         rb_tab.flip_v = True
         self.__sections[SectionName.RB_TAB] = rb_tab
 
+        # Name the sections to label timings.
+        for name, section in self.__sections.items():
+            section.name = name.name.lower()
+
+
+    def _cached(self, key : Callable[[], tuple], render : Callable[[], tuple], persist : bool = True) -> tuple:
+        """Return the images made by render, reusing them from the cache if there is one.
+
+        key builds the cache key and is only called with a cache. With
+        persist False the images are only kept in memory.
+        """
+        if self.__cache is None:
+            return render()
+        cache_key = key()
+        images = self.__cache.get(cache_key, persist)
+        if images is None:
+            images = render()
+            self.__cache.put(cache_key, images, persist)
+        return images
+
+
+    def _render_section(self, section : Section) -> tuple[Image.Image, Image.Image, Image.Image]:
+        """Render the mask, image and border of a single section."""
+        def render() -> tuple[Image.Image, Image.Image, Image.Image]:
+            with span(section.name, "section", {"section" : section.name}):
+                return (section.render_mask(), section.render(), section.render_border(self.__border_color, self.__border_width))
+        return self._cached(lambda: ("section", section.render_key(), self.__border_color, self.__border_width), render)
+
+
+    def _render_sections(self, sections : list[Section], workers : int) -> list[tuple[Image.Image, Image.Image, Image.Image]]:
+        """Render the given sections, returning the results in the same order.
+
+        Sections are independent of each other, so with more than one
+        worker they are rendered concurrently on a thread pool.
+        """
+        with span("sections"):
+            if workers > 1 and len(sections) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(in_context(self._render_section), sections))
+            return [self._render_section(section) for section in sections]
+
+
+    def _background_key(self) -> tuple:
+        """Build a key describing everything the box background render depends on."""
+        config = self.__config.background
+        digest = file_digest(config.image_path) if config.image else None
+        return ("background", config.freeze(), self.__size.x - self.background_inset, self.__size.y, digest)
+
+
+    def _page_key(self) -> tuple:
+        """Build a key describing everything the page depends on.
+
+        The layout follows from the configuration, so with the content
+        of the image and font files used it decides the whole page.
+        """
+        assets = tuple((path, file_digest(path)) for path in self.assets)
+        fonts = tuple((name, file_digest(FontCache.path(name))) for name in self.fonts)
+        return ("page", self.__config.freeze(), assets, fonts)
+
+
+    def _render_background(self) -> Optional[Image.Image]:
+        """Render the box background, if one is set."""
+        if not self.__config.background.isSet:
+            return None
+        bg_size : Dim = Dim(self.__size.x - self.background_inset, self.__size.y)
+        def render() -> tuple[Image.Image]:
+            with span("background") as s:
+                background = BackgroundRenderer(self.__config.background).render(bg_size)
+                s.add_pixels(background)
+            return (background,)
+        return self._cached(self._background_key, render)[0]
+
+
+    def _section_rows(self, section : Section) -> tuple[int, int]:
+        """Return the first and last page rows touched by a section, including its border."""
+        top = section.pos.y + self.__pos.y - self.__border_width
+        return (top, top + section.print_size.y + 2 * self.__border_width)
+
+
+    def _compose(self, left : int, top : int, size : tuple[int, int], layers : list, background : Optional[Image.Image]) -> Image.Image:
+        """Composite a rectangle of the page.
+
+        The rectangle has its top left corner at page position
+        (left, top), and layers holds each section overlapping it
+        together with its rendered mask, image and border, in section
+        order. Every step works pixel by pixel, so composing the page in
+        pieces gives the same result as composing it whole.
+
+        With a cache, the background and border layers are reused while
+        the layout of the sections and the background stay the same.
+        """
+        border_width = self.__border_width
+        x0 = self.__pos.x - left
+        y0 = self.__pos.y - top
+
+        def layout_key() -> tuple:
+            sections = tuple((section.pos, section.geometry_key()) for section, _ in layers)
+            return (size, x0, y0, self.__border_color, border_width, sections)
+
+        with span("compose") as compose:
+            # Create page
+            page : Image.Image = Image.new("RGBA", size, (0,0,0,0))
+
+            # Generate mask
+            with span("mask"):
+                mask : Image.Image = Image.new("L", size, "white")
+                for section, (section_mask, _, _) in layers:
+                    pos = section.pos
+                    mask.paste(section_mask, (pos.x + x0, pos.y + y0))
+
+            # Generate background
+            if background is not None:
+                def render_background() -> tuple[Image.Image]:
+                    with span("background"):
+                        bg_layer : Image.Image = Image.new("RGBA", size, (0,0,0,0))
+                        bg_layer.paste(background, (x0 + self.background_inset, y0))
+                        return (Image.composite(page, bg_layer, mask),)
+                # Page sized layers load from disk no quicker than they compose.
+                page = self._cached(lambda: ("background layer", self._background_key(), layout_key()), render_background, False)[0]
+
+            # Place sections on box layer
+            with span("sections"):
+                section_layer = Image.new("RGBA", size, (0,0,0,0))
+                for section, (_, render, _) in layers:
+                    pos = section.pos
+                    section_layer.paste(render, (pos.x + x0, pos.y + y0))
+                page = Image.alpha_composite(page, section_layer)
+
+            # Place borders on border layer
+            def render_borders() -> tuple[Image.Image]:
+                with span("borders"):
+                    border_layer = Image.new("RGBA", size, (0,0,0,0))
+                    for section, (_, _, border) in layers:
+                        pos = section.pos
+                        x = pos.x + x0 - border_width
+                        y = pos.y + y0 - border_width
+                        # Borders may start outside the rectangle, skip the part outside it.
+                        border_layer.alpha_composite(border, (max(x, 0), max(y, 0)), (max(-x, 0), max(-y, 0)))
+
+                    # Cut out interior
+                    clear = Image.new("RGBA", size, (0,0,0,0))
+                    return (Image.composite(border_layer, clear, mask),)
+            page.alpha_composite(self._cached(lambda: ("border layer", layout_key()), render_borders, False)[0])
+
+            # # Add on cut / guide lines.
+
+            compose.add_pixels(page)
+        return page
+
+
+    def generate(self, workers : int = 1) -> Image.Image:
+        """Generate tuck box image.
+
+        Sections are rendered on a pool of `workers` threads if more
+        than one is requested. They are always placed in the same order,
+        so the result matches the serial render.
+        """
+        with span("generate"):
+            sections = list(self.__sections.values())
+            renders = self._render_sections(sections, workers)
+            return self._compose(0, 0, self.page.wh, list(zip(sections, renders)), self._render_background())
+
+
+    def generate_box(self, workers : int = 1) -> Image.Image:
+        """Generate only the box and its cut line, without the rest of the page.
+
+        The image is the size of the footprint, and matches the part of
+        the page from generate() that holds the box.
+        """
+        with span("generate"):
+            sections = list(self.__sections.values())
+            renders = self._render_sections(sections, workers)
+            left = self.__pos.x - self.__border_width
+            top = self.__pos.y - self.__border_width
+            return self._compose(left, top, self.footprint.wh, list(zip(sections, renders)), self._render_background())
+
+
+    def generate_tiles(self, tile_height : int, workers : int = 1) -> Iterator[tuple[int, Image.Image]]:
+        """Generate the tuck box image as a series of horizontal strips.
+
+        Yields the top row and image of each strip, from the top of the
+        page down. Each section is rendered when the first strip needs
+        it and dropped after the last, so only the strips and the
+        sections crossing them are held in memory. The strips stacked
+        together match the image from generate().
+        """
+        if tile_height <= 0:
+            msg = f"Tile height must be positive. Requested: {tile_height}"
+            logger.error(msg)
+            raise ValueError(msg)
 
-    def generate(self):
-        """Generate tuck box image."""
-        # Create page
-        page : Image.Image = Image.new("RGBA", self.page.wh, (0,0,0,0))
+        sections = list(self.__sections.values())
+        rows = [self._section_rows(section) for section in sections]
+        background = self._render_background()
+        rendered : dict[int, tuple[Image.Image, Image.Image, Image.Image]] = {}
 
-        # Generate mask
-        mask : Image.Image = Image.new("L", self.page.wh, "white")
-        for section in self.__sections:
-            section_mask = self.__sections[section].render_mask()
-            pos = self.__sections[section].pos
-            mask.paste(section_mask, (pos.x + self.__pos.x, pos.y + self.__pos.y))
-
-        # Generate background
-        if self.__config.background.isSet:
-            # Background is slightly smaller than box to avoid printing
-            # too much on the glue strip, since it won't be seen.
-            inset = self.__tabs.x - 50
-            bg_size : Dim = Dim(self.__size.x - inset, self.__size.y)
-            bg_layer : Image.Image = Image.new("RGBA", self.page.wh, (0,0,0,0))
-            background : Image.Image = BackgroundRenderer.render(self.__config.background, bg_size)
-            bg_layer.paste(background, (self.__pos.x + inset, self.__pos.y))
-            page = Image.composite(page, bg_layer, mask)
-
-        # Render sections to box layer
-        section_layer = Image.new("RGBA", self.page.wh, (0,0,0,0))
-        for section in self.__sections:
-            render = self.__sections[section].render()
-            pos = self.__sections[section].pos
-            section_layer.paste(render, (pos.x + self.__pos.x, pos.y + self.__pos.y))
-        page = Image.alpha_composite(page, section_layer)
-
-        # # Render border layer
-        # if 'border' in self.__data and 'color' in self.__data['border']:
-        #     border_color = self.__data['border']['color']
-        # else:
-        #     border_color = "black"
-        # if 'border' in self.__data and 'width' in self.__data['border']:
-        #     border_width = int(self.__data['border']['width'])
-        # else:
-        #     border_width = 4
-
-        border_color = 'black'
-        border_width = 4
-        border_layer = Image.new("RGBA", self.page.wh, (0,0,0,0))
-        for section in self.__sections:
-            border = self.__sections[section].render_border(border_color, border_width)
-            pos = self.__sections[section].pos
-            border_layer.alpha_composite(border, (pos.x + self.__pos.x - border_width, pos.y + self.__pos.y - border_width))
+        for top in range(0, self.page.y, tile_height):
+            height = min(tile_height, self.page.y - top)
+            needed = [i for i, (first, last) in enumerate(rows) if first < top + height and last > top]
+
+            missing = [i for i in needed if i not in rendered]
+            for i, render in zip(missing, self._render_sections([sections[i] for i in missing], workers)):
+                rendered[i] = render
+
+            yield top, self._compose(0, top, (self.page.x, height), [(sections[i], rendered[i]) for i in needed], background)
 
-        # Cut out interior
-        clear = Image.new("RGBA", self.page.wh, (0,0,0,0))
-        border_layer = Image.composite(border_layer, clear, mask)
-        page.alpha_composite(border_layer)
+            # Drop sections that no later strip reaches.
+            for i in [i for i in rendered if rows[i][1] <= top + height]:
+                del rendered[i]
 
-        # # Add on cut / guide lines.
 
-        page.show()
+    def render_to(self, path : str, format : Optional[str] = None, options : Optional[dict] = None, workers : int = 1, tile_height : int = 0) -> None:
+        """Generate tuck box image and write it to the given file.
+
+        Format is taken from the file extension unless given. Formats
+        without transparency support are flattened onto a white page.
+        Any options are passed on to the image encoder.
+
+        If tile_height is given, the page is composed in strips of that
+        many rows and each strip is encoded as soon as it is finished.
+        This is only supported for PNG output.
+
+        If the box cache has a disk store, a file written before from
+        the same configuration, files and options is copied from it
+        instead.
+        """
+        format = output_format(path, format)
+        options = options or {}
+
+        if tile_height and format != "PNG":
+            msg = f"Tiled output is only supported for PNG, not {format}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        store = self.__cache.store if self.__cache is not None else None
+        if store is None:
+            self._write_page(path, format, options, workers, tile_height)
+            return
+
+        key = (self._page_key(), format, tuple(sorted(options.items())), tile_height)
+        if store.get_file(key, path):
+            logger.info("Reused %s from the render cache.", path)
+            return
+        self._write_page(path, format, options, workers, tile_height)
+        store.put_file(key, path)
+
+
+    def _write_page(self, path : str, format : str, options : dict, workers : int, tile_height : int) -> None:
+        """Generate the page and write it to the given file, in strips if tile_height is given."""
+        if tile_height:
+            with open(path, "wb") as fp:
+                writer = PNGStreamWriter(fp, self.page.x, self.page.y, options.get("compress_level", 6))
+                for _, strip in self.generate_tiles(tile_height, workers):
+                    with span("save"):
+                        writer.write(strip)
+                with span("save"):
+                    writer.close()
+            return
+
+        save_page(self.generate(workers), path, format, options)
 
     def test_generate(self):
         clear = (0,0,0,0)
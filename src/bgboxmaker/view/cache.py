@@ -0,0 +1,636 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from PIL import Image, ImageFont
+import PIL
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+logger = logging.getLogger(__name__)
+
+
+class CacheInfo(NamedTuple):
+    """Hit and miss statistics for a cache."""
+    hits : int
+    misses : int
+    maxsize : int
+    currsize : int
+
+
+class FontCache:
+    """Process-wide cache of loaded fonts.
+
+    Fonts are kept by resolved file path, size and layout engine, so
+    a bare font name such as "Arial.ttf" is only searched for in the
+    system font directories once. The cache is shared by every text
+    feature in the process and is safe to use from multiple threads.
+
+    Methods
+    -------
+    get(name : str, size : int, layout_engine : int) -> FreeTypeFont
+        Returns the requested font, loading it on a cache miss.
+
+    path(name : str) -> str
+        Returns the file the font name resolves to.
+
+    info() -> CacheInfo
+        Returns hit and miss statistics for the cache.
+
+    clear() -> None
+        Discards all cached fonts and resolved paths.
+    """
+
+    maxsize : int = 256
+
+    __lock = threading.Lock()
+    __fonts : OrderedDict = OrderedDict()
+    __paths : dict[str, str] = {}
+    __hits : int = 0
+    __misses : int = 0
+
+    @classmethod
+    def get(cls, name : str, size : int, layout_engine : Optional[int] = None) -> ImageFont.FreeTypeFont:
+        """Return the requested font, loading it on a cache miss."""
+        with cls.__lock:
+            path = cls.__paths.get(name)
+            if path is not None:
+                key = (path, size, layout_engine)
+                font = cls.__fonts.get(key)
+                if font is not None:
+                    cls.__fonts.move_to_end(key)
+                    cls.__hits += 1
+                    return font
+
+        # Load outside the lock, another thread may load the same font
+        # at the same time but both results are equivalent.
+        font = ImageFont.truetype(path or name, size, layout_engine=layout_engine)
+        if isinstance(font.path, str):
+            path = os.path.abspath(font.path)
+        else:
+            path = name
+        key = (path, size, layout_engine)
+
+        with cls.__lock:
+            cls.__misses += 1
+            cls.__paths[name] = path
+            cls.__fonts[key] = font
+            cls.__fonts.move_to_end(key)
+            while len(cls.__fonts) > cls.maxsize:
+                cls.__fonts.popitem(last=False)
+        return font
+
+    @classmethod
+    def path(cls, name : str) -> str:
+        """Return the file the font name resolves to, loading the font if it was not used yet."""
+        with cls.__lock:
+            path = cls.__paths.get(name)
+        if path is None:
+            cls.get(name, 12)
+            with cls.__lock:
+                path = cls.__paths[name]
+        return path
+
+    @classmethod
+    def info(cls) -> CacheInfo:
+        """Return hit and miss statistics for the cache."""
+        with cls.__lock:
+            return CacheInfo(cls.__hits, cls.__misses, cls.maxsize, len(cls.__fonts))
+
+    @classmethod
+    def clear(cls) -> None:
+        """Discard all cached fonts and resolved paths."""
+        with cls.__lock:
+            cls.__fonts.clear()
+            cls.__paths.clear()
+            cls.__hits = 0
+            cls.__misses = 0
+
+
+class AssetCache:
+    """Process-wide cache of decoded images.
+
+    Images are kept by file path, modification time and file size, so
+    an edited file is decoded again on its next use. Images are stored
+    in RGBA mode, ready for compositing. When the caller only needs the
+    image to cover a given size, it is decoded at a reduced scale,
+    using the JPEG draft mode where possible. Cached images are shared and
+    must not be modified. The least recently used images are dropped
+    once the cache holds more than `budget` bytes of pixel data.
+
+    Methods
+    -------
+    get(filename : str, cover : tuple[int, int]) -> Image
+        Returns the decoded image, reading the file on a cache miss.
+
+    info() -> CacheInfo
+        Returns hit and miss statistics for the cache. Sizes are
+        given in bytes.
+
+    clear() -> None
+        Discards all cached images.
+    """
+
+    budget : int = 512 * 1024 * 1024
+
+    # Reduced images keep at least this much oversampling for the final resize.
+    reducing_gap : float = 2.0
+
+    __lock = threading.Lock()
+    __images : OrderedDict = OrderedDict()
+    __sizes : dict[tuple, tuple[int, int]] = {}
+    __bytes : int = 0
+    __hits : int = 0
+    __misses : int = 0
+
+    @classmethod
+    def _key(cls, filename : str) -> tuple:
+        """Build the cache key for a file."""
+        stat = os.stat(filename)
+        return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def _image_bytes(cls, image : Image.Image) -> int:
+        """Estimate the memory held by an image's pixel data."""
+        return image.width * image.height * len(image.getbands())
+
+    @classmethod
+    def _source_size(cls, filename : str, key : tuple) -> tuple[int, int]:
+        """Return the full size of the image in a file, reading only its header."""
+        with cls.__lock:
+            size = cls.__sizes.get(key)
+        if size is None:
+            with Image.open(filename, 'r') as im:
+                size = im.size
+            with cls.__lock:
+                cls.__sizes[key] = size
+        return size
+
+    @classmethod
+    def _reduction(cls, source : tuple[int, int], cover : tuple[int, int]) -> int:
+        """Find the largest power of two the source can be reduced by and still cover the given size."""
+        scale = max(cover[0] / source[0], cover[1] / source[1]) * cls.reducing_gap
+        reduce = 1
+        while scale * reduce * 2 <= 1:
+            reduce = reduce * 2
+        return reduce
+
+    @classmethod
+    def _decode(cls, filename : str, reduce : int) -> Image.Image:
+        """Decode a file into an RGBA image, reduced by the given factor."""
+        with Image.open(filename, 'r') as im:
+            w, h = im.size
+            if reduce > 1 and im.format == "JPEG":
+                # Let the JPEG decoder scale down by up to 8 for free.
+                im.draft(im.mode, (-(-w // reduce), -(-h // reduce)))
+            image = im.convert("RGBA")
+        remaining = reduce * image.width // w
+        if remaining > 1:
+            image = image.reduce(remaining)
+        return image
+
+    @classmethod
+    def get(cls, filename : str, cover : Optional[tuple[int, int]] = None) -> Image.Image:
+        """Return the decoded image, reading the file on a cache miss.
+
+        If `cover` is given, the image may be returned at a reduced
+        scale that is still large enough to be resized to cover it.
+        """
+        key = cls._key(filename)
+        reduce = 1
+        if cover is not None:
+            reduce = cls._reduction(cls._source_size(filename, key), cover)
+        key = key + (reduce,)
+
+        with cls.__lock:
+            image = cls.__images.get(key)
+            if image is not None:
+                cls.__images.move_to_end(key)
+                cls.__hits += 1
+                return image
+
+        image = cls._decode(filename, reduce)
+        size = cls._image_bytes(image)
+
+        with cls.__lock:
+            cls.__misses += 1
+            if size > cls.budget:
+                logger.info("Image %s is larger than the asset cache budget, not caching.", filename)
+                return image
+            if key not in cls.__images:
+                cls.__images[key] = image
+                cls.__bytes += size
+            while cls.__bytes > cls.budget:
+                _, evicted = cls.__images.popitem(last=False)
+                cls.__bytes -= cls._image_bytes(evicted)
+        return image
+
+    @classmethod
+    def info(cls) -> CacheInfo:
+        """Return hit and miss statistics for the cache, with sizes in bytes."""
+        with cls.__lock:
+            return CacheInfo(cls.__hits, cls.__misses, cls.budget, cls.__bytes)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Discard all cached images."""
+        with cls.__lock:
+            cls.__images.clear()
+            cls.__sizes.clear()
+            cls.__bytes = 0
+            cls.__hits = 0
+            cls.__misses = 0
+
+
+def file_stamp(filename : str) -> Optional[tuple[int, int]]:
+    """Return the modification time and size of a file, None if it is missing."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_digests : dict[str, tuple[tuple[int, int], str]] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(filename : str) -> Optional[str]:
+    """Return the SHA-256 of the content of a file, None if it is missing.
+
+    Digests are kept by modification time and size, so a file is only
+    read again after it changed.
+    """
+    path = os.path.abspath(filename)
+    stamp = file_stamp(path)
+    if stamp is None:
+        return None
+    with _digests_lock:
+        known = _digests.get(path)
+    if known is not None and known[0] == stamp:
+        return known[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[path] = (stamp, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _remove(path : str) -> None:
+    """Delete a file, ignoring one that is already gone."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=None)
+def _code_version() -> str:
+    """Digest of the package source and the Pillow version, which decide what a render looks like."""
+    digest = hashlib.sha256(f"{DiskCache.FORMAT} {PIL.__version__}".encode())
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for root, dirs, files in os.walk(package):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".py"):
+                with open(os.path.join(root, name), "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Cache of rendered sections and backgrounds.
+
+    Renders are kept by a key describing everything they depend on,
+    such as the frozen configuration, the geometry and the content of
+    the image and font files used, so a box built again from an edited
+    file only renders the parts that changed. Unlike the font and
+    asset caches a render cache is only used by the boxes it is given
+    to, and is safe to share between threads. Cached images are shared
+    and must not be modified. The least recently used renders are
+    dropped once the cache holds more than `budget` bytes of pixel
+    data. With a `store`, renders are also written to disk, and looked
+    up there when they are not in memory.
+
+    Methods
+    -------
+    get(key : tuple, persist : bool) -> Any
+        Returns the cached render, None on a cache miss.
+
+    put(key : tuple, images : tuple[Image, ...], persist : bool) -> None
+        Adds the images of a render to the cache, and to the store
+        unless persist is False.
+
+    info() -> CacheInfo
+        Returns hit and miss statistics for the cache. Sizes are
+        given in bytes.
+
+    clear() -> None
+        Discards all cached renders.
+    """
+
+    def __init__(self, budget : int = 256 * 1024 * 1024, store : Optional["DiskCache"] = None):
+        self.__budget : int = budget
+        self.__store : Optional[DiskCache] = store
+        self.__lock = threading.Lock()
+        self.__renders : OrderedDict = OrderedDict()
+        self.__sizes : dict[tuple, int] = {}
+        self.__bytes : int = 0
+        self.__hits : int = 0
+        self.__misses : int = 0
+
+    @property
+    def budget(self) -> int:
+        return self.__budget
+
+    @property
+    def store(self) -> Optional["DiskCache"]:
+        return self.__store
+
+    def get(self, key : tuple, persist : bool = True) -> Optional[tuple]:
+        """Return the cached render, None on a cache miss.
+
+        Renders that are not persisted are only looked for in memory.
+        """
+        with self.__lock:
+            render = self.__renders.get(key)
+            if render is not None:
+                self.__renders.move_to_end(key)
+                self.__hits += 1
+                return render
+        if self.__store is not None and persist:
+            render = self.__store.get_images(key)
+            if render is not None:
+                self._keep(key, render)
+        with self.__lock:
+            if render is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+        return render
+
+    def put(self, key : tuple, images : tuple, persist : bool = True) -> None:
+        """Add the images of a render to the cache.
+
+        With persist False the render is not written to the store, for
+        renders that are quicker to make again than to load.
+        """
+        if self.__store is not None and persist:
+            self.__store.put_images(key, images)
+        self._keep(key, images)
+
+    def _keep(self, key : tuple, images : tuple) -> None:
+        """Hold the images of a render in memory, within the budget."""
+        size = sum(image.width * image.height * len(image.getbands()) for image in images)
+        with self.__lock:
+            if size > self.__budget or key in self.__renders:
+                return
+            self.__renders[key] = images
+            self.__sizes[key] = size
+            self.__bytes += size
+            while self.__bytes > self.__budget:
+                evicted, _ = self.__renders.popitem(last=False)
+                self.__bytes -= self.__sizes.pop(evicted)
+
+    def info(self) -> CacheInfo:
+        """Return hit and miss statistics for the cache, with sizes in bytes."""
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__budget, self.__bytes)
+
+    def clear(self) -> None:
+        """Discard all cached renders."""
+        with self.__lock:
+            self.__renders.clear()
+            self.__sizes.clear()
+            self.__bytes = 0
+            self.__hits = 0
+            self.__misses = 0
+
+
+class DiskCache:
+    """Persistent cache of renders and output files, shared between runs.
+
+    Entries are files named by a hash of their key, so keys must only
+    hold values with a stable repr, and describe files by their
+    content rather than their modification time. The hash also covers
+    the package source and the Pillow version, so entries made by
+    other versions are never used. Files are replaced in one step,
+    and several processes can share a cache directory. Once more than
+    `budget` bytes are stored, the least recently used entries are
+    deleted.
+
+    Methods
+    -------
+    default_path() -> str
+        Returns the cache directory for the user, such as
+        ~/.cache/bgboxmaker.
+
+    get_images(key : tuple) -> tuple[Image, ...]
+        Returns the cached images, None on a cache miss.
+
+    put_images(key : tuple, images : tuple[Image, ...]) -> None
+        Stores the images.
+
+    get_file(key : tuple, path : str) -> bool
+        Copies the cached file to path, returning False on a cache
+        miss.
+
+    put_file(key : tuple, path : str) -> None
+        Stores a copy of the file.
+
+    trim() -> None
+        Deletes the least recently used entries until the cache is
+        within budget.
+
+    close() -> None
+        Trims the cache if entries were added since it was last
+        trimmed.
+
+    info() -> CacheInfo
+        Returns hit and miss statistics for the cache. Sizes are
+        given in bytes.
+
+    clear() -> None
+        Deletes every entry.
+    """
+
+    # Version of the entry layout, part of every key.
+    FORMAT : int = 1
+
+    def __init__(self, path : str, budget : int = 1024 * 1024 * 1024):
+        self.__path : str = path
+        self.__budget : int = budget
+        self.__lock = threading.Lock()
+        self.__added : int = 0
+        self.__hits : int = 0
+        self.__misses : int = 0
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def budget(self) -> int:
+        return self.__budget
+
+    @staticmethod
+    def default_path() -> str:
+        """Return the cache directory for the user."""
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "bgboxmaker")
+
+    def _entry(self, key : tuple, kind : str) -> str:
+        """Return the file holding the entry for a key."""
+        digest = hashlib.sha256(repr((_code_version(), key)).encode()).hexdigest()
+        return os.path.join(self.__path, digest[:2], f"{digest}.{kind}")
+
+    def _count(self, hit : bool) -> None:
+        with self.__lock:
+            if hit:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+
+    def _read(self, path : str) -> Optional[bytes]:
+        """Read an entry, marking it as used, None if there is none."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _write(self, path : str, data : bytes) -> None:
+        """Write an entry in one step, trimming the cache now and then."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp, path)
+            except BaseException:
+                # trim() skips temporary files, never leave one behind.
+                _remove(temp)
+                raise
+        except OSError as e:
+            # A cache that can not be written only costs time.
+            logger.warning("Unable to write to the render cache %s: %s", self.__path, e)
+            return
+        with self.__lock:
+            self.__added += len(data)
+            full = self.__added > self.__budget // 10
+        if full:
+            self.trim()
+
+    def get_images(self, key : tuple) -> Optional[tuple]:
+        """Return the cached images, None on a cache miss."""
+        path = self._entry(key, "images")
+        data = self._read(path)
+        if data is None:
+            self._count(False)
+            return None
+        try:
+            header, _, body = data.partition(b"\n")
+            images = []
+            offset = 0
+            for mode, width, height, length in json.loads(header):
+                pixels = zlib.decompress(body[offset:offset + length])
+                images.append(Image.frombytes(mode, (width, height), pixels))
+                offset += length
+        except (ValueError, zlib.error) as e:
+            logger.warning("Dropping unreadable render cache entry %s: %s", path, e)
+            _remove(path)
+            self._count(False)
+            return None
+        self._count(True)
+        return tuple(images)
+
+    def put_images(self, key : tuple, images : tuple) -> None:
+        """Store the images."""
+        header = []
+        chunks = []
+        for image in images:
+            # Renders are mostly flat color, the fastest level compresses them well.
+            chunk = zlib.compress(image.tobytes(), 1)
+            header.append([image.mode, image.width, image.height, len(chunk)])
+            chunks.append(chunk)
+        self._write(self._entry(key, "images"), json.dumps(header).encode() + b"\n" + b"".join(chunks))
+
+    def get_file(self, key : tuple, path : str) -> bool:
+        """Copy the cached file to path, returning False on a cache miss."""
+        data = self._read(self._entry(key, "file"))
+        self._count(data is not None)
+        if data is None:
+            return False
+        # Replace the output in one step, an interrupted copy must not
+        # leave a truncated file behind.
+        temp = f"{path}.tmp"
+        try:
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            _remove(temp)
+            raise
+        return True
+
+    def put_file(self, key : tuple, path : str) -> None:
+        """Store a copy of the file."""
+        with open(path, "rb") as f:
+            self._write(self._entry(key, "file"), f.read())
+
+    def _entries(self) -> list[tuple[str, os.stat_result]]:
+        """Return the path and status of every entry."""
+        entries : list[tuple[str, os.stat_result]] = []
+        if not os.path.isdir(self.__path):
+            return entries
+        for folder in os.scandir(self.__path):
+            if folder.is_dir():
+                entries.extend((entry.path, entry.stat()) for entry in os.scandir(folder.path) if not entry.name.endswith(".tmp"))
+        return entries
+
+    def trim(self) -> None:
+        """Delete the least recently used entries until the cache is within budget."""
+        with self.__lock:
+            self.__added = 0
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime_ns)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.__budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Removed by another process sharing the cache.
+                pass
+            total -= stat.st_size
+
+    def close(self) -> None:
+        """Trim the cache if entries were added since it was last trimmed."""
+        with self.__lock:
+            added = self.__added
+        if added:
+            self.trim()
+
+    def info(self) -> CacheInfo:
+        """Return hit and miss statistics for the cache, with sizes in bytes."""
+        size = sum(stat.st_size for _, stat in self._entries())
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__budget, size)
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        if os.path.isdir(self.__path):
+            shutil.rmtree(self.__path)
+        with self.__lock:
+            self.__hits = 0
+            self.__misses = 0
+            self.__added = 0
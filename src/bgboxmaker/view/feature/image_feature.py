@@ -1,4 +1,5 @@
 from bgboxmaker import FeatureConfig, Dim
+from bgboxmaker.view.cache import AssetCache
 from bgboxmaker.view.feature import Feature
 from PIL import Image
 
@@ -11,8 +12,7 @@ class ImageFeature(Feature):
 
     def _get_image(self, filename : str) -> Image.Image:
         """Open and return an Image"""
-        with Image.open(filename, 'r') as im:
-            return im
+        return AssetCache.get(filename)
 
 
     def render(self,  bounds : Dim) -> Image.Image:
@@ -22,8 +22,7 @@ class ImageFeature(Feature):
         image = self._get_image(self.config.options.image_path) # type: ignore
 
         # Resize to spec
-        image_size : Dim = Dim()
-        image_size.w, image_size.h = image.size
+        image_size : Dim = Dim(*image.size)
 
 
         if self.config.width > 0 and self.config.height > 0:
@@ -37,11 +36,9 @@ class ImageFeature(Feature):
             bounds_ratio : float = bounds.w / bounds.h
 
             if image_ratio < bounds_ratio:
-                image_size.w = int(bounds.h * image_ratio)
-                image_size.h = bounds.h
+                image_size = Dim(int(bounds.h * image_ratio), bounds.h)
             else:
-                image_size.w = bounds.w
-                image_size.h = int(bounds.w / image_ratio)
+                image_size = Dim(bounds.w, int(bounds.w / image_ratio))
 
             render = image.resize([image_size.w, image_size.h])
 
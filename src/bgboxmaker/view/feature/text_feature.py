@@ -1,6 +1,7 @@
 from bgboxmaker import FeatureConfig, Dim, FontConfig, OptionsTextConfig
+from bgboxmaker.view.cache import FontCache
 from bgboxmaker.view.feature import Feature
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 
 class TextFeature(Feature):
@@ -9,6 +10,74 @@ class TextFeature(Feature):
     def __init__(self, config : FeatureConfig):
         self.config = config
 
+    def _measure(self, draw : ImageDraw.ImageDraw, font_size : int, anchor : str) -> tuple[int, int]:
+        """Measure the width and height of the text at the given font size."""
+        options : OptionsTextConfig = self.config.options # type: ignore
+        font_data : FontConfig = options.common.font
+        font = FontCache.get(font_data.name, font_size)
+        tx1, ty1, tx2, ty2 = draw.multiline_textbbox((0,0), options.text, font=font, anchor=anchor, align=options.align, stroke_width=font_data.width)
+        return (tx2 - tx1, ty2 - ty1)
+
+
+    def _fits(self, draw : ImageDraw.ImageDraw, font_size : int, anchor : str, bounds : Dim) -> bool:
+        """Check if the text fits in the bounds at the given font size."""
+        w, h = self._measure(draw, font_size, anchor)
+        return w < bounds.x and h < bounds.y
+
+
+    def _fit_font_size(self, draw : ImageDraw.ImageDraw, anchor : str, bounds : Dim) -> int:
+        """Find the largest font size, down to a minimum of 8, that fits in the bounds.
+
+        The text is measured once at the configured size, and the size
+        is scaled down from that measurement to get a first guess. The
+        guess is then widened into a bracket and narrowed by bisection,
+        giving the same size as stepping down one point at a time.
+        """
+        font_data : FontConfig = self.config.options.common.font # type: ignore
+        minimum = 8
+
+        # Known to fit (or the minimum) at lo, known not to fit at hi.
+        hi = font_data.size
+        if hi <= minimum:
+            return hi
+
+        w, h = self._measure(draw, hi, anchor)
+        if w < bounds.x and h < bounds.y:
+            return hi
+
+        lo = minimum
+        scale = min(bounds.x / w if w > 0 else 1, bounds.y / h if h > 0 else 1)
+        guess = int(hi * scale)
+        if lo < guess < hi:
+            # Gallop away from the guess to bracket the answer.
+            step = 1
+            if self._fits(draw, guess, anchor, bounds):
+                lo = guess
+                while lo + step < hi:
+                    if not self._fits(draw, lo + step, anchor, bounds):
+                        hi = lo + step
+                        break
+                    lo = lo + step
+                    step = step * 2
+            else:
+                hi = guess
+                while hi - step > lo:
+                    if self._fits(draw, hi - step, anchor, bounds):
+                        lo = hi - step
+                        break
+                    hi = hi - step
+                    step = step * 2
+
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._fits(draw, mid, anchor, bounds):
+                lo = mid
+            else:
+                hi = mid
+
+        return lo
+
+
     def render(self, bounds : Dim) -> Image.Image:
         """Render text to fit in requested bounds."""
 
@@ -25,28 +94,14 @@ class TextFeature(Feature):
         t_anchor = "{}{}".format(h_anchor[self.config.anchor.x], v_anchor[self.config.anchor.y])
 
         # Get position
-        pos = Dim(0,0)
-        pos.x = self.config.anchor.x * int(bounds.w / 2)
-        pos.y = self.config.anchor.y * int(bounds.h / 2)
+        pos = Dim(self.config.anchor.x * int(bounds.w / 2),
+                  self.config.anchor.y * int(bounds.h / 2))
 
         # # Find appropriate font size
         font_data : FontConfig = options.common.font
-        font_size = font_data.size
-
-        while font_size > 8:
-            # Set font
-            font = ImageFont.truetype(font_data.name, font_size)
-            # Get Bounding Box size
-            tx1, ty1, tx2, ty2 = draw.multiline_textbbox((0,0), options.text, font=font, anchor=t_anchor, align=options.align, stroke_width=font_data.width)
-            w = tx2 - tx1
-            h = ty2 - ty1
-
-            if w < bounds.x and h < bounds.y:
-                break
-
-            font_size = font_size - 1
+        font_size = self._fit_font_size(draw, t_anchor, bounds)
 
-        font = ImageFont.truetype(font_data.name, font_size)
+        font = FontCache.get(font_data.name, font_size)
         draw.multiline_text(pos.xy, options.text, font=font, anchor=t_anchor, align=options.align, stroke_width=font_data.width, fill=font_data.color, stroke_fill=font_data.stroke)
 
         return render
@@ -24,7 +24,7 @@ class FeatureGrid:
         if lines.x > 0 and lines.y > 0:
             self.__lines : Dim = lines
         else:
-            logger.error("Grid must be at least 1 x 1. Requested: {lines.x} by {lines.y}")
+            logger.error("Grid must be at least 1 x 1. Requested: %s by %s", lines.x, lines.y)
             raise ValueError
         self.__area : Dim = area
         self.__margin : int = margin
@@ -48,6 +48,6 @@ class FeatureGrid:
     def get_pos(self, location : Dim) -> Dim:
         """Return pixel coordinates for given grid location"""
         if location.x > self.__lines.x or location.y > self.__lines.y:
-            logger.error(f"Requested location ({location}) invalid for grid of size {self.__lines}")
+            logger.error("Requested location (%s) invalid for grid of size %s", location, self.__lines)
             raise ValueError
         return Dim(self.__x[location.x], self.__y[location.y])
@@ -0,0 +1,370 @@
+from bgboxmaker.dim import Dim
+from bgboxmaker.model import FeatureType, FeatureConfig, OptionsTextConfig, FontConfig, SectionType, BackgroundConfig
+from bgboxmaker.view import Box, Section, BackgroundRenderer, FeatureGrid, FontCache
+from bgboxmaker.view.feature import TextFeature, PanelFeature, ImageFeature
+from bgboxmaker.view.pdf_writer import PDFWriter, pdf_number, pdf_string, pdf_encodable, font_embeddable
+from PIL import Image, ImageColor, ImageDraw
+from typing import Optional
+import logging
+logger = logging.getLogger(__name__)
+
+# Affine transform (a, b, c, d, e, f) mapping (x, y) to
+# (a * x + c * y + e, b * x + d * y + f), as used by PDF.
+Matrix = tuple[float, float, float, float, float, float]
+IDENTITY : Matrix = (1, 0, 0, 1, 0, 0)
+
+# Control point distance for a quarter ellipse drawn as a Bezier curve.
+KAPPA = 0.5522847498
+
+
+def _multiply(first : Matrix, second : Matrix) -> Matrix:
+    """Combine two transforms, applying first and then second."""
+    a1, b1, c1, d1, e1, f1 = first
+    a2, b2, c2, d2, e2, f2 = second
+    return (
+        a2 * a1 + c2 * b1,
+        b2 * a1 + d2 * b1,
+        a2 * c1 + c2 * d1,
+        b2 * c1 + d2 * d1,
+        a2 * e1 + c2 * f1 + e2,
+        b2 * e1 + d2 * f1 + f2,
+    )
+
+
+def _apply(matrix : Matrix, x : float, y : float) -> tuple[float, float]:
+    """Transform a single point."""
+    a, b, c, d, e, f = matrix
+    return (a * x + c * y + e, b * x + d * y + f)
+
+
+def _orientation_matrix(section : Section, size : Dim) -> Matrix:
+    """Build the transform matching Section._fix_orientation for an image of the given size."""
+    w, h = size.x, size.y
+    matrix = IDENTITY
+    if section.orientation != section.print_orientation:
+        # Quarter turn counter clockwise, swapping width and height.
+        matrix = _multiply(matrix, (0, -1, 1, 0, 0, w))
+        w, h = h, w
+    if section.rotated:
+        matrix = _multiply(matrix, (-1, 0, 0, -1, w, h))
+    if section.flip_v:
+        matrix = _multiply(matrix, (1, 0, 0, -1, 0, h))
+    if section.flip_h:
+        matrix = _multiply(matrix, (-1, 0, 0, 1, w, 0))
+    return matrix
+
+
+def _shape_path(section_type : SectionType, cutin : int, size : Dim) -> list[tuple]:
+    """Build the outline of a section type as path segments, matching Section._draw_shapes."""
+    w, h = size.x, size.y
+
+    if section_type == SectionType.SIDE_TAB:
+        return [("m", 0, h), ("l", 0, h / 2), ("l", w / 4, 0), ("l", w, 0), ("l", w, h), ("h",)]
+
+    if section_type == SectionType.TUCK_TAB:
+        # Rectangle with the lower half of an ellipse below it.
+        w = int(w)
+        rx = w / 2
+        ry = int(h / 2)
+        cx, cy = rx, ry
+        return [
+            ("m", 0, 0), ("l", w, 0), ("l", w, cy),
+            ("c", cx + rx, cy + KAPPA * ry, cx + KAPPA * rx, cy + ry, cx, cy + ry),
+            ("c", cx - KAPPA * rx, cy + ry, cx - rx, cy + KAPPA * ry, cx - rx, cy),
+            ("h",),
+        ]
+
+    if section_type == SectionType.BACK and cutin > 0:
+        # Rectangle with a half ellipse thumb hole cut into the top edge.
+        rx = int(cutin) / 2
+        ry = int(cutin / 2) / 2
+        cx = int(w / 2 - cutin / 2) + rx
+        depth = int(-cutin / 4) + 2 * ry
+        return [
+            ("m", 0, 0), ("l", cx - rx, 0),
+            ("c", cx - rx, KAPPA * depth, cx - KAPPA * rx, depth, cx, depth),
+            ("c", cx + KAPPA * rx, depth, cx + rx, KAPPA * depth, cx + rx, 0),
+            ("l", w, 0), ("l", w, h), ("l", 0, h), ("h",),
+        ]
+
+    return [("m", 0, 0), ("l", w, 0), ("l", w, h), ("l", 0, h), ("h",)]
+
+
+def _path_ops(path : list[tuple], matrix : Matrix = IDENTITY) -> str:
+    """Write path segments as PDF path operators, transforming their points."""
+    ops = []
+    for segment in path:
+        op = segment[0]
+        points = []
+        for i in range(1, len(segment), 2):
+            points.extend(_apply(matrix, segment[i], segment[i + 1]))
+        ops.append(" ".join(pdf_number(value) for value in points) + f" {op}" if points else op)
+    return "\n".join(ops)
+
+
+def _color(color : str, stroke : bool = False) -> str:
+    """Set the fill or stroke color from a color name."""
+    rgb = ImageColor.getrgb(color)
+    values = " ".join(pdf_number(round(value / 255, 4)) for value in rgb[:3])
+    return f"{values} {'RG' if stroke else 'rg'}"
+
+
+class PDFRenderer:
+    """Render a box to a PDF page with vector shapes and text.
+
+    Section outlines, tab shapes, cut lines, panels and text are
+    written as vector paths and embedded font text. Background images
+    and image features are placed as raster images. Their source files
+    are embedded as they are, scaled on the page, when that is smaller
+    than a render at the resolution given in the box configuration.
+    Text that can not be written with an embedded WinAnsi font is
+    placed as a rendered image.
+
+    Attributes
+    ----------
+    box : Box
+        The box to render.
+
+    Methods
+    -------
+    render(path : str) -> None
+        Writes the box to a single page PDF file.
+
+    add_page(writer : PDFWriter) -> None
+        Adds the box as the next page of a PDF being written.
+    """
+
+    def __init__(self, box : Box):
+        self.box : Box = box
+        self.__content : list[str] = []
+        self.__fonts : dict[str, int] = {}
+        self.__images : dict[str, int] = {}
+
+    def _placement(self, section : Section) -> Matrix:
+        """Build the transform from section working space to page space."""
+        x = section.pos.x + self.box.pos.x
+        y = section.pos.y + self.box.pos.y
+        return _multiply(_orientation_matrix(section, section.size), (1, 0, 0, 1, x, y))
+
+    def _border_placement(self, section : Section) -> Matrix:
+        """Build the transform from border working space to page space."""
+        width = self.box.border_width
+        size = Dim(section.size.x + width * 2, section.size.y + width * 2)
+        x = section.pos.x + self.box.pos.x - width
+        y = section.pos.y + self.box.pos.y - width
+        return _multiply(_orientation_matrix(section, size), (1, 0, 0, 1, x, y))
+
+    def _image(self, writer : PDFWriter, image : Image.Image, x : float, y : float) -> None:
+        """Place a raster image with its top left corner at the given position."""
+        name = f"Im{writer.add_image(image)}"
+        self.__images[name] = int(name[2:])
+        self._place(name, x, y, image.width, image.height)
+
+    def _place(self, name : str, x : float, y : float, width : float, height : float) -> None:
+        """Draw an embedded image stretched over the given rectangle."""
+        # Images fill the unit square from the bottom up, flip them to match the page.
+        self.__content.append(
+            f"q {pdf_number(width)} 0 0 {pdf_number(-height)} {pdf_number(x)} {pdf_number(y + height)} cm /{name} Do Q"
+        )
+
+    def _source(self, writer : PDFWriter, filename : str, scale : float) -> Optional[str]:
+        """Embed an image file shown at scale times its size, None if a render is smaller.
+
+        JPEG files are kept as they are unless they are shown at less
+        than half their size, other files only when they are scaled up.
+        """
+        with Image.open(filename) as source:
+            jpeg = source.format == "JPEG" and source.mode in ("RGB", "L")
+        if scale < (0.5 if jpeg else 1):
+            return None
+        name = f"Im{writer.add_image_file(filename)}"
+        self.__images[name] = int(name[2:])
+        return name
+
+    def _background(self, writer : PDFWriter, background : BackgroundConfig, bounds : Dim, x : float, y : float) -> None:
+        """Fill a rectangle with a background color or image, covering it as BackgroundRenderer does."""
+        if not background.image:
+            self.__content.append(f"{_color(background.color)} {x} {y} {bounds.x} {bounds.y} re f")
+            return
+        with Image.open(background.image_path) as source:
+            width, height = source.size
+        scale = max(bounds.x / width, bounds.y / height)
+        name = self._source(writer, background.image_path, scale)
+        if name is None:
+            self._image(writer, BackgroundRenderer(background).render(bounds), x, y)
+            return
+        # Centered on the rectangle, with the excess clipped off.
+        width, height = width * scale, height * scale
+        self.__content.append(f"q {x} {y} {bounds.x} {bounds.y} re W n")
+        self._place(name, x - (width - bounds.x) / 2, y - (height - bounds.y) / 2, width, height)
+        self.__content.append("Q")
+
+    def _text(self, writer : PDFWriter, feature : TextFeature, bounds : Dim, pos : Dim) -> bool:
+        """Write a text feature as embedded font text.
+
+        Returns False, writing nothing, if the font is not a file that
+        can be embedded or the text has characters outside WinAnsi.
+        """
+        config : FeatureConfig = feature.config
+        options : OptionsTextConfig = config.options # type: ignore
+        font_data : FontConfig = options.common.font
+
+        h_anchor = ['l', 'm', 'r']
+        v_anchor = ['a', 'm', 'd']
+        t_anchor = "{}{}".format(h_anchor[config.anchor.x], v_anchor[config.anchor.y])
+        scratch = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        font_size = feature._fit_font_size(scratch, t_anchor, bounds)
+        font = FontCache.get(font_data.name, font_size)
+        if not font_embeddable(font) or not pdf_encodable(options.text):
+            logger.info("Unable to write text %r with font %s as vector text.", options.text, font_data.name)
+            return False
+
+        name = f"F{writer.add_font(font)}"
+        self.__fonts[name] = int(name[1:])
+
+        # Lay out lines the way Pillow does for multiline text.
+        lines = options.text.split("\n")
+        ascent, descent = font.getmetrics()
+        stroke = font_data.width
+        spacing = font.getbbox("A", stroke_width=stroke)[3] + stroke + 4
+        widths = [font.getlength(line) for line in lines]
+        block_width = max(widths)
+
+        x = pos.x + config.anchor.x * int(bounds.w / 2)
+        y = pos.y + config.anchor.y * int(bounds.h / 2)
+        left = x - config.anchor.x * block_width / 2
+        if config.anchor.y == 0:
+            baseline = y + ascent
+        elif config.anchor.y == 1:
+            baseline = y + (ascent - descent) / 2 - (len(lines) - 1) * spacing / 2
+        else:
+            baseline = y - descent - (len(lines) - 1) * spacing
+
+        shows = []
+        for i, (line, width) in enumerate(zip(lines, widths)):
+            line_x = left
+            if options.align == "center":
+                line_x = left + (block_width - width) / 2
+            elif options.align == "right":
+                line_x = left + block_width - width
+            # Text is drawn upright on the flipped page.
+            shows.append(f"1 0 0 -1 {pdf_number(line_x)} {pdf_number(baseline + i * spacing)} Tm {pdf_string(line)} Tj")
+
+        text = [f"BT /{name} {font_size} Tf"]
+        if stroke > 0:
+            text.append(f"1 Tr {stroke * 2} w 1 j {_color(font_data.stroke, stroke=True)}")
+            text.extend(shows)
+        text.append(f"0 Tr {_color(font_data.color)}")
+        text.extend(shows)
+        text.append("ET")
+        self.__content.append("\n".join(text))
+        return True
+
+    def _panel(self, feature : PanelFeature, bounds : Dim, pos : Dim) -> None:
+        """Write a panel feature as a filled and outlined rectangle."""
+        options = feature.config.options
+        color : str = options.color # type: ignore
+        border : str = options.border # type: ignore
+        width : int = options.border_width # type: ignore
+        self.__content.append(f"{_color(color)} {pos.x} {pos.y} {bounds.w} {bounds.h} re f")
+        if width > 0:
+            inset = width / 2
+            self.__content.append(
+                f"{_color(border, stroke=True)} {width} w "
+                f"{pdf_number(pos.x + inset)} {pdf_number(pos.y + inset)} {pdf_number(bounds.w - width)} {pdf_number(bounds.h - width)} re S"
+            )
+
+    def _features(self, writer : PDFWriter, section : Section) -> None:
+        """Write the features of a section, placed as in Section._get_features."""
+        margin : int = section._get_margin()
+        bounds : Dim = section._get_hard_bounds(margin)
+        grid : FeatureGrid = FeatureGrid(section.config.grid, section.size, margin)
+
+        for feature in section.config.features:
+            feature_bounds = section._get_feature_bounds(feature, bounds)
+            feature_object = section._feature_factory(feature)
+            if feature.type == FeatureType.IMAGE:
+                image = feature_object.render(feature_bounds)
+                pos = section._get_feature_pos(grid, feature, Dim(*image.size))
+                filename = feature.options.image_path # type: ignore
+                with Image.open(filename) as source:
+                    scale = min(image.width / source.width, image.height / source.height)
+                name = self._source(writer, filename, scale)
+                if name is None:
+                    self._image(writer, image, pos.x, pos.y)
+                else:
+                    self._place(name, pos.x, pos.y, image.width, image.height)
+            else:
+                pos = section._get_feature_pos(grid, feature, Dim(feature_bounds.w, feature_bounds.h))
+                if feature.type == FeatureType.TEXT:
+                    if not self._text(writer, feature_object, feature_bounds, pos):
+                        # Rendered to the bounds, placed where the vector text would be.
+                        self._image(writer, feature_object.render(feature_bounds), pos.x, pos.y)
+                else:
+                    self._panel(feature_object, feature_bounds, pos)
+
+    def _section(self, writer : PDFWriter, section : Section) -> None:
+        """Write a section clipped to its shape."""
+        background = section.config.background
+        if not background.isSet and not section.config.features:
+            return
+
+        m = self._placement(section)
+        self.__content.append("q " + " ".join(pdf_number(value) for value in m) + " cm")
+        self.__content.append(_path_ops(_shape_path(section.type, section.cutin, section.size)) + "\nW n")
+
+        if background.isSet:
+            self._background(writer, background, section.size, 0, 0)
+
+        self._features(writer, section)
+        self.__content.append("Q")
+
+    def add_page(self, writer : PDFWriter) -> None:
+        """Add the box as the next page of a PDF being written."""
+        self.__content = []
+        self.__fonts = {}
+        self.__images = {}
+
+        box = self.box
+        sections = list(box.sections.values())
+        scale = 72 / box.config.common.resolution
+        width, height = box.page.x, box.page.y
+
+        # Work in pixels from the top left, as the raster renderer does.
+        self.__content.append(f"{pdf_number(scale)} 0 0 {pdf_number(-scale)} 0 {pdf_number(height * scale)} cm")
+        outlines = [_path_ops(_shape_path(section.type, section.cutin, section.size), self._placement(section)) for section in sections]
+
+        # Box background, shown inside the section shapes.
+        background = box.config.background
+        if background.isSet:
+            x = box.pos.x + box.background_inset
+            self.__content.append("q")
+            self.__content.append("\n".join(outlines) + "\nW n")
+            self._background(writer, background, Dim(box.size.x - box.background_inset, box.size.y), x, box.pos.y)
+            self.__content.append("Q")
+
+        for section in sections:
+            self._section(writer, section)
+
+        # Cut lines, the enlarged section shapes with the sections themselves cut out.
+        self.__content.append("q")
+        self.__content.append(f"0 0 {width} {height} re\n" + "\n".join(outlines) + "\nW* n")
+        self.__content.append(_color(box.border_color))
+        for section in sections:
+            border_size = Dim(section.size.x + box.border_width * 2, section.size.y + box.border_width * 2)
+            self.__content.append(_path_ops(_shape_path(section.type, section.cutin, border_size), self._border_placement(section)) + "\nf")
+        self.__content.append("Q")
+
+        resources = []
+        if self.__fonts:
+            resources.append("/Font << " + " ".join(f"/{name} {number} 0 R" for name, number in self.__fonts.items()) + " >>")
+        if self.__images:
+            resources.append("/XObject << " + " ".join(f"/{name} {number} 0 R" for name, number in self.__images.items()) + " >>")
+        writer.add_page(width * scale, height * scale, "\n".join(self.__content).encode("latin-1"), " ".join(resources))
+
+    def render(self, path : str) -> None:
+        """Write the box to a single page PDF file."""
+        with open(path, "wb") as fp:
+            writer = PDFWriter(fp)
+            self.add_page(writer)
+            writer.close()
@@ -0,0 +1,264 @@
+from typing import BinaryIO
+from PIL import Image, ImageFont
+import io
+import os
+import struct
+import zlib
+
+
+def pdf_number(value : float) -> str:
+    """Format a number for a PDF file."""
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def png_stream(image : Image.Image) -> bytes:
+    """Return the image as PNG filtered, zlib compressed rows.
+
+    This is the data of the PNG IDAT chunks, which is also a valid
+    FlateDecode stream with a PNG predictor, so Pillow's encoder does
+    the row filtering that makes photos and gradients compress well.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    data = buffer.getvalue()
+    chunks = []
+    offset = 8
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        if kind == b"IDAT":
+            chunks.append(data[offset + 8:offset + 8 + length])
+        offset += length + 12
+    return b"".join(chunks)
+
+
+def pdf_encodable(text : str) -> bool:
+    """Return True if text can be written in WinAnsi encoding."""
+    try:
+        text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def font_embeddable(font : ImageFont.FreeTypeFont) -> bool:
+    """Return True if the font was loaded from a file that can be embedded."""
+    return isinstance(font.path, (str, os.PathLike))
+
+
+def pdf_string(text : str) -> str:
+    """Format text as a PDF string literal in WinAnsi encoding.
+
+    Raises UnicodeEncodeError for text with characters outside WinAnsi,
+    check it with pdf_encodable first.
+    """
+    data = text.encode("cp1252")
+    escaped = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return "(" + escaped.decode("latin-1") + ")"
+
+
+class PDFWriter:
+    """Write a PDF file one object at a time.
+
+    Objects are written to the file as soon as they are added, and
+    only their offsets are kept, so pages can be added one after
+    another without holding earlier pages in memory. The page tree,
+    catalog and cross reference table are written on close.
+
+    Attributes
+    ----------
+    pages : int
+        Number of pages added so far.
+
+    Methods
+    -------
+    add_object(body : bytes) -> int
+        Writes an object and returns its object number.
+
+    add_stream(entries : str, data : bytes) -> int
+        Writes a compressed stream object and returns its object number.
+
+    add_image(image : Image) -> int
+        Writes an image XObject, with a soft mask for any transparency.
+
+    add_image_file(filename : str) -> int
+        Embeds an image file as an image XObject, once per file, keeping
+        JPEG data as it is.
+
+    add_font(font : FreeTypeFont) -> int
+        Embeds a TrueType font for WinAnsi text, once per font file.
+
+    add_page(width : float, height : float, content : bytes, resources : str) -> int
+        Writes a page of the given size in points.
+
+    add_image_page(image : Image, resolution : int) -> int
+        Writes a page showing a single image at the given resolution.
+
+    close() -> None
+        Finishes the file.
+    """
+
+    def __init__(self, fp : BinaryIO):
+        self.__fp : BinaryIO = fp
+        self.__offsets : dict[int, int] = {}
+        self.__next : int = 1
+        self.__kids : list[int] = []
+        self.__fonts : dict[str, int] = {}
+        self.__files : dict[str, int] = {}
+        self.__pages_root : int = self._reserve()
+        self.__fp.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def pages(self) -> int:
+        return len(self.__kids)
+
+    def _reserve(self) -> int:
+        """Allocate an object number to be written later."""
+        number = self.__next
+        self.__next += 1
+        return number
+
+    def _write(self, number : int, body : bytes) -> int:
+        """Write an object with a previously allocated number."""
+        self.__offsets[number] = self.__fp.tell()
+        self.__fp.write(f"{number} 0 obj\n".encode())
+        self.__fp.write(body)
+        self.__fp.write(b"\nendobj\n")
+        return number
+
+    def add_object(self, body : bytes) -> int:
+        """Write an object and return its object number."""
+        return self._write(self._reserve(), body)
+
+    def add_stream(self, entries : str, data : bytes, compress : bool = True) -> int:
+        """Write a stream object and return its object number."""
+        if compress:
+            data = zlib.compress(data)
+            entries = entries + " /Filter /FlateDecode"
+        header = f"<< {entries} /Length {len(data)} >>\nstream\n".encode()
+        return self.add_object(header + data + b"\nendstream")
+
+    def add_image(self, image : Image.Image) -> int:
+        """Write an image XObject and return its object number.
+
+        Transparency is kept as a soft mask, other modes are stored as
+        RGB. Rows are stored with PNG prediction, as in a PNG file.
+        """
+        entries = f"/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} /BitsPerComponent 8"
+        smask = ""
+        if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+            image = image.convert("RGBA")
+            alpha = image.getchannel("A")
+            if alpha.getextrema() != (255, 255):
+                number = self._add_predicted(entries + " /ColorSpace /DeviceGray", alpha)
+                smask = f" /SMask {number} 0 R"
+        return self._add_predicted(entries + " /ColorSpace /DeviceRGB" + smask, image.convert("RGB"))
+
+    def add_image_file(self, filename : str) -> int:
+        """Embed an image file and return its image XObject number.
+
+        RGB and grayscale JPEG files are stored as they are, with
+        DCTDecode, so they are not decoded and compressed again. Other
+        files are decoded and written as with add_image. Each file is
+        only embedded once however often it is placed.
+        """
+        key = os.path.abspath(filename)
+        if key in self.__files:
+            return self.__files[key]
+        with Image.open(filename) as image:
+            if image.format == "JPEG" and image.mode in ("RGB", "L"):
+                space = "/DeviceRGB" if image.mode == "RGB" else "/DeviceGray"
+                entries = (f"/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height}"
+                           f" /BitsPerComponent 8 /ColorSpace {space} /Filter /DCTDecode")
+                with open(filename, "rb") as f:
+                    number = self.add_stream(entries, f.read(), compress=False)
+            else:
+                number = self.add_image(image)
+        self.__files[key] = number
+        return number
+
+    def _add_predicted(self, entries : str, image : Image.Image) -> int:
+        """Write an RGB or L image as a stream with PNG prediction."""
+        colors = len(image.getbands())
+        entries += f" /Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {image.width} >>"
+        return self.add_stream(entries, png_stream(image), compress=False)
+
+    def add_font(self, font : ImageFont.FreeTypeFont) -> int:
+        """Embed a TrueType font for WinAnsi text and return its font object number.
+
+        Glyph widths are measured from the font itself, so a font file
+        is only embedded once however many sizes are used. Raises
+        ValueError for a font that was not loaded from a file.
+        """
+        if not font_embeddable(font):
+            raise ValueError(f"Font {' '.join(font.getname())} was not loaded from a file and can not be embedded.")
+        path = os.fspath(font.path)
+        if path in self.__fonts:
+            return self.__fonts[path]
+
+        # Measure at 1000 pixels per em to get widths in PDF glyph units.
+        unit = font.font_variant(size=1000)
+        ascent, descent = unit.getmetrics()
+        first, last = 32, 255
+        widths = []
+        for code in range(first, last + 1):
+            try:
+                char = bytes([code]).decode("cp1252")
+            except UnicodeDecodeError:
+                char = "?"
+            widths.append(pdf_number(round(unit.getlength(char))))
+
+        name = "".join(c for c in font.getname()[0] if c.isalnum()) or "Font"
+        with open(path, "rb") as f:
+            data = f.read()
+        file_number = self.add_stream(f"/Length1 {len(data)}", data)
+        descriptor = self.add_object((
+            f"<< /Type /FontDescriptor /FontName /{name} /Flags 32"
+            f" /FontBBox [0 {-descent} 1000 {ascent}] /ItalicAngle 0"
+            f" /Ascent {ascent} /Descent {-descent} /CapHeight {ascent} /StemV 80"
+            f" /FontFile2 {file_number} 0 R >>"
+        ).encode())
+        number = self.add_object((
+            f"<< /Type /Font /Subtype /TrueType /BaseFont /{name}"
+            f" /FirstChar {first} /LastChar {last} /Widths [{' '.join(widths)}]"
+            f" /Encoding /WinAnsiEncoding /FontDescriptor {descriptor} 0 R >>"
+        ).encode())
+        self.__fonts[path] = number
+        return number
+
+    def add_page(self, width : float, height : float, content : bytes, resources : str = "") -> int:
+        """Write a page of the given size in points and return its object number."""
+        content_number = self.add_stream("", content)
+        number = self.add_object((
+            f"<< /Type /Page /Parent {self.__pages_root} 0 R"
+            f" /MediaBox [0 0 {pdf_number(width)} {pdf_number(height)}]"
+            f" /Resources << {resources} >> /Contents {content_number} 0 R >>"
+        ).encode())
+        self.__kids.append(number)
+        return number
+
+    def add_image_page(self, image : Image.Image, resolution : int) -> int:
+        """Write a page showing a single image at the given pixels per inch.
+
+        The image data is written to the file straight away, so the
+        caller can free the image as soon as this returns.
+        """
+        number = self.add_image(image)
+        width = image.width * 72 / resolution
+        height = image.height * 72 / resolution
+        content = f"q {pdf_number(width)} 0 0 {pdf_number(height)} 0 0 cm /Im{number} Do Q".encode()
+        return self.add_page(width, height, content, f"/XObject << /Im{number} {number} 0 R >>")
+
+    def close(self) -> None:
+        """Write the page tree, catalog and cross reference table."""
+        kids = " ".join(f"{kid} 0 R" for kid in self.__kids)
+        self._write(self.__pages_root, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.__kids)} >>".encode())
+        catalog = self.add_object(f"<< /Type /Catalog /Pages {self.__pages_root} 0 R >>".encode())
+
+        xref = self.__fp.tell()
+        self.__fp.write(f"xref\n0 {self.__next}\n".encode())
+        self.__fp.write(b"0000000000 65535 f \n")
+        for number in range(1, self.__next):
+            self.__fp.write(f"{self.__offsets[number]:010d} 00000 n \n".encode())
+        self.__fp.write(f"trailer\n<< /Size {self.__next} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
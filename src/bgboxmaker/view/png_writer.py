@@ -0,0 +1,109 @@
+from typing import BinaryIO, Optional
+from PIL import Image, ImageChops
+import struct
+import zlib
+
+
+class PNGStreamWriter:
+    """Write an RGBA PNG one horizontal strip at a time.
+
+    Only the current strip and the compressor state are held in
+    memory, so a page can be encoded without ever existing as a
+    single image. Rows are stored with the PNG "Up" filter.
+
+    Attributes
+    ----------
+    width : int
+        Width of the image in pixels.
+    height : int
+        Height of the image in pixels.
+    rows : int
+        Number of rows written so far.
+
+    Methods
+    -------
+    write(strip : Image) -> None
+        Appends the rows of an RGBA strip to the image.
+
+    close() -> None
+        Finishes the image. All rows must have been written.
+    """
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    CHUNK_SIZE = 1 << 16
+    UP_FILTER = b"\x02"
+
+    def __init__(self, fp : BinaryIO, width : int, height : int, compress_level : int = 6):
+        self.__fp : BinaryIO = fp
+        self.__width : int = width
+        self.__height : int = height
+        self.__rows : int = 0
+        self.__compressor = zlib.compressobj(compress_level)
+        self.__pending : list[bytes] = []
+        self.__pending_size : int = 0
+        self.__previous : Optional[Image.Image] = None
+
+        self.__fp.write(self.SIGNATURE)
+        # 8 bit depth, color type 6 (RGBA), default compression, filter and no interlace.
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    @property
+    def rows(self) -> int:
+        return self.__rows
+
+    def _write_chunk(self, kind : bytes, data : bytes) -> None:
+        """Write a single PNG chunk."""
+        self.__fp.write(struct.pack(">I", len(data)))
+        self.__fp.write(kind)
+        self.__fp.write(data)
+        self.__fp.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _flush(self, data : bytes) -> None:
+        """Collect compressed data, writing it out in IDAT chunks."""
+        if data:
+            self.__pending.append(data)
+            self.__pending_size += len(data)
+        if self.__pending_size >= self.CHUNK_SIZE:
+            self._write_chunk(b"IDAT", b"".join(self.__pending))
+            self.__pending = []
+            self.__pending_size = 0
+
+    def write(self, strip : Image.Image) -> None:
+        """Append the rows of an RGBA strip to the image."""
+        if strip.mode != "RGBA" or strip.width != self.__width:
+            raise ValueError(f"Strip must be RGBA and {self.__width} pixels wide.")
+        if self.__rows + strip.height > self.__height:
+            raise ValueError("Strip extends past the end of the image.")
+
+        # The Up filter stores each byte minus the byte above it, which
+        # is a modulo subtraction of the strip shifted down one row.
+        above = Image.new("RGBA", strip.size, (0,0,0,0))
+        if self.__previous is not None:
+            above.paste(self.__previous, (0, 0))
+        above.paste(strip.crop((0, 0, strip.width, strip.height - 1)), (0, 1))
+        self.__previous = strip.crop((0, strip.height - 1, strip.width, strip.height))
+        filtered = ImageChops.subtract_modulo(strip, above).tobytes()
+
+        stride = self.__width * 4
+        rows = [self.UP_FILTER + filtered[row * stride:(row + 1) * stride] for row in range(strip.height)]
+        self._flush(self.__compressor.compress(b"".join(rows)))
+        self.__rows += strip.height
+
+    def close(self) -> None:
+        """Finish the image. All rows must have been written."""
+        if self.__rows != self.__height:
+            raise ValueError(f"Image incomplete, {self.__rows} of {self.__height} rows written.")
+        self._flush(self.__compressor.flush())
+        if self.__pending:
+            self._write_chunk(b"IDAT", b"".join(self.__pending))
+            self.__pending = []
+            self.__pending_size = 0
+        self._write_chunk(b"IEND", b"")
@@ -1,15 +1,101 @@
 from bgboxmaker.dim import Dim
+from bgboxmaker.instrument import span
 from bgboxmaker.model import FeatureType, FeatureConfig
 from bgboxmaker.model import SectionConfig, SectionType
 from bgboxmaker.model import Orientation
 from bgboxmaker.view import BackgroundRenderer, FeatureGrid
+from bgboxmaker.view.cache import FontCache, file_digest
 from bgboxmaker.view.feature import PanelFeature, ImageFeature, TextFeature
+from functools import lru_cache
 from typing import Tuple, Union
-from PIL import Image, ImageDraw, ImageFont, ImageColor
+from PIL import Image, ImageDraw, ImageFont, ImageColor, ImageOps
 import logging
 logger = logging.getLogger(__name__)
 
 
+SHAPE_CACHE_SIZE = 128
+
+
+def _orient(image : Image.Image, turn : bool, rotated : bool, flip_v : bool, flip_h : bool) -> Image.Image:
+    """Rotate or flip an image.
+
+    All changes are multiples of 90 degrees, and are applied as
+    transposes rather than resampling rotations.
+    """
+    if turn:
+        image = image.transpose(Image.Transpose.ROTATE_90)
+    if rotated:
+        image = image.transpose(Image.Transpose.ROTATE_180)
+    if flip_v:
+        image = image.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    if flip_h:
+        image = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    return image
+
+
+def _draw_shape(section_type : SectionType, cutin : int, mode : str, size : Dim, back, fill) -> Image.Image:
+    """Draw the shape of a section type in the requested color."""
+    image = Image.new(mode, size.wh, back)
+    draw = ImageDraw.Draw(image, mode)
+
+    if section_type in [SectionType.PANE, SectionType.GLUE_TAB]:
+        draw.rectangle((0, 0, size.x, size.y), fill=fill, width=0)
+
+    if section_type == SectionType.SIDE_TAB:
+        # For the side tabs we need a polygon
+        # mask to cut out the correct shape.
+        p1 = (0, size.y)
+        p2 = (0, size.y / 2)
+        p3 = (size.x / 4, 0)
+        p4 = (size.x, 0)
+        p5 = (size.x, size.y)
+        draw.polygon([p1, p2, p3, p4, p5], fill=fill, width=0)
+
+    if section_type == SectionType.TUCK_TAB:
+        # Tuck tab should be rounded at the bottom.
+        w = int(size.x)
+        h = int(size.y / 2)
+        draw.pieslice((0, 0, w, 2 * h), 0, 180, fill=fill, width=0)
+        draw.rectangle((0, 0, w, h), fill=fill, width=0)
+
+    if section_type == SectionType.BACK:
+        draw.rectangle((0, 0, size.x, size.y), fill=fill, width=0)
+
+        w = int(cutin)
+        h = int(cutin / 2)
+        x = int(size.x / 2 - cutin / 2)
+        y = int(-cutin / 4)
+        draw.ellipse((x, y, x + w, y + h), fill=back, width=0)
+
+    return image
+
+
+@lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def _cached_shape(kind : str, section_type : SectionType, width : int, height : int, cutin : int, orientation : tuple = ()) -> Image.Image:
+    """Return a rasterized section shape, drawing it only on a cache miss.
+
+    kind is "shape" for a coverage mask (white inside the section) or
+    "mask" for the inverted alpha mask. Oriented variants are derived
+    from the cached unoriented image with transposes, so sections that
+    only differ by flips share a single drawing.
+    """
+    if any(orientation):
+        return _orient(_cached_shape(kind, section_type, width, height, cutin), *orientation)
+    if kind == "mask":
+        return ImageOps.invert(_cached_shape("shape", section_type, width, height, cutin))
+    return _draw_shape(section_type, cutin, "L", Dim(width, height), 0, 255)
+
+
+def shape_cache_info():
+    """Return hit and miss statistics for the shape cache."""
+    return _cached_shape.cache_info()
+
+
+def clear_shape_cache() -> None:
+    """Discard all cached section shapes."""
+    _cached_shape.cache_clear()
+
+
 class Section:
     """Object representing a section of a tuck box for rendering.
 
@@ -35,17 +121,34 @@ class Section:
         Working orientation to use when generating the section image.
     print_orientation : Orientation
         Final orientation of the section image when it is placed.
+    print_size : Dim
+        The width and height of the section once placed.
+    name : str
+        Name of the section, used to label timings.
+    assets : list[str]
+        Paths of the image files the section render reads.
+    fonts : list[str]
+        Names of the fonts the section render uses.
 
     Methods
     -------
 
+    render_key() -> tuple
+        Returns a hashable key describing everything the render of the
+        section depends on.
+
+    geometry_key() -> tuple
+        Returns a hashable key describing the shape and orientation of
+        the section.
+
     render() -> Image
         Returns an Image object containing the background and any
         requested features.
 
     render_mask() -> Image
         Returns an Image object containing the shape of the section
-        in grayscale for use as an image mask.
+        in grayscale for use as an image mask. The mask is kept
+        between calls and must not be modified.
 
     render_border(color : ImageColor, width : int) -> Image
         Returns an Image object containing the section shape,
@@ -73,6 +176,7 @@ class Section:
         else:
             self.__orientation : Orientation = Orientation.PORTRAIT
         self.__print_orientation : Orientation = Orientation.PORTRAIT
+        self.__name : str = "section"
 
     @property
     def config(self) -> SectionConfig:
@@ -95,6 +199,12 @@ class Section:
         self.__size = value
         self._fix_size()
 
+    @property
+    def print_size(self) -> Dim:
+        if self.__orientation != self.__print_orientation:
+            return Dim(self.__size.y, self.__size.x)
+        return Dim(self.__size.x, self.__size.y)
+
     @property
     def rotated(self) -> bool:
         return self.__rotated
@@ -154,84 +264,90 @@ class Section:
     def print_orientation(self, value : Orientation) -> None:
         self.__print_orientation = value
 
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @name.setter
+    def name(self, value : str) -> None:
+        self.__name = value
+
+    @property
+    def assets(self) -> list[str]:
+        paths = []
+        if self.__config.background.image:
+            paths.append(self.__config.background.image_path)
+        for feature in self.__config.features:
+            if feature.type == FeatureType.IMAGE:
+                paths.append(feature.options.image_path)
+        return paths
+
+    @property
+    def fonts(self) -> list[str]:
+        names = []
+        for feature in self.__config.features:
+            if feature.type == FeatureType.TEXT and feature.options.common.font.name not in names:
+                names.append(feature.options.common.font.name)
+        return names
+
 
     def _fix_size(self) -> None:
         """Make sure that the height and width specification matches orientation."""
         s1 = self.__size.x
         s2 = self.__size.y
         if self.__orientation == Orientation.LANDSCAPE:
-            self.__size.x = max(s1, s2)
-            self.__size.y = min(s1, s2)
+            self.__size = Dim(max(s1, s2), min(s1, s2))
         if self.orientation == Orientation.PORTRAIT:
-            self.__size.x = min(s1, s2)
-            self.__size.y = max(s1, s2)
+            self.__size = Dim(min(s1, s2), max(s1, s2))
 
 
     def _fix_orientation(self, fixed : Image.Image) -> Image.Image:
         """Rotate or flip image as needed."""
-
-        if self.__orientation != self.__print_orientation:
-            fixed = fixed.rotate(90, expand=1)
-
-        if self.__rotated:
-            fixed = fixed.rotate(180)
-
-        if self.__flip_v:
-            fixed = fixed.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
-        if self.__flip_h:
-            fixed = fixed.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
-
-        return fixed
+        return _orient(fixed, *self._orientation_key())
 
 
     def _draw_shapes(self, mode : str, size : Dim, back : str, fill : str) -> Image.Image:
         """Draw the shape of the section in the requested color"""
-        image = Image.new(mode, size.wh, back)
-        draw = ImageDraw.Draw(image, mode)
+        return _draw_shape(self.type, self.__cutin, mode, size, back, fill)
 
-        if self.type in [SectionType.PANE, SectionType.GLUE_TAB]:
-            draw.rectangle((0, 0, size.x, size.y), fill=fill, width=0)
 
-        if self.type == SectionType.SIDE_TAB:
-            # For the side tabs we need a polygon
-            # mask to cut out the correct shape.
-            p1 = (0, size.y)
-            p2 = (0, size.y / 2)
-            p3 = (size.x / 4, 0)
-            p4 = (size.x, 0)
-            p5 = (size.x, size.y)
-            draw.polygon([p1, p2, p3, p4, p5], fill=fill, width=0)
+    def _shape_key(self, size : Dim) -> tuple:
+        """Build a key describing the geometry of the section shape at the given size."""
+        section_type = self.__type
+        if section_type == SectionType.GLUE_TAB:
+            # Glue tabs are drawn as plain panes.
+            section_type = SectionType.PANE
+        # Only the back has a thumb hole.
+        cutin = self.__cutin if section_type == SectionType.BACK else 0
+        return (section_type, size.x, size.y, cutin)
 
-        if self.type == SectionType.TUCK_TAB:
-            # Tuck tab should be rounded at the bottom.
-            w = int(size.x)
-            h = int(size.y / 2)
-            draw.pieslice((0, 0, w, 2 * h), 0, 180, fill=fill, width=0)
-            draw.rectangle((0, 0, w, h), fill=fill, width=0)
 
-        if self.type == SectionType.BACK:
-            draw.rectangle((0, 0, size.x, size.y), fill=fill, width=0)
+    def _orientation_key(self) -> tuple:
+        """Build a key describing the orientation changes applied to the section."""
+        return (self.__orientation != self.__print_orientation, self.__rotated, self.__flip_v, self.__flip_h)
 
-            w = int(self.__cutin)
-            h = int(self.__cutin / 2)
-            x = int(size.x / 2 - self.__cutin / 2)
-            y = int(-self.__cutin / 4)
-            draw.ellipse((x, y, x + w, y + h), fill=back, width=0)
 
-        return image
+    def _get_shape(self, size : Dim) -> Image.Image:
+        """Return the section shape at the given size as a coverage mask.
+
+        Shapes are kept in a process-wide cache shared by all sections
+        with the same geometry. Returned images are shared and must not
+        be modified.
+        """
+        return _cached_shape("shape", *self._shape_key(size))
 
 
     def _get_border(self, color, width) -> Image.Image:
         """Draw the shape of the section scaled up to create a border."""
         border_size = Dim(self.__size.x + width * 2, self.__size.y + width * 2)
-        border = self._draw_shapes("RGBA", border_size, "#00000000", color)
+        border = Image.new("RGBA", border_size.wh, "#00000000")
+        border.paste(color, mask=self._get_shape(border_size))
         return border
 
 
     def _get_mask(self) -> Image.Image:
         """Draw the shape of the section for use as an alpha mask."""
-        mask = self._draw_shapes("L", self.size, "white", "black")
-        return mask
+        return _cached_shape("mask", *self._shape_key(self.size))
 
 
     def _get_margin(self) -> int:
@@ -272,26 +388,25 @@ class Section:
 
                 if feature_ratio < bounds_ratio:
                     # Adjust width
-                    feature_bounds.w = int(hard_bounds.h * feature_ratio)
+                    feature_bounds = Dim(int(hard_bounds.h * feature_ratio), hard_bounds.h)
                 else:
                     # Adjust height
-                    feature_bounds.h = int(hard_bounds.w / feature_ratio)
+                    feature_bounds = Dim(hard_bounds.w, int(hard_bounds.w / feature_ratio))
             else:
                 # Requested bounds fits within hard bounds and can be used directly.
-                feature_bounds.w = request.w
-                feature_bounds.h = request.h
+                feature_bounds = Dim(request.w, request.h)
         elif config.width > 0:
             # If only width is specified, check if it fits within the hard bounds
             if request.w < hard_bounds.x:
-                hard_bounds.w = request.w
+                feature_bounds = Dim(request.w, hard_bounds.h)
             else:
-                logger.warning(f"Requested width for feature {config.type} larger than hard boundary.")
+                logger.warning("Requested width for feature %s larger than hard boundary.", config.type)
         elif config.height > 0:
             # If only height is specified, check if it fits within the hard bounds.
             if request.h < hard_bounds.h:
-                hard_bounds.h = request.h
+                feature_bounds = Dim(hard_bounds.w, request.h)
             else:
-                logger.warning(f"Requested width for feature {config.type} larger than hard boundary.")
+                logger.warning("Requested width for feature %s larger than hard boundary.", config.type)
 
         return feature_bounds
 
@@ -313,26 +428,29 @@ class Section:
             # Set feature location
             # ---
 
-            # Get position
-            pos : Dim = grid.get_pos(feature.place)
-
             # Calculate feature bounds
             feature_bounds = self._get_feature_bounds(feature, bounds)
 
             # Generate feature image
             feature_object = self._feature_factory(feature)
-            feature_image : Image.Image = feature_object.render(feature_bounds)
-            fw, fh = feature_image.size
-
-            pos.x = pos.x - (feature.anchor.x * int(fw / 2))
-            pos.y = pos.y - (feature.anchor.y * int(fh / 2))
+            with span(type(feature_object).__name__, "feature") as s:
+                feature_image : Image.Image = feature_object.render(feature_bounds)
+                s.add_pixels(feature_image)
 
+            # Get position
+            pos : Dim = self._get_feature_pos(grid, feature, Dim(*feature_image.size))
 
             # TODO: Adjust for possible out of bounds with anchor position
             feature_layer.alpha_composite(feature_image, pos.xy)
 
         return feature_layer
 
+    def _get_feature_pos(self, grid : FeatureGrid, config : FeatureConfig, size : Dim) -> Dim:
+        """Calculate the top left position of a feature of the given size."""
+        pos : Dim = grid.get_pos(config.place)
+        return Dim(pos.x - (config.anchor.x * int(size.x / 2)),
+                   pos.y - (config.anchor.y * int(size.y / 2)))
+
     def _feature_factory(self, config : FeatureConfig):
             if config.type == FeatureType.PANEL:
                 return PanelFeature(config)
@@ -342,36 +460,60 @@ class Section:
                 return ImageFeature(config)
 
 
+    def render_key(self) -> tuple:
+        """Build a key describing everything the section render depends on.
+
+        Sections with equal keys render the same mask and image. Image
+        and font files are included by the digest of their content, so
+        the key stays the same between runs and changes when one of
+        them is edited.
+        """
+        assets = tuple((path, file_digest(path)) for path in self.assets)
+        fonts = tuple((name, file_digest(FontCache.path(name))) for name in self.fonts)
+        return (self.__config.freeze(), self.geometry_key(), assets, fonts)
+
+
+    def geometry_key(self) -> tuple:
+        """Build a key describing the shape and orientation of the section, which decide its mask and border."""
+        return (self._shape_key(self.size), self._orientation_key())
+
+
     def render(self) -> Image.Image:
         """Render the full section with background and features."""
-        # Create Section Image
-        render = Image.new("RGBA", self.size.wh, (0,0,0,0))
-        mask = self._get_mask()
+        with span("render") as s:
+            # Create Section Image
+            render = Image.new("RGBA", self.size.wh, (0,0,0,0))
+            mask = self._get_mask()
+
+            # Render background
+            with span("background"):
+                bg_renderer = BackgroundRenderer(self.config.background)
+                background = bg_renderer.render(self.size)
 
-        # Render background
-        bg_renderer = BackgroundRenderer(self.config.background)
-        background = bg_renderer.render(self.size)
-        render = Image.composite(render, background, mask)
+            if len(self.config.features) > 0:
+                with span("features"):
+                    # Features are drawn over the section background.
+                    background = Image.alpha_composite(background, self._get_features())
 
-        if len(self.config.features) > 0:
-            features = self._get_features()
-            render = Image.composite(render, features, mask)
+            render = Image.composite(render, background, mask)
 
-        render = self._fix_orientation(render)
+            render = self._fix_orientation(render)
+            s.add_pixels(render)
         return render
 
 
     def render_mask(self) -> Image.Image:
         """Render the section as an alpha mask."""
-        mask = self._get_mask()
-        mask = self._fix_orientation(mask)
-        return mask
+        with span("mask"):
+            return _cached_shape("mask", *self._shape_key(self.size), self._orientation_key())
 
 
     def render_border(self, color : str, width : int) -> Image.Image:
         """Render the section scaled up as a border."""
-        border = self._get_border(color, width)
-        border = self._fix_orientation(border)
+        with span("border") as s:
+            border = self._get_border(color, width)
+            border = self._fix_orientation(border)
+            s.add_pixels(border)
         return border
 
     def __repr__(self) -> str:
@@ -0,0 +1,146 @@
+from bgboxmaker.dim import Dim
+from bgboxmaker.view import Box
+from bgboxmaker.view.box import save_page
+from PIL import Image
+from typing import Optional
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Sheet:
+    """A printed page holding several boxes.
+
+    Boxes are packed onto the sheet in shelves, rows of boxes that
+    share a top edge, with at least `gutter` pixels between their cut
+    lines. The whole sheet is composited into a single page image, one
+    box at a time, and written once.
+
+    Attributes
+    ----------
+    page : Vec2
+        Printable size of the sheet in pixels.
+
+    resolution : int
+        Pixels per unit, shared by every box on the sheet.
+
+    gutter : int
+        Space between the cut lines of neighbouring boxes, in pixels.
+
+    boxes : list
+        Each placed box with the top left position of its footprint.
+
+    Methods
+    -------
+
+    add(box : Box) -> bool
+        Places the box on the sheet if there is room for it.
+
+    generate(workers : int) -> Image
+        Generates and returns the page with every placed box.
+
+    render_to(path : str, format : str, options : dict, workers : int) -> None
+        Generates the page and writes it to the given file.
+    """
+
+    def __init__(self, page : Dim, resolution : int, gutter : int):
+        self.__page : Dim = page
+        self.__resolution : int = resolution
+        self.__gutter : int = gutter
+        self.__boxes : list[tuple[Box, Dim]] = []
+        # Top, height and used width of each shelf.
+        self.__shelves : list[list[int]] = []
+
+    @property
+    def page(self) -> Dim:
+        return self.__page
+
+    @property
+    def resolution(self) -> int:
+        return self.__resolution
+
+    @property
+    def gutter(self) -> int:
+        return self.__gutter
+
+    @property
+    def boxes(self) -> list[tuple[Box, Dim]]:
+        return self.__boxes
+
+
+    def add(self, box : Box) -> bool:
+        """Place the box on the first shelf with room, opening a new shelf if needed."""
+        footprint = box.footprint
+        gutter = self.__gutter
+
+        for shelf in self.__shelves:
+            top, height, used = shelf
+            if footprint.y <= height and used + gutter + footprint.x <= self.__page.x:
+                self.__boxes.append((box, Dim(used + gutter, top)))
+                shelf[2] = used + gutter + footprint.x
+                return True
+
+        top = 0
+        if self.__shelves:
+            top = self.__shelves[-1][0] + self.__shelves[-1][1] + gutter
+        if top + footprint.y > self.__page.y or footprint.x > self.__page.x:
+            return False
+
+        self.__shelves.append([top, footprint.y, footprint.x])
+        self.__boxes.append((box, Dim(0, top)))
+        return True
+
+
+    def generate(self, workers : int = 1) -> Image.Image:
+        """Generate the sheet image.
+
+        Each box is composited on its own footprint and pasted into the
+        sheet, so only the sheet and a single box image are held at once.
+        """
+        sheet = Image.new("RGBA", self.__page.wh, (0,0,0,0))
+        for box, pos in self.__boxes:
+            # Footprints never overlap, so a plain paste is enough.
+            sheet.paste(box.generate_box(workers), pos.xy)
+        return sheet
+
+
+    def render_to(self, path : str, format : Optional[str] = None, options : Optional[dict] = None, workers : int = 1) -> None:
+        """Generate the sheet image and write it to the given file."""
+        save_page(self.generate(workers), path, format, options)
+
+
+def impose(boxes : list[Box], gutter : Optional[int] = None) -> list[Sheet]:
+    """Pack boxes onto as few sheets as possible.
+
+    Only boxes with the same page size and resolution can share a
+    sheet. Within each group the tallest boxes are placed first, and
+    each box goes on the first sheet with room for it. The gutter
+    defaults to twice the widest cut line, leaving room to cut
+    between neighbours.
+    """
+    if gutter is None:
+        gutter = 2 * max((box.border_width for box in boxes), default=0)
+    if gutter < 0:
+        msg = f"Gutter must not be negative. Requested: {gutter}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    groups : dict[tuple, list[Box]] = {}
+    for box in boxes:
+        key = (box.page.x, box.page.y, box.config.common.resolution)
+        groups.setdefault(key, []).append(box)
+
+    sheets : list[Sheet] = []
+    for (width, height, resolution), group in groups.items():
+        group_sheets : list[Sheet] = []
+        for box in sorted(group, key=lambda box: box.footprint.y, reverse=True):
+            if not any(sheet.add(box) for sheet in group_sheets):
+                sheet = Sheet(Dim(width, height), resolution, gutter)
+                if not sheet.add(box):
+                    msg = "Requested box is too big for the defined page. Adjust requested sizes to fit."
+                    logger.error(msg)
+                    raise ValueError(msg)
+                group_sheets.append(sheet)
+        sheets.extend(group_sheets)
+
+    logger.info("Imposed %d boxes on %d sheets.", len(boxes), len(sheets))
+    return sheets
@@ -0,0 +1,147 @@
+"""Watch mode
+
+Keeps a box image up to date while its configuration file is edited.
+The file and the images it uses are polled for changes, and on every
+change the box is built again from the file and rendered with a cache
+of the previous renders, so only the sections whose configuration,
+geometry or images changed are rendered again.
+"""
+
+from typing import Optional
+from bgboxmaker.batch import load_config
+from bgboxmaker.view import Box, RenderCache, DiskCache
+from bgboxmaker.view.box import output_format
+from bgboxmaker.view.cache import file_stamp
+import logging
+import os
+import time
+logger = logging.getLogger(__name__)
+
+
+class Watcher:
+    """Re-renders a box configuration file whenever it or its images change.
+
+    Attributes
+    ----------
+    filename : str
+        The YAML data file being watched.
+    output : str
+        The image file kept up to date. It is replaced in one step, so
+        viewers never see a half written file.
+    paths : list[str]
+        The files polled for changes, the data file and the images the
+        box used in its last render.
+    cache : RenderCache
+        Section and background renders kept between renders, backed
+        by the disk cache in cache_dir if one is given.
+
+    Methods
+    -------
+
+    render() -> bool
+        Builds and renders the box, returning False if it failed.
+
+    changed() -> bool
+        Returns True if any of the watched files changed since the last
+        render.
+
+    poll() -> Optional[bool]
+        Renders the box if the files changed, returning None if they
+        did not.
+
+    run(interval : float) -> None
+        Renders the box, and again on every change until interrupted.
+    """
+
+    # Rows per strip when writing PNG previews.
+    TILE_HEIGHT : int = 1024
+
+    def __init__(self, filename : str, output : str, format : Optional[str] = None, workers : int = 1, cache_dir : Optional[str] = None):
+        self.__filename : str = filename
+        self.__output : str = output
+        self.__format : str = output_format(output, format)
+        self.__workers : int = workers
+        self.__paths : list[str] = [filename]
+        self.__stamps : dict[str, Optional[tuple[int, int]]] = {}
+        self.__cache : RenderCache = RenderCache(store=DiskCache(cache_dir) if cache_dir is not None else None)
+        # Previews are written often and thrown away, favour speed over
+        # size. PNG pages are written in strips by PNGStreamWriter, whose
+        # fixed Up filter encodes in about half the time of Pillow's
+        # adaptive filtering.
+        self.__options : dict = {"compress_level" : 1} if self.__format == "PNG" else {}
+        self.__tile_height : int = self.TILE_HEIGHT if self.__format == "PNG" else 0
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    @property
+    def output(self) -> str:
+        return self.__output
+
+    @property
+    def paths(self) -> list[str]:
+        return self.__paths
+
+    @property
+    def cache(self) -> RenderCache:
+        return self.__cache
+
+    def _stamps(self) -> dict[str, Optional[tuple[int, int]]]:
+        return {path : file_stamp(path) for path in self.__paths}
+
+    def changed(self) -> bool:
+        """Return True if any of the watched files changed since the last render."""
+        return self._stamps() != self.__stamps
+
+    def render(self) -> bool:
+        """Build and render the box, returning False if it failed.
+
+        A failure, such as an invalid configuration, is reported and
+        leaves the output as it was, ready for the next change.
+        """
+        # Stamp the files before reading them, so changes made while
+        # rendering are picked up by the next poll.
+        self.__stamps = self._stamps()
+        start = time.perf_counter()
+        before = self.__cache.info()
+        temp = f"{self.__output}.tmp"
+        try:
+            box = Box(load_config(self.__filename))
+            paths = [self.__filename, *box.assets]
+            if paths != self.__paths:
+                self.__paths = paths
+                self.__stamps = self._stamps()
+            box.cache = self.__cache
+            box.render_to(temp, self.__format, self.__options, self.__workers, self.__tile_height)
+            os.replace(temp, self.__output)
+        except Exception as e:
+            logger.error("Failed to render %s: %s", self.__filename, e)
+            print(f"{self.__filename}: {str(e) or type(e).__name__}")
+            if os.path.exists(temp):
+                os.remove(temp)
+            return False
+
+        after = self.__cache.info()
+        rendered = after.misses - before.misses
+        reused = after.hits - before.hits
+        logger.info("Rendered %s, %d parts rendered and %d reused", self.__filename, rendered, reused)
+        print(f"{self.__output} updated in {time.perf_counter() - start:.2f}s, {rendered} parts rendered, {reused} reused")
+        return True
+
+    def poll(self) -> Optional[bool]:
+        """Render the box if the watched files changed, returning None if they did not."""
+        if not self.changed():
+            return None
+        return self.render()
+
+    def run(self, interval : float = 0.5) -> None:
+        """Render the box, then poll the files every interval seconds until interrupted."""
+        self.render()
+        print(f"Watching {self.__filename} for changes, press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
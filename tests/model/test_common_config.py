@@ -1,5 +1,5 @@
 import pytest
-from bgboxmaker import CommonConfig
+from bgboxmaker import CommonConfig, ConfigurationError
 
 class TestCommonConfig():
     """Test code for CommonConfig class."""
@@ -42,3 +42,12 @@ class TestCommonConfig():
     def test_update_data_resolution(self, config : CommonConfig) -> None:
         config.update_data({"resolution" : 200})
         assert config.resolution == 200
+
+
+    @pytest.mark.parametrize("data, error", [
+        ({"margin" : 0, "font" : {"size" : 0}}, "Invalid font size provided: 0"),
+        ({"resolution" : 0, "image_source" : 1, "margin" : 0}, "Invalid margin provided: 0"),
+    ])
+    def test_update_data_first_error(self, config : CommonConfig, data : dict, error : str) -> None:
+        with pytest.raises(ConfigurationError, match=error):
+            config.update_data(data)
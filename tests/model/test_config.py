@@ -1,4 +1,5 @@
 import pytest
+import logging
 from bgboxmaker import Config, BasicConfig, ConfigurationError, SectionName
 
 class TestConfig():
@@ -18,6 +19,20 @@ class TestConfig():
         config._found("message")
 
 
+    def test_validate_lazy_log(self, config : Config, caplog) -> None:
+        class Value(int):
+            formatted = 0
+            def __str__(self):
+                Value.formatted += 1
+                return "1"
+        with caplog.at_level(logging.WARNING):
+            config._validate(Value(1), "input", [config._valid_int])
+        assert Value.formatted == 0
+        with caplog.at_level(logging.INFO):
+            config._validate(Value(1), "input", [config._valid_int])
+        assert Value.formatted > 0 and "Setting input to: 1" in caplog.text
+
+
     def test_missing_required(self, config : Config) -> None:
         with pytest.raises(ConfigurationError):
             config._missing_required("message")
@@ -70,3 +70,14 @@ class TestFeatureConfig():
     def test_set_anchor(self, config : FeatureConfig) -> None:
         config.anchor = Dim(2, 2)
         assert config.anchor == Dim(2, 2)
+
+
+    @pytest.mark.parametrize("data, error", [
+        ({"type" : "text", "width" : 0, "options" : {"text" : 3}}, "Invalid feature text provided: 3"),
+        ({"type" : "bogus", "width" : 0}, "Unknown feature type provided: bogus"),
+        ({"width" : 0}, "Required config feature type not provided."),
+        ({"type" : "text", "anchor" : [3, 3], "height" : 0, "width" : 0}, "Invalid feature width provided: 0"),
+    ])
+    def test_update_data_first_error(self, config : FeatureConfig, data : dict, error : str) -> None:
+        with pytest.raises(ConfigurationError, match=error):
+            config.update_data(data)
@@ -0,0 +1,87 @@
+import pickle
+import pytest
+from bgboxmaker import Box, BoxConfig, SectionName, FrozenBoxConfig, RenderCache, DiskCache
+from PIL import Image
+
+class TestFrozen():
+    """Test code for frozen configuration snapshots."""
+
+    @pytest.fixture()
+    def data(self):
+        yield {
+            "dimensions" : {"width" : 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"margin" : 0.1, "resolution" : 50},
+            "basic" : {"title" : "Title", "subtitle" : "Subtitle", "extra" : "Extra"},
+            "detail" : {"back" : {"margin" : 0.3, "features" : [
+                {"type" : "text", "options" : {"text" : "Back", "font" : {"size" : 40}}}]}},
+        }
+
+    @pytest.fixture()
+    def config(self, data : dict):
+        config : BoxConfig = BoxConfig(data)
+        yield config
+
+
+    def test_freeze(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        assert isinstance(frozen, FrozenBoxConfig)
+        assert frozen.dimensions.width == 2.5
+        assert frozen.freeze() is frozen
+
+
+    def test_equal_hash(self, data : dict) -> None:
+        first = BoxConfig(data).freeze()
+        second = BoxConfig(data).freeze()
+        assert first == second
+        assert hash(first) == hash(second)
+
+
+    def test_assign(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        with pytest.raises(AttributeError):
+            frozen.common.margin = 0.5
+
+
+    def test_pickle(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+    def test_section_override(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        assert frozen.common.margin == 0.1
+        assert frozen.common.font.size != 40
+        assert frozen.detail[SectionName.BACK].common.margin == 0.3
+        assert frozen.detail[SectionName.BACK].features[0].options.common.font.size == 40
+
+
+    def test_basic_font_sizes(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        front = frozen.detail[SectionName.FRONT]
+        assert [feature.options.common.font.size for feature in front.features] == [90, 70, 50]
+
+
+    def test_freeze_blocks(self, config : BoxConfig) -> None:
+        frozen = config.freeze()
+        back = frozen.detail[SectionName.BACK]
+        blocks = [frozen.dimensions, frozen.page, frozen.common, frozen.common.font, frozen.background,
+                  frozen.basic, back, back.features[0], back.features[0].options]
+        assert all(block.freeze() is block for block in blocks)
+
+
+    def test_generate(self, config : BoxConfig) -> None:
+        page = Box(config).generate()
+        box = Box(config.freeze())
+        box.cache = RenderCache()
+        assert box.generate().tobytes() == page.tobytes()
+
+
+    def test_render_to(self, config : BoxConfig, tmp_path) -> None:
+        expected = tmp_path / "expected.png"
+        Box(config).render_to(str(expected))
+        for name in ["first.png", "second.png"]:
+            box = Box(config.freeze())
+            box.cache = RenderCache(0, DiskCache(str(tmp_path / "cache")))
+            box.render_to(str(tmp_path / name))
+            with Image.open(tmp_path / name) as image, Image.open(expected) as reference:
+                assert image.tobytes() == reference.tobytes()
@@ -0,0 +1,63 @@
+import pytest
+from bgboxmaker.model import ConfigurationError, Field, Schema, NUM
+
+
+class TestSchema():
+    """Test code for Schema class."""
+
+    @pytest.fixture()
+    def schema(self):
+        yield Schema("'test' block", {
+            'width': Field('test width', NUM, gt=0, missing='test width'),
+            'count': Field('test count', int, ge=0),
+            'align': Field('test align', str, choices=frozenset(['left', 'right'])),
+            'grid': Field('test grid', int, gt=0, vec2=True),
+            'name': Field('test name', str, check=lambda value: value.endswith(".ttf")),
+            'block': Field('test block'),
+        })
+
+
+    def test_validate(self, schema : Schema) -> None:
+        data = {'width': 2.5, 'count': 0, 'align': 'left', 'grid': [2, 3], 'name': 'a.ttf', 'block': {'anything': 1}}
+        values = schema.validate(data)
+        assert values == {'width': 2.5, 'count': 0, 'align': 'left', 'grid': [2, 3], 'name': 'a.ttf'}
+
+
+    def test_check_keys(self, schema : Schema) -> None:
+        with pytest.raises(ConfigurationError, match="Unknown configuration 'colour' found in 'test' block."):
+            schema.validate({'width': 1, 'colour': 'red'})
+
+
+    def test_missing_required(self, schema : Schema) -> None:
+        with pytest.raises(ConfigurationError, match="Required config test width not provided."):
+            schema.validate({'count': 1})
+
+
+    @pytest.mark.parametrize("key, value", [
+        ('width', 0), ('width', "wide"), ('count', -1), ('count', 1.5), ('align', 'middle'),
+        ('grid', [2]), ('grid', [2, 0]), ('grid', (2, 3)), ('grid', [2, 'a']), ('name', 'a.otf')
+    ])
+    def test_invalid(self, schema : Schema, key : str, value) -> None:
+        with pytest.raises(ConfigurationError, match=f"Invalid test {key} provided"):
+            schema.validate({'width': 1, key: value})
+
+
+    def test_first_error_in_declaration_order(self, schema : Schema) -> None:
+        with pytest.raises(ConfigurationError, match="Invalid test count"):
+            schema.validate({'align': 'middle', 'width': 1, 'count': -1})
+
+
+    def test_blocks_in_declaration_order(self, schema : Schema) -> None:
+        seen = []
+        values = schema.validate({'block': {}, 'align': 'left', 'width': 1},
+                                 {'block': seen.append, 'align': seen.append})
+        assert seen == ['left', {}] and values == {'width': 1, 'align': 'left'}
+
+
+    def test_fields_before_block_checked_first(self, schema : Schema) -> None:
+        def fail(value):
+            raise ConfigurationError("Invalid block")
+        with pytest.raises(ConfigurationError, match="Invalid test name"):
+            schema.validate({'block': {}, 'width': 1, 'name': 'a.otf'}, {'block': fail})
+        with pytest.raises(ConfigurationError, match="Invalid block"):
+            schema.validate({'block': {}, 'width': 1, 'name': 'a.ttf'}, {'block': fail})
@@ -1,5 +1,5 @@
 import pytest
-from bgboxmaker import SectionConfig, CommonConfig, Orientation, Dim, FeatureConfig
+from bgboxmaker import SectionConfig, CommonConfig, Orientation, Dim, FeatureConfig, ConfigurationError
 
 class TestSectionConfig():
     """Test code for SectionConfig class"""
@@ -57,3 +57,13 @@ class TestSectionConfig():
         feature_data = {"type" : "text", "options" : {"text" : "text"}}
         config.update_data({"features" : [feature_data]})
         assert len(config.features) == 1 and str(config.features[0]) == str(FeatureConfig(config.common, feature_data))
+
+
+    @pytest.mark.parametrize("data, error", [
+        ({"margin" : -1, "background" : {"color" : 3}}, "Invalid background color provided: 3"),
+        ({"margin" : -1, "orientation" : "sideways"}, "Unknown orientation provided: sideways"),
+        ({"features" : [{"type" : "bogus"}], "grid" : [0, 0], "rotated" : 3}, "Invalid rotated provided: 3"),
+    ])
+    def test_update_data_first_error(self, config : SectionConfig, data : dict, error : str) -> None:
+        with pytest.raises(ConfigurationError, match=error):
+            config.update_data(data)
@@ -0,0 +1,120 @@
+import argparse
+import pytest
+import os
+from bgboxmaker.batch import BatchResult, load_config, output_path, check_outputs, render_file, run_batch, format_summary
+from bgboxmaker.main import positive_int
+from bgboxmaker import BoxConfig
+from bgboxmaker.instrument import Recorder
+from PIL import Image
+
+
+class TestBatch():
+    """Test code for batch rendering."""
+
+    @pytest.fixture()
+    def good_file(self, tmp_path) -> str:
+        path = tmp_path / "good.yaml"
+        path.write_text("dimensions:\n  width: 2.5\n  height: 3.5\n  depth: 1\ncommon:\n  resolution: 100\n")
+        yield str(path)
+
+    @pytest.fixture()
+    def bad_file(self, tmp_path) -> str:
+        path = tmp_path / "bad.yaml"
+        path.write_text("dimensions:\n  width: 2.5\n  height: 3.5\n")
+        yield str(path)
+
+
+    def test_load_config(self, good_file : str) -> None:
+        config = load_config(good_file)
+        assert isinstance(config, BoxConfig) and config.common.resolution == 100
+
+
+    def test_output_path(self) -> None:
+        assert output_path("data/box.yaml", None, "PNG") == os.path.join("data", "box.png")
+
+
+    def test_output_path_dir(self) -> None:
+        assert output_path("data/box.yaml", "out", "tiff") == os.path.join("out", "box.tiff")
+
+
+    def test_check_outputs(self) -> None:
+        check_outputs(["a/box.yaml", "b/box.yaml"], ["a/box.png", "b/box.png"])
+        with pytest.raises(ValueError, match="a/box.yaml and b/box.yaml would both be written to out/box.png"):
+            check_outputs(["a/box.yaml", "b/box.yaml"], ["out/box.png", "out/box.png"])
+
+
+    def test_run_batch_same_output(self, good_file : str, tmp_path) -> None:
+        other = tmp_path / "other"
+        other.mkdir()
+        copy = other / "good.yaml"
+        copy.write_text(open(good_file).read())
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        with pytest.raises(ValueError):
+            run_batch([good_file, str(copy)], jobs=1, output_dir=str(output_dir))
+        assert not os.listdir(output_dir)
+
+
+    @pytest.mark.parametrize("value", ["0", "-2", "two"])
+    def test_positive_int_invalid(self, value : str) -> None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)
+
+
+    def test_positive_int(self) -> None:
+        assert positive_int("3") == 3
+
+
+    def test_render_file(self, good_file : str, tmp_path) -> None:
+        output = str(tmp_path / "good.png")
+        result = render_file(good_file, output)
+        with Image.open(output) as image:
+            assert result.ok and image.format == "PNG"
+
+
+    def test_render_file_error(self, bad_file : str, tmp_path) -> None:
+        result = render_file(bad_file, str(tmp_path / "bad.png"))
+        assert not result.ok and "box depth" in result.error
+
+
+    def test_run_batch_inline(self, good_file : str, bad_file : str) -> None:
+        results = run_batch([bad_file, good_file], jobs=1)
+        assert [result.ok for result in results] == [False, True] and os.path.exists(results[1].output)
+
+
+    def test_run_batch_pool(self, good_file : str, bad_file : str, tmp_path) -> None:
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        results = run_batch([good_file, bad_file], jobs=2, output_dir=str(output_dir), format="tiff")
+        assert [result.ok for result in results] == [True, False] and os.path.exists(output_dir / "good.tiff")
+
+
+    def test_run_batch_missing_output_dir(self, good_file : str, tmp_path) -> None:
+        output_dir = tmp_path / "out" / "boxes"
+        results = run_batch([good_file], jobs=1, output_dir=str(output_dir))
+        assert results[0].ok and os.path.exists(output_dir / "good.png")
+
+
+    def test_run_batch_pool_recorded(self, good_file : str, tmp_path) -> None:
+        with Recorder() as recorder:
+            results = run_batch([good_file], jobs=2, output_dir=str(tmp_path))
+        spans = {s.id : s for s in recorder.spans}
+        box = next(s for s in recorder.spans if s.name == "box")
+        assert results[0].ok and box.pid != os.getpid() and box.args == {"file" : good_file}
+        assert spans[box.parent].name == "batch"
+        assert any(s.category == "section" and spans[spans[s.parent].parent].parent is not None for s in recorder.spans)
+
+
+    def test_run_batch_cached(self, good_file : str, tmp_path) -> None:
+        cache_dir = str(tmp_path / "cache")
+        first = run_batch([good_file], jobs=1, output_dir=str(tmp_path), cache_dir=cache_dir)
+        page = (tmp_path / "good.png").read_bytes()
+        (tmp_path / "good.png").unlink()
+        second = run_batch([good_file], jobs=2, output_dir=str(tmp_path), cache_dir=cache_dir)
+        assert first[0].ok and second[0].ok and (tmp_path / "good.png").read_bytes() == page
+
+
+    def test_format_summary(self) -> None:
+        results = [BatchResult("a.yaml", "a.png", 1.5), BatchResult("b.yaml", "b.png", 0.5, "broken")]
+        summary = format_summary(results)
+        assert "FAILED: broken" in summary and summary.endswith("2 files, 1 failed, 2.00s render time")
@@ -0,0 +1,48 @@
+import pytest
+from bgboxmaker.collection import render_collection
+
+
+class TestCollection():
+    """Test code for collection output."""
+
+    @pytest.fixture()
+    def good_file(self, tmp_path) -> str:
+        path = tmp_path / "good.yaml"
+        path.write_text("dimensions:\n  width: 1\n  height: 1.5\n  depth: 0.4\ncommon:\n  resolution: 100\n")
+        yield str(path)
+
+    @pytest.fixture()
+    def bad_file(self, tmp_path) -> str:
+        path = tmp_path / "bad.yaml"
+        path.write_text("dimensions:\n  width: 2.5\n  height: 3.5\n")
+        yield str(path)
+
+
+    def _page_count(self, path) -> int:
+        data = path.read_bytes()
+        return data.count(b"/Type /Page ")
+
+
+    def test_render_collection(self, good_file : str, bad_file : str, tmp_path) -> None:
+        output = tmp_path / "collection.pdf"
+        results = render_collection([good_file, bad_file, good_file], str(output))
+        assert [result.ok for result in results] == [False, True, True]
+        assert results[2].output.endswith("page 2") and self._page_count(output) == 2
+
+
+    def test_render_collection_sheets(self, good_file : str, tmp_path) -> None:
+        output = tmp_path / "collection.pdf"
+        results = render_collection([good_file] * 3, str(output), sheets=True)
+        assert len(results) == 1 and results[0].ok and self._page_count(output) == 1
+
+
+    def test_render_collection_vector(self, good_file : str, tmp_path) -> None:
+        output = tmp_path / "collection.pdf"
+        render_collection([good_file] * 2, str(output), vector=True)
+        data = output.read_bytes()
+        assert self._page_count(output) == 2 and b"/Subtype /Image" not in data
+
+
+    def test_render_collection_invalid(self, good_file : str, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            render_collection([good_file], str(tmp_path / "collection.pdf"), vector=True, sheets=True)
@@ -0,0 +1,49 @@
+import pytest
+from bgboxmaker import Dim
+
+class TestDim():
+    """Test code for Dim class."""
+
+    def test_pad(self) -> None:
+        assert Dim(1, 2) == Dim(1, 2, 0)
+        assert Dim() == Dim(0, 0, 0)
+
+
+    def test_from_list(self) -> None:
+        values = [2, 3]
+        assert Dim(values) == Dim(2, 3)
+        assert values == [2, 3]
+
+
+    def test_from_dim(self) -> None:
+        assert Dim(Dim(4, 5)) == Dim(4, 5)
+
+
+    def test_attributes(self) -> None:
+        dim = Dim(1, 2, 3)
+        assert (dim.x, dim.y, dim.z) == (1, 2, 3)
+        assert (dim.w, dim.h, dim.d) == (1, 2, 3)
+        assert dim.xy == (1, 2)
+        assert dim.wh == (1, 2)
+
+
+    def test_immutable(self) -> None:
+        dim = Dim(1, 2)
+        with pytest.raises(AttributeError):
+            dim.x = 5
+
+
+    def test_mul(self) -> None:
+        assert Dim(1.5, 2) * 2 == Dim(3, 4)
+        assert 2 * Dim(1, 2) == Dim(2, 4)
+        assert isinstance(Dim(1, 2) * 2, Dim)
+
+
+    def test_as_ints(self) -> None:
+        dim = Dim(1.5, 2.7).as_ints()
+        assert dim == Dim(1, 2)
+        assert isinstance(dim.x, int)
+
+
+    def test_hash(self) -> None:
+        assert len({Dim(1, 2), Dim(1, 2), Dim(2, 1)}) == 2
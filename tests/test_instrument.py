@@ -0,0 +1,152 @@
+import pytest
+import json
+from bgboxmaker import Box, BoxConfig
+from bgboxmaker.instrument import Recorder, Span, span, format_timings, write_timings, write_trace, trace_events, live_image_bytes
+from PIL import Image
+import tracemalloc
+
+
+class TestInstrument():
+    """Test code for render instrumentation."""
+
+    @pytest.fixture()
+    def box(self):
+        data = {"dimensions" : {"width" : 2.5, "height" : 3.5, "depth" : 1},
+                "common" : {"resolution" : 50},
+                "basic" : {"title" : "Title"}}
+        yield Box(BoxConfig(data))
+
+
+    def test_span_inactive(self) -> None:
+        with span("stage") as s:
+            s.add_pixels(Image.new("L", (4, 4)))
+        assert not isinstance(s, Span)
+
+
+    def test_span_nested(self) -> None:
+        with Recorder() as recorder:
+            with span("outer") as outer:
+                with span("inner", "feature") as inner:
+                    inner.add_pixels(Image.new("L", (4, 5)))
+        assert [s.name for s in recorder.spans] == ["inner", "outer"]
+        assert inner.parent == outer.id and outer.parent is None
+        assert inner.category == "feature" and inner.pixels == 20
+        assert outer.wall >= inner.wall
+
+
+    def test_listener(self) -> None:
+        names = []
+        with Recorder(lambda s: names.append(s.name)):
+            with span("stage"):
+                pass
+        assert names == ["stage"]
+
+
+    def test_not_recording_after_exit(self) -> None:
+        with Recorder() as recorder:
+            pass
+        with span("stage"):
+            pass
+        assert recorder.spans == []
+
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_generate(self, box : Box, workers : int) -> None:
+        with Recorder() as recorder:
+            box.generate(workers)
+        spans = {s.id : s for s in recorder.spans}
+        sections = [s for s in recorder.spans if s.category == "section"]
+        assert len(sections) == 13
+        assert all(spans[s.parent].name == "sections" for s in sections)
+        features = [s for s in recorder.spans if s.category == "feature"]
+        assert features and all(s.name == "TextFeature" and s.pixels > 0 for s in features)
+
+
+    def test_format_timings(self, box : Box) -> None:
+        with Recorder() as recorder:
+            box.generate()
+        lines = format_timings(recorder).splitlines()
+        assert lines[1].startswith("generate")
+        assert any(line.startswith("    front ") for line in lines)
+
+
+    def test_write_timings(self, box : Box, tmp_path) -> None:
+        with Recorder() as recorder:
+            box.generate()
+        path = tmp_path / "timings.json"
+        write_timings(recorder, str(path))
+        data = json.loads(path.read_text())
+        assert len(data["spans"]) == len(recorder.spans)
+        assert {"name", "parent", "wall", "cpu", "pixels"} <= set(data["spans"][0])
+
+
+    def test_live_image_bytes(self) -> None:
+        before = live_image_bytes()
+        images = [Image.new("RGBA", (100, 100)), Image.new("L", (100, 100))]
+        assert live_image_bytes() - before == 100 * 100 * 5
+        del images
+
+
+    def test_memory(self) -> None:
+        with Recorder(memory=True) as recorder:
+            with span("outer") as outer:
+                with span("inner") as inner:
+                    image = Image.new("RGBA", (200, 100))
+                del image
+        assert not tracemalloc.is_tracing()
+        assert inner.image_bytes >= 200 * 100 * 4
+        assert outer.image_peak >= inner.image_bytes
+        assert outer.traced_peak >= inner.traced_peak > 0
+
+
+    def test_memory_generate(self, box : Box) -> None:
+        with Recorder(memory=True) as recorder:
+            box.generate()
+        compose = next(s for s in recorder.spans if s.name == "compose")
+        assert compose.image_peak >= box.page.x * box.page.y * 4
+        assert all(s.traced_peak > 0 for s in recorder.spans)
+        assert "image MB" in format_timings(recorder).splitlines()[0]
+
+
+    def test_merge(self) -> None:
+        with Recorder() as worker:
+            with span("box", "box", {"file" : "a.yaml"}):
+                with span("render"):
+                    pass
+        data = worker.as_dict()
+        data["pid"] += 1
+        for item in data["spans"]:
+            item["pid"] += 1
+        with Recorder() as recorder:
+            with span("batch") as batch:
+                recorder.merge(data)
+        spans = {s.id : s for s in recorder.spans}
+        box = next(s for s in recorder.spans if s.name == "box")
+        render = next(s for s in recorder.spans if s.name == "render")
+        assert box.parent == batch.id and render.parent == box.id
+        assert box.start == pytest.approx(worker.spans[1].start + worker.origin - recorder.origin)
+        assert len(spans) == 3
+
+
+    def test_trace_events(self, box : Box) -> None:
+        with Recorder() as recorder:
+            with span("box", "box", {"file" : "box.yaml"}):
+                box.generate(2)
+        events = trace_events(recorder)
+        complete = [e for e in events if e["ph"] == "X"]
+        assert len(complete) == len(recorder.spans)
+        assert all(e["args"]["file"] == "box.yaml" for e in complete)
+        features = [e for e in complete if e["cat"] == "feature"]
+        assert features and all("section" in e["args"] and e["args"]["pixels"] > 0 for e in features)
+        names = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        assert "MainThread" in names and len(names) > 1
+
+
+    def test_write_trace(self, box : Box, tmp_path) -> None:
+        with Recorder() as recorder:
+            box.generate()
+        path = tmp_path / "trace.json"
+        write_trace(recorder, str(path))
+        events = json.loads(path.read_text())["traceEvents"]
+        assert events[0] == {"name" : "process_name", "ph" : "M", "pid" : recorder.pid, "tid" : 0, "args" : {"name" : "bgboxmaker"}}
+        assert all(e["ts"] >= 0 and e["dur"] >= 0 for e in events if e["ph"] == "X")
@@ -0,0 +1,58 @@
+import pytest
+import time
+import threading
+from bgboxmaker import Box, BoxConfig
+from bgboxmaker.profiling import Profiler, StackSampler
+
+
+def wait_a_while() -> None:
+    time.sleep(0.05)
+
+
+class TestProfiling():
+    """Test code for profiling."""
+
+    @pytest.fixture()
+    def box(self):
+        data = {"dimensions" : {"width" : 2.5, "height" : 3.5, "depth" : 1},
+                "common" : {"resolution" : 50},
+                "basic" : {"title" : "Title"}}
+        yield Box(BoxConfig(data))
+
+
+    def test_sampler(self) -> None:
+        sampler = StackSampler()
+        sampler.start()
+        worker = threading.Thread(target=wait_a_while, name="waiter")
+        worker.start()
+        worker.join()
+        sampler.stop()
+        assert sampler.samples > 0
+        assert any(stack.startswith("waiter;") and "wait_a_while (test_profiling.py:8)" in stack for stack in sampler.stacks)
+        assert not any("bgboxmaker-sampler" in stack for stack in sampler.stacks)
+
+
+    def test_profiler(self, box : Box) -> None:
+        with Profiler() as profiler:
+            box.generate()
+        functions = {(filename.rsplit("/", 1)[-1], name) for filename, _, name in profiler.stats.stats}
+        assert ("text_feature.py", "render") in functions
+
+
+    def test_write(self, box : Box, tmp_path) -> None:
+        with Profiler() as profiler:
+            box.generate()
+            wait_a_while()
+        paths = profiler.write(str(tmp_path / "profile"))
+        assert paths == [str(tmp_path / "profile.pstats"), str(tmp_path / "profile.collapsed")]
+        lines = (tmp_path / "profile.collapsed").read_text().splitlines()
+        stack, samples = lines[0].rsplit(" ", 1)
+        assert int(samples) > 0 and stack.startswith("MainThread;")
+
+
+    def test_summary(self, box : Box) -> None:
+        with Profiler() as profiler:
+            box.generate()
+        lines = profiler.summary(5).splitlines()
+        assert lines[0].startswith("function") and len(lines) == 7
+        assert lines[-1].endswith("stack samples")
@@ -0,0 +1,45 @@
+import pytest
+import subprocess
+import sys
+
+
+def loaded_after(code : str, cwd : str) -> set[str]:
+    """Run code in a fresh interpreter and return the modules it loaded."""
+    script = code + "\nimport sys\nprint(' '.join(sys.modules))\n"
+    result = subprocess.run([sys.executable, "-c", script], cwd=cwd, capture_output=True, text=True, check=True)
+    return set(result.stdout.splitlines()[-1].split())
+
+
+class TestStartup():
+    """Test code for lazy imports at startup."""
+
+    def test_import_package(self, tmp_path) -> None:
+        modules = loaded_after("import bgboxmaker\nbgboxmaker.BoxConfig", str(tmp_path))
+        assert "PIL" not in modules
+        assert "bgboxmaker.view" not in modules
+
+
+    def test_import_view_name(self, tmp_path) -> None:
+        modules = loaded_after("import bgboxmaker\nbgboxmaker.Box", str(tmp_path))
+        assert "PIL" in modules
+
+
+    def test_unknown_name(self) -> None:
+        import bgboxmaker
+        with pytest.raises(AttributeError):
+            bgboxmaker.NotAName
+
+
+    def test_cli_help(self, tmp_path) -> None:
+        code = "import sys\nsys.argv = ['bgboxmaker', '--help']\nfrom bgboxmaker.main import main\ntry:\n    main()\nexcept SystemExit:\n    pass"
+        modules = loaded_after(code, str(tmp_path))
+        assert "PIL" not in modules
+        assert "yaml" not in modules
+
+
+    def test_cli_invalid_config(self, tmp_path) -> None:
+        path = tmp_path / "bad.yaml"
+        path.write_text("dimensions:\n  width: 2.5\n  height: 3.5\n")
+        code = f"import sys\nsys.argv = ['bgboxmaker', '-f', {str(path)!r}]\nfrom bgboxmaker.main import main\ntry:\n    main()\nexcept SystemExit:\n    pass"
+        modules = loaded_after(code, str(tmp_path))
+        assert "PIL" not in modules
@@ -0,0 +1,115 @@
+import pytest
+import os
+from bgboxmaker import Box, BoxConfig
+from bgboxmaker.batch import load_config
+from bgboxmaker.watch import Watcher
+from PIL import Image
+
+DATA = """dimensions:
+  width: 2.5
+  height: 3.5
+  depth: 1
+common:
+  resolution: 50
+  image_source: {images}
+detail:
+  front:
+    features:
+      - type: text
+        options:
+          text: {text}
+  back:
+    background:
+      image: photo.png
+"""
+
+
+class TestWatch():
+    """Test code for watch mode."""
+
+    @pytest.fixture()
+    def data_file(self, tmp_path) -> str:
+        Image.new("RGB", (40, 60), "blue").save(tmp_path / "photo.png")
+        path = tmp_path / "box.yaml"
+        path.write_text(DATA.format(images=tmp_path, text="First"))
+        yield str(path)
+
+
+    def touch(self, path : str) -> None:
+        """Move the modification time on, file systems may not see a quick edit."""
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+    def test_render(self, data_file : str, tmp_path) -> None:
+        output = str(tmp_path / "box.png")
+        watcher = Watcher(data_file, output)
+        assert watcher.render()
+        assert watcher.paths == [data_file, f"{tmp_path}/photo.png"]
+        with Image.open(output) as image:
+            assert image.size == Box(load_config(data_file)).page.wh
+        assert not os.path.exists(f"{output}.tmp")
+
+
+    def test_poll_unchanged(self, data_file : str, tmp_path) -> None:
+        watcher = Watcher(data_file, str(tmp_path / "box.png"))
+        watcher.render()
+        assert watcher.poll() is None
+
+
+    def test_poll_edit(self, data_file : str, tmp_path) -> None:
+        output = str(tmp_path / "box.png")
+        watcher = Watcher(data_file, output)
+        watcher.render()
+        misses = watcher.cache.info().misses
+
+        with open(data_file, "w") as f:
+            f.write(DATA.format(images=tmp_path, text="Second"))
+        self.touch(data_file)
+        assert watcher.poll()
+        # Only the front is rendered again.
+        assert watcher.cache.info().misses == misses + 1
+
+        expected = Box(load_config(data_file)).generate()
+        with Image.open(output) as image:
+            assert image.tobytes() == expected.tobytes()
+
+
+    def test_poll_image(self, data_file : str, tmp_path) -> None:
+        watcher = Watcher(data_file, str(tmp_path / "box.png"))
+        watcher.render()
+        misses = watcher.cache.info().misses
+        Image.new("RGB", (40, 60), "green").save(tmp_path / "photo.png")
+        self.touch(str(tmp_path / "photo.png"))
+        assert watcher.poll()
+        assert watcher.cache.info().misses == misses + 1
+
+
+    def test_invalid_edit(self, data_file : str, tmp_path, capsys) -> None:
+        output = str(tmp_path / "box.png")
+        watcher = Watcher(data_file, output)
+        watcher.render()
+        before = os.stat(output).st_mtime_ns
+
+        with open(data_file, "w") as f:
+            f.write("dimensions:\n  width: 2.5\n")
+        self.touch(data_file)
+        assert watcher.poll() is False
+        assert os.stat(output).st_mtime_ns == before
+        assert data_file in capsys.readouterr().out
+
+        with open(data_file, "w") as f:
+            f.write(DATA.format(images=tmp_path, text="Fixed"))
+        self.touch(data_file)
+        assert watcher.poll()
+
+
+    def test_render_strips(self, data_file : str, tmp_path, monkeypatch) -> None:
+        # PNG previews written in several strips decode to the same page.
+        monkeypatch.setattr(Watcher, "TILE_HEIGHT", 16)
+        output = str(tmp_path / "box.png")
+        assert Watcher(data_file, output).render()
+        expected = Box(load_config(data_file)).generate()
+        with Image.open(output) as image:
+            assert image.tobytes() == expected.tobytes()
+        assert not os.path.exists(f"{output}.tmp")
@@ -36,3 +36,21 @@ class TestTextFeature():
             draw.text((0,50), text="ImageFeature:too_big", fill="black")
             render.show()
         assert render.size == (80, 100)
+
+
+    def test_fit_font_size_matches_linear(self, feature : TextFeature) -> None:
+        """Test bisection finds the same size as stepping down one point at a time"""
+        for bounds in [Dim(800, 100), Dim(300, 40), Dim(120, 300), Dim(30, 30), Dim(5, 5)]:
+            draw = ImageDraw.Draw(Image.new("RGBA", bounds.wh))
+            expected = 90
+            while expected > 8 and not feature._fits(draw, expected, "mm", bounds):
+                expected = expected - 1
+            assert feature._fit_font_size(draw, "mm", bounds) == expected
+
+
+    def test_fit_font_size_small_font(self) -> None:
+        common = CommonConfig({"font" : {"size" : 6}})
+        config = FeatureConfig(common, {"type" : "text", "options" : {"text" : "hello world"}})
+        feature = TextFeature(config)
+        draw = ImageDraw.Draw(Image.new("RGBA", (10, 10)))
+        assert feature._fit_font_size(draw, "mm", Dim(10, 10)) == 6
@@ -61,3 +61,32 @@ class TestBackgroundRenderer():
             mock_image.return_value = Image.new("RGBA", (50,80), "gray")
             render = renderer.render(Dim(400, 400))
             assert render.size == (400, 400)
+
+
+    def test_render_centered_crop(self, renderer : BackgroundRenderer):
+        with patch.object(BackgroundRenderer, '_get_image') as mock_image:
+            source = Image.new("RGBA", (1200, 400), "blue")
+            source.paste("red", (0, 0, 600, 400))
+            mock_image.return_value = source
+            render = renderer.render(Dim(400, 400))
+            assert render.getpixel((0, 200)) == (255, 0, 0, 255) and render.getpixel((399, 200)) == (0, 0, 255, 255)
+
+
+    def test_render_same_aspect(self, renderer : BackgroundRenderer):
+        # Rounding must not push the crop outside a source of the same aspect.
+        with patch.object(BackgroundRenderer, '_get_image') as mock_image:
+            mock_image.return_value = Image.new("RGBA", (800, 800), "gray")
+            for size in (113, 138, 201, 226):
+                assert renderer.render(Dim(size, size)).size == (size, size)
+
+
+    def test_render_resize_then_crop(self, renderer : BackgroundRenderer):
+        # Without a reduced decode the source is resized to cover the
+        # bounds and then cropped, sampling exactly as it always has.
+        source = Image.effect_noise((997, 613), 60).convert("RGBA")
+        with patch.object(BackgroundRenderer, '_get_image') as mock_image:
+            mock_image.return_value = source
+            for size, cover, crop in [((300, 200), (325, 200), (12, 0)), ((754, 1054), (1714, 1054), (480, 0)),
+                                      ((2000, 50), (2000, 1229), (0, 589))]:
+                expected = source.resize(cover).crop((*crop, crop[0] + size[0], crop[1] + size[1]))
+                assert renderer.render(Dim(*size)).tobytes() == expected.tobytes()
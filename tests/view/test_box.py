@@ -1,5 +1,6 @@
 import pytest
-from bgboxmaker import Box, BoxConfig
+from bgboxmaker import Box, BoxConfig, RenderCache, DiskCache
+from PIL import Image
 
 class TestBox():
     """Test code for box class."""
@@ -21,4 +22,147 @@ class TestBox():
 
     def _set_box_size(self, box : Box) -> None:
         box._set_box_size()
-        assert box.size.x == 2 and box.size.y == 2
\ No newline at end of file
+        assert box.size.x == 2 and box.size.y == 2
+
+    def test_generate(self, box : Box) -> None:
+        page = box.generate()
+        assert isinstance(page, Image.Image) and page.size == box.page.wh
+
+
+    def test_render_to_png(self, box : Box, tmp_path) -> None:
+        path = tmp_path / "box.png"
+        box.render_to(str(path))
+        with Image.open(path) as image:
+            assert image.format == "PNG" and image.mode == "RGBA" and image.size == box.page.wh
+
+
+    def test_render_to_format(self, box : Box, tmp_path) -> None:
+        path = tmp_path / "box.out"
+        box.render_to(str(path), "jpeg", {"quality" : 90})
+        with Image.open(path) as image:
+            assert image.format == "JPEG" and image.mode == "RGB"
+
+
+    def test_render_to_unknown_format(self, box : Box, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            box.render_to(str(tmp_path / "box.out"))
+
+
+    def test_generate_workers(self) -> None:
+        data = {
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "background" : {"color" : "red"},
+            "basic" : {"title" : "title", "subtitle" : "subtitle"}
+            }
+        box = Box(BoxConfig(data))
+        serial = box.generate()
+        threaded = box.generate(workers=4)
+        assert serial.tobytes() == threaded.tobytes()
+
+
+    def test_generate_cached(self) -> None:
+        data = {
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "background" : {"color" : "red"},
+            "basic" : {"title" : "title"}
+            }
+        page = Box(BoxConfig(data)).generate()
+        cache = RenderCache()
+        box = Box(BoxConfig(data))
+        box.cache = cache
+        assert box.generate().tobytes() == page.tobytes()
+        # 13 sections, the background and the background and border
+        # layers. Sections with the same key share a render.
+        first = cache.info()
+        assert first.hits + first.misses == 16
+
+        box = Box(BoxConfig(data))
+        box.cache = cache
+        assert box.generate().tobytes() == page.tobytes()
+        assert cache.info().hits == first.hits + 16 and cache.info().misses == first.misses
+
+        data["basic"]["title"] = "other"
+        box = Box(BoxConfig(data))
+        box.cache = cache
+        box.generate()
+        assert first.misses < cache.info().misses < first.misses + 16
+
+
+    def test_generate_cached_frozen(self) -> None:
+        data = {
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"resolution" : 100},
+            "basic" : {"title" : "title"},
+            "detail" : {"back" : {"features" : [{"type" : "text", "options" : {"text" : "back"}}]}}
+            }
+        config = BoxConfig(data)
+        page = Box(config).generate()
+        cache = RenderCache()
+        box = Box(config.freeze())
+        box.cache = cache
+        assert box.generate().tobytes() == page.tobytes()
+        # A snapshot and the configuration it was taken from share keys.
+        first = cache.info()
+        box = Box(config)
+        box.cache = cache
+        assert box.generate().tobytes() == page.tobytes()
+        assert cache.info().misses == first.misses
+
+
+    def test_render_to_disk_cache(self, tmp_path) -> None:
+        data = {
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"resolution" : 100},
+            "basic" : {"title" : "title"}
+            }
+        store = DiskCache(str(tmp_path / "cache"))
+        hits = []
+        for name in ["first.png", "second.png"]:
+            box = Box(BoxConfig(data))
+            box.cache = RenderCache(0, store)
+            box.render_to(str(tmp_path / name))
+            hits.append(store.info().hits)
+        assert (tmp_path / "first.png").read_bytes() == (tmp_path / "second.png").read_bytes()
+        # The second page is copied whole, without looking at sections.
+        assert hits[1] == hits[0] + 1 and box.cache.info() == (0, 0, 0, 0)
+
+        data["basic"]["title"] = "other"
+        box = Box(BoxConfig(data))
+        box.cache = RenderCache(0, store)
+        box.render_to(str(tmp_path / "third.png"))
+        expected = Box(BoxConfig(data)).generate()
+        with Image.open(tmp_path / "third.png") as image:
+            assert image.tobytes() == expected.tobytes()
+        assert 0 < box.cache.info().misses < box.cache.info().hits
+
+
+    def test_generate_tiles(self) -> None:
+        data = {
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "background" : {"color" : "red"},
+            "basic" : {"title" : "title"}
+            }
+        box = Box(BoxConfig(data))
+        page = box.generate()
+        for tile_height in [97, 1000, box.page.y]:
+            tiled = Image.new("RGBA", box.page.wh)
+            for top, strip in box.generate_tiles(tile_height):
+                tiled.paste(strip, (0, top))
+            assert tiled.tobytes() == page.tobytes()
+
+
+    def test_generate_tiles_invalid(self, box : Box) -> None:
+        with pytest.raises(ValueError):
+            next(box.generate_tiles(0))
+
+
+    def test_render_to_tiles(self, box : Box, tmp_path) -> None:
+        path = tmp_path / "box.png"
+        box.render_to(str(path), tile_height=256)
+        with Image.open(path) as image:
+            assert image.tobytes() == box.generate().tobytes()
+
+
+    def test_render_to_tiles_format(self, box : Box, tmp_path) -> None:
+        with pytest.raises(ValueError):
+            box.render_to(str(tmp_path / "box.jpg"), tile_height=256)
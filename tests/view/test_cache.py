@@ -0,0 +1,268 @@
+import pytest
+import os
+from bgboxmaker.view import FontCache, AssetCache, RenderCache, DiskCache
+from bgboxmaker.view.cache import file_stamp, file_digest
+from PIL import Image
+
+
+class TestFontCache():
+    """Test code for FontCache class."""
+
+    @pytest.fixture(autouse=True)
+    def clear(self):
+        FontCache.clear()
+        yield
+        FontCache.clear()
+
+
+    def test_get_hit(self) -> None:
+        font = FontCache.get("Arial.ttf", 20)
+        assert FontCache.get("Arial.ttf", 20) is font and FontCache.info().hits == 1 and FontCache.info().misses == 1
+
+
+    def test_get_sizes(self) -> None:
+        small = FontCache.get("Arial.ttf", 20)
+        large = FontCache.get("Arial.ttf", 40)
+        assert small is not large and small.size == 20 and large.size == 40 and FontCache.info().currsize == 2
+
+
+    def test_get_resolved_path(self) -> None:
+        font = FontCache.get("Arial.ttf", 20)
+        assert font.path == FontCache.get(font.path, 20).path and FontCache.info().currsize == 1
+
+
+    def test_get_missing(self) -> None:
+        with pytest.raises(OSError):
+            FontCache.get("missingfont.ttf", 20)
+
+
+    def test_eviction(self, monkeypatch : pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(FontCache, "maxsize", 2)
+        for size in [10, 20, 30]:
+            FontCache.get("Arial.ttf", size)
+        FontCache.get("Arial.ttf", 10)
+        assert FontCache.info().currsize == 2 and FontCache.info().misses == 4
+
+
+    def test_clear(self) -> None:
+        FontCache.get("Arial.ttf", 20)
+        FontCache.clear()
+        assert FontCache.info() == (0, 0, FontCache.maxsize, 0)
+
+
+
+class TestAssetCache():
+    """Test code for AssetCache class."""
+
+    @pytest.fixture(autouse=True)
+    def clear(self):
+        AssetCache.clear()
+        yield
+        AssetCache.clear()
+
+    @pytest.fixture()
+    def image_file(self, tmp_path) -> str:
+        path = str(tmp_path / "image.png")
+        Image.new("RGB", (40, 20), "red").save(path)
+        yield path
+
+
+    def test_get_hit(self, image_file : str) -> None:
+        image = AssetCache.get(image_file)
+        assert AssetCache.get(image_file) is image and AssetCache.info().hits == 1
+
+
+    def test_get_normalized(self, image_file : str) -> None:
+        image = AssetCache.get(image_file)
+        assert image.mode == "RGBA" and image.size == (40, 20) and AssetCache.info().currsize == 40 * 20 * 4
+
+
+    def test_get_modified(self, image_file : str) -> None:
+        image = AssetCache.get(image_file)
+        Image.new("RGB", (40, 20), "blue").save(image_file)
+        stat = os.stat(image_file)
+        os.utime(image_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        assert AssetCache.get(image_file).getpixel((0, 0)) == (0, 0, 255, 255) and image.getpixel((0, 0)) == (255, 0, 0, 255)
+
+
+    def test_get_missing(self) -> None:
+        with pytest.raises(FileNotFoundError):
+            AssetCache.get("./missingimage.png")
+
+
+    def test_budget_eviction(self, image_file : str, tmp_path, monkeypatch : pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AssetCache, "budget", 40 * 20 * 4 + 1)
+        other = str(tmp_path / "other.png")
+        Image.new("RGB", (40, 20), "blue").save(other)
+        AssetCache.get(image_file)
+        AssetCache.get(other)
+        AssetCache.get(other)
+        AssetCache.get(image_file)
+        assert AssetCache.info().hits == 1 and AssetCache.info().misses == 3
+
+
+    def test_budget_oversize(self, image_file : str, monkeypatch : pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(AssetCache, "budget", 100)
+        image = AssetCache.get(image_file)
+        assert image.size == (40, 20) and AssetCache.info().currsize == 0
+
+
+    def test_get_cover_reduced(self, tmp_path) -> None:
+        path = str(tmp_path / "large.png")
+        Image.new("RGB", (800, 400), "red").save(path)
+        image = AssetCache.get(path, (100, 100))
+        assert image.size == (400, 200)
+
+
+    def test_get_cover_draft(self, tmp_path) -> None:
+        path = str(tmp_path / "large.jpg")
+        Image.new("RGB", (1600, 800), "red").save(path)
+        image = AssetCache.get(path, (50, 50))
+        assert image.size == (200, 100) and image.mode == "RGBA"
+
+
+    def test_get_cover_not_reduced(self, image_file : str) -> None:
+        image = AssetCache.get(image_file, (30, 30))
+        assert image.size == (40, 20)
+
+
+class TestRenderCache():
+    """Test code for the render cache."""
+
+    def test_get_put(self) -> None:
+        cache = RenderCache()
+        images = (Image.new("L", (10, 10)), Image.new("RGBA", (10, 10)))
+        assert cache.get(("a",)) is None
+        cache.put(("a",), images)
+        assert cache.get(("a",)) is images
+        assert cache.info() == (1, 1, cache.budget, 10 * 10 * 5)
+
+
+    def test_budget_eviction(self) -> None:
+        cache = RenderCache(budget=10 * 10 * 4 + 1)
+        cache.put(("a",), (Image.new("RGBA", (10, 10)),))
+        cache.put(("b",), (Image.new("RGBA", (10, 10)),))
+        assert cache.get(("a",)) is None and cache.get(("b",)) is not None
+
+
+    def test_clear(self) -> None:
+        cache = RenderCache()
+        cache.put(("a",), (Image.new("L", (10, 10)),))
+        cache.clear()
+        assert cache.get(("a",)) is None and cache.info().currsize == 0
+
+
+    def test_store(self, tmp_path) -> None:
+        images = (Image.new("L", (10, 10), 200),)
+        RenderCache(store=DiskCache(str(tmp_path))).put(("a",), images)
+        cache = RenderCache(store=DiskCache(str(tmp_path)))
+        assert cache.get(("a",))[0].tobytes() == images[0].tobytes()
+        assert cache.info().hits == 1 and cache.info().misses == 0
+
+
+    def test_store_without_memory(self, tmp_path) -> None:
+        cache = RenderCache(0, DiskCache(str(tmp_path)))
+        cache.put(("a",), (Image.new("L", (10, 10)),))
+        assert cache.info().currsize == 0 and cache.get(("a",)) is not None
+
+
+    def test_file_stamp(self, tmp_path) -> None:
+        path = tmp_path / "file.txt"
+        assert file_stamp(str(path)) is None
+        path.write_text("abc")
+        assert file_stamp(str(path))[1] == 3
+
+
+    def test_file_digest(self, tmp_path) -> None:
+        path = tmp_path / "file.txt"
+        assert file_digest(str(path)) is None
+        path.write_text("abc")
+        digest = file_digest(str(path))
+        assert digest == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+        path.write_text("abcd")
+        assert file_digest(str(path)) != digest
+
+
+class TestDiskCache():
+    """Test code for the disk cache."""
+
+    @pytest.fixture()
+    def cache(self, tmp_path) -> DiskCache:
+        yield DiskCache(str(tmp_path / "cache"))
+
+
+    def test_images(self, cache : DiskCache) -> None:
+        images = (Image.new("L", (10, 20), 100), Image.new("RGBA", (30, 5), (1, 2, 3, 4)))
+        assert cache.get_images(("a", 1)) is None
+        cache.put_images(("a", 1), images)
+        loaded = cache.get_images(("a", 1))
+        assert [(image.mode, image.size, image.tobytes()) for image in loaded] == \
+               [(image.mode, image.size, image.tobytes()) for image in images]
+        assert cache.info()[:2] == (1, 1)
+
+
+    def test_shared(self, cache : DiskCache) -> None:
+        cache.put_images(("a",), (Image.new("L", (10, 10)),))
+        assert DiskCache(cache.path).get_images(("a",)) is not None
+        assert DiskCache(cache.path).get_images(("b",)) is None
+
+
+    def test_file(self, cache : DiskCache, tmp_path) -> None:
+        source = tmp_path / "page.png"
+        source.write_bytes(b"page data")
+        copy = tmp_path / "copy.png"
+        assert not cache.get_file(("page",), str(copy))
+        cache.put_file(("page",), str(source))
+        assert cache.get_file(("page",), str(copy)) and copy.read_bytes() == b"page data"
+
+
+    def test_write_failure(self, cache : DiskCache, monkeypatch) -> None:
+        def fail(source, target):
+            raise OSError("disk full")
+        monkeypatch.setattr(os, "replace", fail)
+        cache.put_images(("a",), (Image.new("L", (10, 10)),))
+        assert cache.get_images(("a",)) is None
+        assert [name for _, _, names in os.walk(cache.path) for name in names] == []
+
+
+    def test_file_failure(self, cache : DiskCache, tmp_path, monkeypatch) -> None:
+        source = tmp_path / "page.png"
+        source.write_bytes(b"page data")
+        cache.put_file(("page",), str(source))
+        copy = tmp_path / "copy.png"
+        copy.write_bytes(b"old page")
+        def fail(source, target):
+            raise OSError("disk full")
+        monkeypatch.setattr(os, "replace", fail)
+        with pytest.raises(OSError):
+            cache.get_file(("page",), str(copy))
+        assert copy.read_bytes() == b"old page" and not (tmp_path / "copy.png.tmp").exists()
+
+
+    def test_corrupt(self, cache : DiskCache) -> None:
+        cache.put_images(("a",), (Image.new("L", (10, 10)),))
+        path = cache._entry(("a",), "images")
+        with open(path, "wb") as f:
+            f.write(b"[[\"L\", 10, 10, 3]]\nabc")
+        assert cache.get_images(("a",)) is None and not os.path.exists(path)
+
+
+    def test_trim(self, tmp_path) -> None:
+        cache = DiskCache(str(tmp_path / "cache"), budget=2500)
+        for i in range(3):
+            cache.put_images((i,), (Image.effect_noise((30, 30), 50),))
+            os.utime(cache._entry((i,), "images"), ns=(i * 10 ** 9, i * 10 ** 9))
+        cache.trim()
+        assert cache.info().currsize <= 2500
+        assert cache.get_images((0,)) is None and cache.get_images((2,)) is not None
+
+
+    def test_clear(self, cache : DiskCache) -> None:
+        cache.put_images(("a",), (Image.new("L", (10, 10)),))
+        cache.clear()
+        assert cache.get_images(("a",)) is None and cache.info().currsize == 0
+
+
+    def test_default_path(self, monkeypatch : pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("XDG_CACHE_HOME", "/var/cache/user")
+        assert DiskCache.default_path() == os.path.join("/var/cache/user", "bgboxmaker")
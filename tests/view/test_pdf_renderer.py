@@ -0,0 +1,115 @@
+import pytest
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+from bgboxmaker import Box, BoxConfig, Dim, SectionName
+from bgboxmaker.view import PDFRenderer
+from bgboxmaker.view.pdf_renderer import _apply, _orientation_matrix, _path_ops
+
+
+class TestPDFRenderer():
+    """Test code for PDFRenderer class."""
+
+    @pytest.fixture()
+    def box(self):
+        config : BoxConfig = BoxConfig({
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "background" : {"color" : "red"},
+            "basic" : {"title" : "title", "subtitle" : "sub"}
+        })
+        yield Box(config)
+
+
+    def test_orientation_matrix(self, box : Box) -> None:
+        # Every section's working space must land exactly on its printed area.
+        for section in box.sections.values():
+            m = _orientation_matrix(section, section.size)
+            xs, ys = zip(*[_apply(m, x, y) for x in (0, section.size.x) for y in (0, section.size.y)])
+            assert (min(xs), min(ys), max(xs), max(ys)) == (0, 0, section.print_size.x, section.print_size.y)
+
+
+    def test_path_ops(self) -> None:
+        path = [("m", 0, 0), ("l", 2, 0), ("h",)]
+        assert _path_ops(path, (1, 0, 0, 1, 10, 5)) == "10 5 m\n12 5 l\nh"
+
+
+    def test_render(self, box : Box, tmp_path) -> None:
+        path = tmp_path / "box.pdf"
+        PDFRenderer(box).render(str(path))
+        data = path.read_bytes()
+        # 300 dpi page of 3225 x 2475 pixels.
+        assert data.startswith(b"%PDF") and b"/MediaBox [0 0 774 594]" in data
+        assert data.count(b"/FontFile2") == 1 and b"/Subtype /Image" not in data
+
+
+    def test_render_unencodable_text(self, tmp_path) -> None:
+        config : BoxConfig = BoxConfig({
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"resolution" : 100},
+            "basic" : {"title" : "Snow ☃"}
+        })
+        path = tmp_path / "box.pdf"
+        PDFRenderer(Box(config)).render(str(path))
+        data = path.read_bytes()
+        # The title is placed as an image on the front, sides and ends.
+        assert data.count(b"/FontFile2") == 0 and data.count(b"/Subtype /Image") >= 5
+
+
+    @pytest.fixture()
+    def photo_dir(self, tmp_path) -> str:
+        # Smooth gradients with some noise, compressing like a photo.
+        noise = Image.effect_noise((800, 600), 40).filter(ImageFilter.GaussianBlur(3))
+        gradient = Image.linear_gradient("L").resize((800, 600))
+        photo = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        photo.save(tmp_path / "photo.jpg", quality=90)
+        photo.save(tmp_path / "photo.png")
+        yield str(tmp_path)
+
+
+    @pytest.mark.parametrize("image, ratio, images", [("photo.jpg", 5, 1), ("photo.png", 1, 2)])
+    def test_render_smaller_than_png(self, photo_dir : str, image : str, ratio : int, images : int) -> None:
+        config : BoxConfig = BoxConfig({
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"resolution" : 200, "image_source" : photo_dir},
+            "background" : {"image" : image},
+            "basic" : {"title" : "title"},
+            "detail" : {"back" : {"features" : [{"type" : "image", "options" : {"image" : image}}]}}
+        })
+        box = Box(config)
+        box.render_to(f"{photo_dir}/box.png")
+        PDFRenderer(box).render(f"{photo_dir}/box.pdf")
+        with open(f"{photo_dir}/box.pdf", "rb") as f:
+            data = f.read()
+        # The JPEG is embedded once for the background and the feature,
+        # the PNG is scaled up for the background but down for the feature.
+        assert data.count(b"/Subtype /Image") == images
+        with open(f"{photo_dir}/box.png", "rb") as f:
+            assert len(data) * ratio < len(f.read())
+
+
+    @pytest.fixture()
+    def section_box(self):
+        config : BoxConfig = BoxConfig({
+            "dimensions" : {"width": 2.5, "height" : 3.5, "depth" : 1},
+            "common" : {"resolution" : 100},
+            "detail" : {"front" : {"background" : {"color" : "navy"}, "features" : [
+                {"type" : "panel", "width" : 1, "height" : 1, "options" : {"color" : "yellow"}}]}}
+        })
+        yield Box(config)
+
+
+    def test_section_background_under_features(self, section_box : Box) -> None:
+        front = section_box.sections[SectionName.FRONT].render()
+        colors = {color for _, color in front.getcolors(front.width * front.height)}
+        assert (0, 0, 128, 255) in colors and (255, 255, 0, 255) in colors
+
+
+    def test_render_matches_png(self, section_box : Box, tmp_path) -> None:
+        pymupdf = pytest.importorskip("pymupdf")
+        path = tmp_path / "box.pdf"
+        PDFRenderer(section_box).render(str(path))
+        with pymupdf.open(str(path)) as document:
+            pixmap = document[0].get_pixmap(matrix=pymupdf.Matrix(100 / 72, 100 / 72))
+        pdf = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples).resize(section_box.page.wh)
+        png = Image.new("RGBA", section_box.page.wh, "white")
+        png.alpha_composite(section_box.generate())
+        difference = ImageStat.Stat(ImageChops.difference(pdf, png.convert("RGB"))).mean
+        assert max(difference) < 2
@@ -0,0 +1,97 @@
+import pytest
+import io
+import re
+import zlib
+from bgboxmaker.view import PDFWriter, FontCache
+from bgboxmaker.view.pdf_writer import pdf_number, pdf_string, pdf_encodable, png_stream
+from PIL import Image, ImageFont
+
+
+class TestPDFWriter():
+    """Test code for PDFWriter class."""
+
+    def _offsets(self, data : bytes) -> list[int]:
+        xref = int(data.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+        table = data[xref:].split(b"trailer")[0].split(b"\n")
+        return [int(line[:10]) for line in table[3:] if line.endswith(b" n ")]
+
+
+    def test_pdf_number(self) -> None:
+        assert pdf_number(3.0) == "3" and pdf_number(0.25) == "0.25" and pdf_number(1 / 3) == "0.3333"
+
+
+    def test_pdf_string(self) -> None:
+        assert pdf_string("a(b)\\") == "(a\\(b\\)\\\\)"
+
+
+    def test_pdf_string_unencodable(self) -> None:
+        assert pdf_encodable("Café €5") and not pdf_encodable("Snow ☃")
+        with pytest.raises(UnicodeEncodeError):
+            pdf_string("Snow ☃")
+
+
+    def test_xref_offsets(self) -> None:
+        fp = io.BytesIO()
+        writer = PDFWriter(fp)
+        writer.add_page(72, 72, b"0 0 1 rg 0 0 72 72 re f")
+        writer.add_page(72, 144, b"")
+        writer.close()
+        data = fp.getvalue()
+        offsets = self._offsets(data)
+        assert writer.pages == 2 and data.startswith(b"%PDF-1.4")
+        assert all(data[offset:].startswith(f"{number} 0 obj".encode()) for number, offset in enumerate(offsets, 1))
+        assert b"/Count 2" in data
+
+
+    def test_add_image_alpha(self) -> None:
+        fp = io.BytesIO()
+        writer = PDFWriter(fp)
+        writer.add_image(Image.new("RGBA", (4, 4), (255, 0, 0, 128)))
+        writer.add_image(Image.new("RGBA", (4, 4), (255, 0, 0, 255)))
+        assert fp.getvalue().count(b"/SMask") == 1
+
+
+    def test_png_stream(self) -> None:
+        image = Image.linear_gradient("L").resize((40, 30)).convert("RGB")
+        rows = zlib.decompress(png_stream(image))
+        # One filter type byte ahead of every row.
+        assert len(rows) == 30 * (40 * 3 + 1)
+
+
+    def test_add_image_predictor(self) -> None:
+        fp = io.BytesIO()
+        PDFWriter(fp).add_image(Image.new("RGB", (40, 30), "red"))
+        assert b"/DecodeParms << /Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns 40 >>" in fp.getvalue()
+
+
+    def test_add_image_file_jpeg(self, tmp_path) -> None:
+        path = tmp_path / "photo.jpg"
+        Image.new("RGB", (40, 30), "red").save(path)
+        fp = io.BytesIO()
+        writer = PDFWriter(fp)
+        assert writer.add_image_file(str(path)) == writer.add_image_file(str(path))
+        data = fp.getvalue()
+        assert data.count(b"/Filter /DCTDecode") == 1 and path.read_bytes() in data
+
+
+    def test_add_font_once(self) -> None:
+        fp = io.BytesIO()
+        writer = PDFWriter(fp)
+        first = writer.add_font(FontCache.get("Arial.ttf", 12))
+        second = writer.add_font(FontCache.get("Arial.ttf", 40))
+        assert first == second and fp.getvalue().count(b"/FontFile2") == 1
+
+
+    def test_add_font_not_file(self) -> None:
+        with open(FontCache.get("Arial.ttf", 12).path, "rb") as f:
+            font = ImageFont.truetype(io.BytesIO(f.read()), 12)
+        with pytest.raises(ValueError, match="not loaded from a file"):
+            PDFWriter(io.BytesIO()).add_font(font)
+
+
+    def test_add_image_page(self) -> None:
+        fp = io.BytesIO()
+        writer = PDFWriter(fp)
+        writer.add_image_page(Image.new("RGB", (300, 150), "red"), 300)
+        writer.close()
+        assert writer.pages == 1 and b"/MediaBox [0 0 72 36]" in fp.getvalue()
@@ -0,0 +1,52 @@
+import pytest
+import io
+from bgboxmaker.view import PNGStreamWriter
+from PIL import Image
+
+
+class TestPNGStreamWriter():
+    """Test code for PNGStreamWriter class."""
+
+    @pytest.fixture()
+    def image(self):
+        image = Image.effect_noise((60, 45), 80).convert("RGBA")
+        image.putalpha(Image.linear_gradient("L").resize((60, 45)))
+        yield image
+
+
+    def _write(self, image : Image.Image, strip_height : int) -> bytes:
+        fp = io.BytesIO()
+        writer = PNGStreamWriter(fp, image.width, image.height)
+        for top in range(0, image.height, strip_height):
+            writer.write(image.crop((0, top, image.width, min(top + strip_height, image.height))))
+        writer.close()
+        return fp.getvalue()
+
+
+    def test_write_strips(self, image : Image.Image) -> None:
+        with Image.open(io.BytesIO(self._write(image, 7))) as written:
+            assert written.mode == "RGBA" and written.tobytes() == image.tobytes()
+
+
+    def test_write_single_strip(self, image : Image.Image) -> None:
+        with Image.open(io.BytesIO(self._write(image, image.height))) as written:
+            assert written.tobytes() == image.tobytes()
+
+
+    def test_write_wrong_width(self, image : Image.Image) -> None:
+        writer = PNGStreamWriter(io.BytesIO(), 10, 10)
+        with pytest.raises(ValueError):
+            writer.write(image)
+
+
+    def test_write_too_many_rows(self) -> None:
+        writer = PNGStreamWriter(io.BytesIO(), 10, 10)
+        with pytest.raises(ValueError):
+            writer.write(Image.new("RGBA", (10, 11)))
+
+
+    def test_close_incomplete(self) -> None:
+        writer = PNGStreamWriter(io.BytesIO(), 10, 10)
+        writer.write(Image.new("RGBA", (10, 5)))
+        with pytest.raises(ValueError):
+            writer.close()
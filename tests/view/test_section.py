@@ -3,6 +3,7 @@ from unittest.mock import patch
 from bgboxmaker.dim import Dim
 from bgboxmaker.model import SectionConfig, FeatureConfig, CommonConfig, SectionType, Orientation, FeatureType
 from bgboxmaker.view import Section, PanelFeature, TextFeature, ImageFeature
+from bgboxmaker.view.section import shape_cache_info, clear_shape_cache
 from PIL import Image, ImageDraw
 
 
@@ -192,6 +193,62 @@ class TestSection():
         assert border.size == (200, 200)
 
 
+    def test_get_shape_cached(self, section : Section) -> None:
+        """Test _get_shape reuses the drawn shape"""
+        section.type = SectionType.SIDE_TAB
+        shape = section._get_shape(Dim(200, 100))
+        assert section._get_shape(Dim(200, 100)) is shape
+
+
+    def test_get_shape_geometry_change(self, section : Section) -> None:
+        """Test _get_shape redraws when the geometry changes"""
+        section.type = SectionType.BACK
+        section.cutin = 50
+        shape = section._get_shape(Dim(200, 100))
+        section.cutin = 80
+        assert section._get_shape(Dim(200, 100)) is not shape
+
+
+    def test_get_mask_matches_shape(self, section : Section) -> None:
+        """Test _get_mask matches directly drawn mask"""
+        section.size = Dim(200, 300)
+        section.type = SectionType.BACK
+        section.cutin = 100
+        drawn = section._draw_shapes("L", section.size, "white", "black")
+        assert section._get_mask().tobytes() == drawn.tobytes()
+
+
+    def test_get_border_matches_shape(self, section : Section) -> None:
+        """Test _get_border matches directly drawn border"""
+        section.size = Dim(200, 300)
+        section.type = SectionType.TUCK_TAB
+        drawn = section._draw_shapes("RGBA", Dim(210, 310), "#00000000", "black")
+        assert section._get_border("black", 5).tobytes() == drawn.tobytes()
+
+
+    def test_shape_cache_shared_by_flips(self) -> None:
+        """Test side tabs differing only by flips share one drawing"""
+        clear_shape_cache()
+        masks = []
+        for flip_h, flip_v in [(False, False), (True, False), (False, True), (True, True)]:
+            tab = Section(SectionConfig(CommonConfig()))
+            tab.size = Dim(100, 120)
+            tab.type = SectionType.SIDE_TAB
+            tab.flip_h = flip_h
+            tab.flip_v = flip_v
+            masks.append(tab.render_mask())
+        flipped = masks[0].transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        # One drawing, one inversion and four oriented variants.
+        assert shape_cache_info().misses == 6 and masks[1].tobytes() == flipped.tobytes()
+
+
+    def test_clear_shape_cache(self, section : Section) -> None:
+        section.size = Dim(100, 120)
+        section.render_mask()
+        clear_shape_cache()
+        assert shape_cache_info().currsize == 0
+
+
     def test_get_margin(self, section : Section) -> None:
         """Test _get_margin normally"""
         section.config.common.margin = 0.25
@@ -391,3 +448,20 @@ class TestSection():
     def test_repr(self, section : Section) -> None:
         print(section)
 
+
+
+    def test_render_key(self, tmp_path) -> None:
+        path = tmp_path / "image.png"
+        Image.new("RGB", (10, 10), "red").save(path)
+        common = CommonConfig({"image_source" : str(tmp_path)})
+        section = Section(SectionConfig(common, {"background" : {"image" : "image.png"}}))
+        section.size = Dim(100, 200)
+        other = Section(SectionConfig(common, {"background" : {"image" : "image.png"}}))
+        other.size = Dim(100, 200)
+        key = section.render_key()
+        assert section.assets == [f"{tmp_path}/image.png"]
+        assert key == other.render_key() and hash(key) == hash(other.render_key())
+        other.flip_h = True
+        assert key != other.render_key()
+        Image.new("RGB", (12, 10), "red").save(path)
+        assert key != section.render_key()
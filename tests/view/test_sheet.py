@@ -0,0 +1,63 @@
+import pytest
+from bgboxmaker import Box, BoxConfig, Dim, Sheet, impose
+from PIL import Image
+
+
+class TestSheet():
+    """Test code for Sheet class and imposition."""
+
+    def _box(self, width : float = 1.7, height : float = 2.5, depth : float = 0.5, resolution : int = 100) -> Box:
+        return Box(BoxConfig({
+            "dimensions" : {"width": width, "height" : height, "depth" : depth},
+            "background" : {"color" : "red"},
+            "common" : {"resolution" : resolution}
+        }))
+
+
+    def test_generate_box(self) -> None:
+        box = self._box()
+        x = box.pos.x - box.border_width
+        y = box.pos.y - box.border_width
+        page = box.generate().crop((x, y, x + box.footprint.x, y + box.footprint.y))
+        assert page.tobytes() == box.generate_box().tobytes()
+
+
+    def test_add_shelves(self) -> None:
+        box = self._box(1, 1, 0.25)
+        sheet = Sheet(Dim(box.footprint.x * 2 + 10, box.footprint.y * 2 + 10), 100, 10)
+        assert all(sheet.add(box) for _ in range(4)) and not sheet.add(box)
+        positions = [pos.xy for _, pos in sheet.boxes]
+        assert positions == [(0, 0), (box.footprint.x + 10, 0), (0, box.footprint.y + 10), (box.footprint.x + 10, box.footprint.y + 10)]
+
+
+    def test_impose_no_overlap(self) -> None:
+        boxes = [self._box(1, 1, 0.25) for _ in range(3)] + [self._box(1.5, 2, 0.5)]
+        sheets = impose(boxes)
+        placed = [(box, pos) for sheet in sheets for box, pos in sheet.boxes]
+        assert len(placed) == 4 and len(sheets) == 1
+        gutter = sheets[0].gutter
+        for i, (a, pa) in enumerate(placed):
+            for b, pb in placed[i + 1:]:
+                assert (pa.x + a.footprint.x + gutter <= pb.x or pb.x + b.footprint.x + gutter <= pa.x or
+                        pa.y + a.footprint.y + gutter <= pb.y or pb.y + b.footprint.y + gutter <= pa.y)
+
+
+    def test_impose_groups_resolution(self) -> None:
+        sheets = impose([self._box(resolution=100), self._box(resolution=50)])
+        assert len(sheets) == 2 and {sheet.resolution for sheet in sheets} == {100, 50}
+
+
+    def test_impose_gutter_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            impose([self._box()], -1)
+
+
+    def test_render_to(self, tmp_path) -> None:
+        sheets = impose([self._box(1, 1, 0.25) for _ in range(2)])
+        path = tmp_path / "sheet.png"
+        sheets[0].render_to(str(path))
+        with Image.open(path) as image:
+            assert image.size == sheets[0].page.wh
+            box, pos = sheets[0].boxes[1]
+            # Left cut line of the second box.
+            assert image.getpixel((pos.x + 1, pos.y + box.footprint.y // 2))[3] == 255